@@ -0,0 +1,197 @@
+"""
+响应压缩中间件模块
+按客户端Accept-Encoding选择brotli或gzip压缩响应体，小于阈值的响应和SSE流式响应保持原样
+"""
+import gzip
+import zlib
+from typing import List, Optional
+
+from app.core.config import config
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# 可压缩的内容类型前缀
+_COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/javascript", "application/xml", "image/svg+xml"
+)
+
+
+def _choose_encoding(accept_encoding: str) -> Optional[str]:
+    """根据Accept-Encoding选择压缩算法（忽略q=0的编码）"""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip())
+    if BROTLI_AVAILABLE and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """增量压缩器，统一gzip与brotli的接口"""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=config.COMPRESSION_BROTLI_QUALITY)
+        else:
+            # wbits=31 输出带gzip头的数据流
+            self._compressor = zlib.compressobj(config.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+        self._brotli = encoding == "br"
+
+    def compress(self, data: bytes) -> bytes:
+        """压缩一段数据并刷新，使已接收的数据可以立即发送"""
+        if self._brotli:
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        """结束压缩流"""
+        if self._brotli:
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    """一次性压缩完整响应体"""
+    if encoding == "br":
+        return brotli.compress(body, quality=config.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=config.COMPRESSION_GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """
+    响应压缩中间件（纯ASGI实现）
+
+    先缓冲响应体直到超过阈值：完整响应一次性压缩并设置Content-Length，
+    分块发送的响应超过阈值后改为增量压缩；未超过阈值的响应原样发送
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not config.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for key, value in scope.get("headers", []):
+            if key == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = _choose_encoding(accept_encoding) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encoding, max(config.COMPRESSION_MINIMUM_SIZE, 0))
+        await self.app(scope, receive, responder)
+
+
+class _CompressionResponder:
+    """包装send，按响应头和响应体大小决定是否压缩"""
+
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.passthrough = False
+        self.buffer: List[bytes] = []
+        self.buffered_size = 0
+        self.compressor: Optional[_Compressor] = None
+
+    def _eligible(self, message) -> bool:
+        """根据状态码和响应头判断是否可以压缩"""
+        if message["status"] < 200 or message["status"] in (204, 206, 304):
+            return False
+        content_type = ""
+        for key, value in message.get("headers", []):
+            if key == b"content-encoding":
+                return False
+            if key == b"content-type":
+                content_type = value.decode("latin-1").lower()
+            elif key == b"content-length" and int(value) < self.minimum_size:
+                return False
+        # SSE需要逐条即时送达，不做压缩缓冲
+        if content_type.startswith("text/event-stream"):
+            return False
+        return content_type.startswith(_COMPRESSIBLE_TYPES)
+
+    def _headers(self, content_length: Optional[int]) -> list:
+        """生成压缩后的响应头（分块压缩时不设置Content-Length）"""
+        headers = [
+            (key, value) for key, value in self.start_message.get("headers", [])
+            if key not in (b"content-length", b"vary")
+        ]
+        vary = [value for key, value in self.start_message.get("headers", []) if key == b"vary"]
+        headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode("latin-1")))
+        return headers
+
+    async def _flush_uncompressed(self, more_body: bool):
+        """原样发送已缓冲的响应"""
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": b"".join(self.buffer), "more_body": more_body})
+        self.buffer = []
+        self.passthrough = True
+
+    async def __call__(self, message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            self.start_message = message
+            self.passthrough = not self._eligible(message)
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        # 已开始增量压缩
+        if self.compressor is not None:
+            data = self.compressor.compress(body) if body else b""
+            if not more_body:
+                data += self.compressor.finish()
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        self.buffer.append(body)
+        self.buffered_size += len(body)
+
+        if self.buffered_size < self.minimum_size:
+            if not more_body:
+                # 响应结束仍未达到阈值，原样发送
+                await self._flush_uncompressed(False)
+            return
+
+        if not more_body:
+            # 完整响应一次性压缩
+            compressed = compress_body(b"".join(self.buffer), self.encoding)
+            self.buffer = []
+            self.start_message = {**self.start_message, "headers": self._headers(len(compressed))}
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": compressed, "more_body": False})
+            return
+
+        # 分块响应超过阈值，改为增量压缩
+        self.compressor = _Compressor(self.encoding)
+        data = self.compressor.compress(b"".join(self.buffer))
+        self.buffer = []
+        await self.send({**self.start_message, "headers": self._headers(None)})
+        await self.send({"type": "http.response.body", "body": data, "more_body": True})
@@ -0,0 +1,91 @@
+"""
+条件请求模块
+根据表版本号（table_generations，由写入触发器维护）和更新时间生成ETag/Last-Modified，未变化的资源直接返回304
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, List, Optional
+
+from fastapi import Request, Response
+
+
+def table_generation(conn, tables: List[str]) -> Optional[str]:
+    """
+    获取一组表的版本号
+
+    Args:
+        conn: SQLite连接
+        tables: 表名列表
+
+    Returns:
+        各表版本号拼接的字符串；存在未建立版本号触发器的表时返回None（无法判断是否变化）
+    """
+    cursor = conn.cursor()
+    placeholders = ",".join("?" * len(tables))
+    # 每个表的三个版本号触发器同时创建，检查其中一个即可
+    cursor.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})",
+        [f"trg_{table}_generation_delete" for table in tables]
+    )
+    if cursor.fetchone()[0] != len(set(tables)):
+        return None
+
+    cursor.execute(
+        f"SELECT table_name, generation FROM table_generations WHERE table_name IN ({placeholders})",
+        tables
+    )
+    generations = {row[0]: row[1] for row in cursor.fetchall()}
+    return "-".join(str(generations.get(table, 0)) for table in tables)
+
+
+def make_etag(*parts) -> str:
+    """由资源标识和版本信息生成弱ETag（压缩前后内容等价，使用弱校验）"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def http_date(timestamp) -> Optional[str]:
+    """将SQLite中的本地时间文本转换为HTTP日期，无法解析时返回None"""
+    if not timestamp:
+        return None
+    try:
+        value = timestamp if isinstance(timestamp, datetime) else datetime.fromisoformat(str(timestamp))
+    except ValueError:
+        return None
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _opaque(etag: str) -> str:
+    """去掉弱校验前缀，弱比较时只比较标签值"""
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[str] = None) -> bool:
+    """判断客户端缓存是否仍然有效（If-None-Match优先于If-Modified-Since）"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+        return "*" in candidates or _opaque(etag) in {_opaque(candidate) for candidate in candidates}
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def validator_headers(etag: str, last_modified: Optional[str] = None) -> Dict[str, str]:
+    """生成缓存校验响应头（no-cache：客户端可以缓存，但每次使用前需要重新校验）"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    return headers
+
+
+def not_modified_response(etag: str, last_modified: Optional[str] = None) -> Response:
+    """返回304响应"""
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
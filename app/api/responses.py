@@ -0,0 +1,43 @@
+"""
+快速JSON响应模块
+直接将字典编码为JSON字节，跳过FastAPI的jsonable_encoder；安装orjson时使用orjson，否则回退到标准库json
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _default(value: Any):
+    """标准库json无法直接编码的类型"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    raise TypeError(f"无法序列化类型: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """将内容编码为UTF-8 JSON字节"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """快速JSON响应（内容应为由数据库行直接构建的字典/列表）"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
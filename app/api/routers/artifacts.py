@@ -1,36 +1,86 @@
 """资料管理API路由"""
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import Any, List, Optional, Tuple
 from datetime import datetime
 import time
 import json
+import base64
 
 from app.models.schemas import ArtifactCreate, ArtifactResponse, ArtifactListResponse
+from app.api.responses import FastJSONResponse
+from app.api.conditional import (
+    table_generation, make_etag, http_date, is_not_modified, validator_headers, not_modified_response
+)
 from app.api.dependencies import DatabaseDep
-from app.services.vector_sync import vector_sync_service
+from app.core.database import GENERATION_TABLES
+from app.services.vector_outbox import vector_outbox_worker, enqueue_vector_sync, OUTBOX_DELETE
+from app.services.enrichment import enrichment_queue
+from app.services.artifact_projection import parse_fields, select_columns, needs_content, row_to_dict, DEFAULT_SNIPPET_LENGTH
 from app.core.logger_manager import log, LogType
 
 router = APIRouter(prefix="/api/v1", tags=["资料管理"])
 
+# 未指定fields时资料列表返回的字段
+_DEFAULT_LIST_FIELDS = ["id", "title", "content", "category", "created_at", "updated_at", "is_active"]
+
+# 关联资料内容表（正文、标签、元数据）
+_CONTENT_JOIN = " LEFT JOIN artifact_contents c ON c.artifact_id = a.id"
+
+# 资料接口的ETag取决于这些表的版本号
+_ETAG_TABLES = list(GENERATION_TABLES)
+
+
+def _encode_cursor(created_at, artifact_id: int) -> str:
+    """将最后一条记录的排序键编码为分页游标"""
+    raw = json.dumps([created_at, artifact_id], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[Any, int]:
+    """解析分页游标，格式错误时返回400"""
+    try:
+        created_at, artifact_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        return created_at, int(artifact_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+
+
 @router.get("/artifacts", response_model=ArtifactListResponse)
 async def get_artifacts(
+    request: Request,
     db: DatabaseDep,
     page: int = Query(1, ge=1, description="页码"),
     size: int = Query(10, ge=1, le=100, description="每页大小"),
     keyword: Optional[str] = Query(None, description="搜索关键词"),
-    category: Optional[str] = Query(None, description="分类筛选")
+    category: Optional[str] = Query(None, description="分类筛选"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的next_cursor），提供时忽略page"),
+    count: str = Query("exact", pattern="^(exact|none)$", description="总数统计方式：exact（精确统计）或 none（不统计）"),
+    fields: Optional[str] = Query(None, description="返回字段（逗号分隔），可包含snippet返回关键词附近的内容摘要，为空时返回默认字段"),
+    snippet_length: int = Query(DEFAULT_SNIPPET_LENGTH, ge=20, le=2000, description="内容摘要长度（字符）")
 ):
-    """获取资料列表"""
+    """获取资料列表（支持页码分页和按 (created_at, id) 的游标分页）"""
     try:
-        log(f"SQLite - 开始获取资料列表，页码: {page}, 每页大小: {size}, 关键词: {keyword}, 分类: {category}", LogType.DATABASE, "INFO")
-        cursor = db["sqlite"].cursor()
+        log(f"SQLite - 开始获取资料列表，页码: {page}, 每页大小: {size}, 关键词: {keyword}, 分类: {category}, 游标: {cursor}, 字段: {fields}", LogType.DATABASE, "INFO")
+        position = _decode_cursor(cursor) if cursor else None
+        try:
+            projection = parse_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        # 条件请求：资料表未发生写入时，相同查询参数的结果不变，直接返回304
+        generation = table_generation(db["sqlite"], _ETAG_TABLES)
+        etag = make_etag("artifacts", generation, request.url.query) if generation is not None else None
+        if etag and is_not_modified(request, etag):
+            return not_modified_response(etag)
+        
+        db_cursor = db["sqlite"].cursor()
         
         # 构建查询条件
         conditions = []
         params = []
         
         if keyword:
-            conditions.append("(a.title LIKE ? OR a.content LIKE ?)")
+            conditions.append("(a.title LIKE ? OR c.content LIKE ?)")
             params.extend([f"%{keyword}%", f"%{keyword}%"])
         
         if category:
@@ -41,51 +91,71 @@ async def get_artifacts(
         where_clause = ""
         if conditions:
             where_clause = " AND ".join(conditions)
-        
-        # 获取总数
-        count_query = f"SELECT COUNT(*) FROM artifacts a"
-        if where_clause:
-            count_query += f" WHERE {where_clause}"
-        cursor.execute(count_query, params)
-        total_count = cursor.fetchone()[0]
-        
-        # 获取分页数据
-        offset = (page - 1) * size
+        # 只有按关键词搜索正文时筛选才需要读取资料内容表
+        filter_join = _CONTENT_JOIN if keyword else ""
+        
+        # 获取总数（count=none时跳过，避免每页重复扫描）
+        total_count = None
+        if count == "exact":
+            count_query = f"SELECT COUNT(*) FROM artifacts a{filter_join}"
+            if where_clause:
+                count_query += f" WHERE {where_clause}"
+            db_cursor.execute(count_query, params)
+            total_count = db_cursor.fetchone()[0]
+        
+        # 游标分页：从上一页最后一条记录之后继续读取，代价与页数无关
+        data_conditions = list(conditions)
+        data_params = list(params)
+        if position is not None:
+            data_conditions.append("(a.created_at, a.id) < (?, ?)")
+            data_params.extend(position)
+        
+        # 先在资料表上确定当前页的ID，再只为这一页关联正文；指定字段时只读取对应列
+        page_query = f"SELECT a.id FROM artifacts a{filter_join}"
+        if data_conditions:
+            page_query += f" WHERE {' AND '.join(data_conditions)}"
+        page_query += " ORDER BY a.created_at DESC, a.id DESC LIMIT ?"
+        data_params.append(size)
+        if position is None:
+            page_query += " OFFSET ?"
+            data_params.append((page - 1) * size)
+        
+        selected_fields = projection or _DEFAULT_LIST_FIELDS
+        columns, column_params = select_columns(selected_fields, keyword, snippet_length)
+        content_join = _CONTENT_JOIN if needs_content(selected_fields) else ""
         data_query = f"""
-            SELECT id, title, content, source_type, source_path, category, tags, metadata, created_at, updated_at, is_active
-            FROM artifacts a
+            SELECT {columns}, a.created_at, a.id
+            FROM ({page_query}) p JOIN artifacts a ON a.id = p.id{content_join}
+            ORDER BY a.created_at DESC, a.id DESC
         """
-        if where_clause:
-            data_query += f" WHERE {where_clause}"
-        data_query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
-        params.extend([size, offset])
-        cursor.execute(data_query, params)
+        db_cursor.execute(data_query, column_params + data_params)
+        rows = db_cursor.fetchall()
         
+        # 满页时返回下一页游标（排序键位于每行末尾两列）
+        next_cursor = _encode_cursor(rows[-1][-2], rows[-1][-1]) if len(rows) == size else None
+        
+        # 数据来自本地数据库，直接构建字典并编码，不再逐条经过模型校验
         artifacts = []
-        for row in cursor.fetchall():
-            # 确保行数据足够长，防止索引越界
-            if len(row) < 11:
-                # 如果行数据不足，跳过这条记录或使用默认值
-                continue
-            artifacts.append(ArtifactResponse(
-                id=row[0] if row[0] is not None else int(time.time()*1000) % 1000000,
-                title=row[1],
-                content=row[2],
-                category=row[5] or "",
-                created_at=row[8],
-                updated_at=row[9],
-                is_active=bool(row[10]) if row[10] is not None else True
-            ))
+        for row in rows:
+            values = row_to_dict(selected_fields, row, keyword, snippet_length)
+            if not projection:
+                values["category"] = values["category"] or ""
+                if values["is_active"] is None:
+                    values["is_active"] = True
+            artifacts.append(values)
         
         log(f"SQLite - 获取资料列表成功，共 {total_count} 条，返回 {len(artifacts)} 条", LogType.DATABASE, "INFO")
         
-        return ArtifactListResponse(
-            artifacts=artifacts,
-            total_count=total_count,
-            page=page,
-            size=size
-        )
+        return FastJSONResponse({
+            "artifacts": artifacts,
+            "total_count": total_count,
+            "page": page,
+            "size": size,
+            "next_cursor": next_cursor
+        }, headers=validator_headers(etag) if etag else None)
         
+    except HTTPException:
+        raise
     except Exception as e:
         log(f"SQLite - 获取资料列表失败: {str(e)}", LogType.DATABASE, "ERROR")
         raise HTTPException(status_code=500, detail=f"获取资料列表失败: {str(e)}")
@@ -103,21 +173,15 @@ async def create_artifact(artifact: ArtifactCreate, db: DatabaseDep):
         
         # 插入资料
         cursor.execute("""
-            INSERT INTO artifacts (title, content, category, tags, metadata, source_type, source_path, is_active, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, 1, datetime('now', 'localtime'), datetime('now', 'localtime'))
+            INSERT INTO artifacts (title, category, source_type, source_path, is_active, created_at, updated_at)
+            VALUES (?, ?, ?, ?, 1, datetime('now', 'localtime'), datetime('now', 'localtime'))
         """, (
             artifact.title, 
-            artifact.content, 
             artifact.category,
-            tags_str,
-            metadata_str,
             artifact.source_type,
             artifact.source_path
         ))
         
-        db["sqlite"].commit()
-        log(f"SQLite - 创建资料成功，获取插入ID", LogType.DATABASE, "INFO")
-        
         # 获取插入的ID
         artifact_id = cursor.lastrowid
         if artifact_id is None:
@@ -130,11 +194,23 @@ async def create_artifact(artifact: ArtifactCreate, db: DatabaseDep):
                 # 如果还是获取不到，生成临时ID
                 artifact_id = int(time.time() * 1000) % 1000000
         
-        # 返回创建的资料
         cursor.execute("""
-            SELECT id, title, content, category, tags, metadata, source_type, source_path, created_at, updated_at, is_active
-            FROM artifacts
-            WHERE rowid = ?
+            INSERT INTO artifact_contents (artifact_id, content, tags, metadata)
+            VALUES (?, ?, ?, ?)
+        """, (artifact_id, artifact.content, tags_str, metadata_str))
+        
+        # 向量同步记录与资料在同一事务中提交，由后台任务同步到向量数据库
+        enqueue_vector_sync(cursor, artifact_id)
+        db["sqlite"].commit()
+        vector_outbox_worker.notify()
+        enrichment_queue.submit(artifact_id)
+        log(f"SQLite - 创建资料成功，ID: {artifact_id}", LogType.DATABASE, "INFO")
+        
+        # 返回创建的资料
+        cursor.execute(f"""
+            SELECT a.id, a.title, c.content, a.category, c.tags, c.metadata, a.source_type, a.source_path, a.created_at, a.updated_at, a.is_active
+            FROM artifacts a{_CONTENT_JOIN}
+            WHERE a.id = ?
         """, (artifact_id,))
         
         row = cursor.fetchone()
@@ -186,33 +262,6 @@ async def create_artifact(artifact: ArtifactCreate, db: DatabaseDep):
                 is_active=True
             )
         
-        # 异步同步到向量数据库
-        try:
-            import asyncio
-            # 确保ID是整数类型
-            artifact_id_for_sync = artifact_id_result if isinstance(artifact_id_result, int) else int(artifact_id_result)
-            
-            # 创建一个安全的异步任务包装器
-            async def safe_sync():
-                try:
-                    await vector_sync_service.sync_artifact_to_vector_db(
-                        artifact_id_for_sync,
-                        artifact.title,
-                        artifact.content,
-                        artifact.category or ""
-                    )
-                except Exception as sync_error:
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    logger.error(f"向量同步失败: {str(sync_error)}", exc_info=True)
-            
-            asyncio.create_task(safe_sync())
-        except Exception as ve:
-            # 向量同步失败不影响主流程，仅记录错误
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"创建向量同步任务失败: {str(ve)}", exc_info=True)
-        
         log(f"SQLite - 创建资料完成，ID: {artifact_id}", LogType.DATABASE, "INFO")
         return response
         
@@ -222,15 +271,28 @@ async def create_artifact(artifact: ArtifactCreate, db: DatabaseDep):
         raise HTTPException(status_code=500, detail=f"创建资料失败: {str(e)}")
 
 @router.get("/artifacts/{artifact_id}", response_model=ArtifactResponse)
-async def get_artifact(artifact_id: int, db: DatabaseDep):
-    """获取指定资料"""
+async def get_artifact(artifact_id: int, db: DatabaseDep, request: Request = None, response: Response = None):
+    """获取指定资料（支持ETag/Last-Modified条件请求，内部调用时不传request）"""
     try:
         log(f"SQLite - 开始获取指定资料，ID: {artifact_id}", LogType.DATABASE, "INFO")
         cursor = db["sqlite"].cursor()
-        cursor.execute("""
-            SELECT id, title, content, category, created_at, updated_at, is_active
-            FROM artifacts
-            WHERE id = ?
+        
+        # 条件请求：先只读取更新时间和表版本号，资料未变化时不读取正文直接返回304
+        etag = last_modified = None
+        if request is not None:
+            cursor.execute("SELECT updated_at FROM artifacts WHERE id = ?", (artifact_id,))
+            current = cursor.fetchone()
+            generation = table_generation(db["sqlite"], _ETAG_TABLES)
+            if current and generation is not None:
+                etag = make_etag("artifact", artifact_id, current[0], generation)
+                last_modified = http_date(current[0])
+                if is_not_modified(request, etag, last_modified):
+                    return not_modified_response(etag, last_modified)
+        
+        cursor.execute(f"""
+            SELECT a.id, a.title, c.content, a.category, a.created_at, a.updated_at, a.is_active
+            FROM artifacts a{_CONTENT_JOIN}
+            WHERE a.id = ?
         """, (artifact_id,))
         
         row = cursor.fetchone()
@@ -243,6 +305,8 @@ async def get_artifact(artifact_id: int, db: DatabaseDep):
             raise HTTPException(status_code=500, detail="数据库记录格式错误")
         
         log(f"SQLite - 获取资料成功，ID: {artifact_id}, 标题: {row[1][:30]}...", LogType.DATABASE, "INFO")
+        if etag and response is not None:
+            response.headers.update(validator_headers(etag, last_modified))
         return ArtifactResponse(
             id=row[0],
             title=row[1],
@@ -267,7 +331,7 @@ async def update_artifact(artifact_id: int, artifact: ArtifactCreate, db: Databa
         cursor = db["sqlite"].cursor()
         
         # 检查资料是否存在
-        cursor.execute("SELECT id, title, content, category FROM artifacts WHERE id = ? AND is_active = 1", (artifact_id,))
+        cursor.execute("SELECT id FROM artifacts WHERE id = ? AND is_active = 1", (artifact_id,))
         existing_artifact = cursor.fetchone()
         if not existing_artifact:
             log(f"SQLite - 资料不存在，ID: {artifact_id}", LogType.DATABASE, "WARNING")
@@ -276,41 +340,24 @@ async def update_artifact(artifact_id: int, artifact: ArtifactCreate, db: Databa
         # 更新资料
         cursor.execute("""
             UPDATE artifacts
-            SET title = ?, content = ?, category = ?, updated_at = datetime('now', 'localtime')
+            SET title = ?, category = ?, updated_at = datetime('now', 'localtime')
             WHERE id = ?
-        """, (artifact.title, artifact.content, artifact.category, artifact_id))
+        """, (artifact.title, artifact.category, artifact_id))
+        cursor.execute("""
+            INSERT INTO artifact_contents (artifact_id, content) VALUES (?, ?)
+            ON CONFLICT(artifact_id) DO UPDATE SET content = excluded.content
+        """, (artifact_id, artifact.content))
         
+        # 向量同步记录与资料在同一事务中提交，由后台任务同步到向量数据库
+        enqueue_vector_sync(cursor, artifact_id)
         db["sqlite"].commit()
+        vector_outbox_worker.notify()
+        enrichment_queue.submit(artifact_id)
         log(f"SQLite - 更新资料成功，ID: {artifact_id}", LogType.DATABASE, "INFO")
         
         # 返回更新后的资料
         updated_artifact = await get_artifact(artifact_id, db)
         
-        # 异步同步到向量数据库
-        try:
-            import asyncio
-            
-            # 创建一个安全的异步任务包装器
-            async def safe_sync():
-                try:
-                    await vector_sync_service.sync_artifact_to_vector_db(
-                        artifact_id,
-                        artifact.title,
-                        artifact.content,
-                        artifact.category or ""
-                    )
-                except Exception as sync_error:
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    logger.error(f"向量同步失败: {str(sync_error)}", exc_info=True)
-            
-            asyncio.create_task(safe_sync())
-        except Exception as ve:
-            # 向量同步失败不影响主流程，仅记录错误
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"创建向量同步任务失败: {str(ve)}", exc_info=True)
-        
         log(f"SQLite - 更新资料完成，ID: {artifact_id}", LogType.DATABASE, "INFO")
         return updated_artifact
         
@@ -334,31 +381,13 @@ async def delete_artifact(artifact_id: int, db: DatabaseDep):
             log(f"SQLite - 资料不存在，ID: {artifact_id}", LogType.DATABASE, "WARNING")
             raise HTTPException(status_code=404, detail="资料不存在")
         
-        # 物理删除资料
+        # 物理删除资料（资料内容由触发器一并删除）
         cursor.execute("DELETE FROM artifacts WHERE id = ?", (artifact_id,))
+        enqueue_vector_sync(cursor, artifact_id, OUTBOX_DELETE)
         db["sqlite"].commit()
+        vector_outbox_worker.notify()
         log(f"SQLite - 删除资料成功，ID: {artifact_id}", LogType.DATABASE, "INFO")
         
-        # 异步从向量数据库中移除
-        try:
-            import asyncio
-            
-            # 创建一个安全的异步任务包装器
-            async def safe_remove():
-                try:
-                    await vector_sync_service.remove_artifact_from_vector_db(artifact_id)
-                except Exception as remove_error:
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    logger.error(f"从向量数据库移除失败: {str(remove_error)}", exc_info=True)
-            
-            asyncio.create_task(safe_remove())
-        except Exception as ve:
-            # 向量移除失败不影响主流程，仅记录错误
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"创建向量移除任务失败: {str(ve)}", exc_info=True)
-        
         return {"success": True, "message": "资料删除成功"}
         
     except HTTPException:
@@ -277,8 +277,8 @@ async def update_config(config_data: Dict[str, Any]):
 async def test_llm_config(config_data: Dict[str, Any]):
     """测试LLM配置连接"""
     try:
-        from openai import OpenAI
-        import httpx
+        from openai import AsyncOpenAI
+        from app.services.http_pool import http_pool
         
         # 使用传入的配置参数测试连接
         service_type = config_data.get("service_type", "openai-compatible")
@@ -288,15 +288,16 @@ async def test_llm_config(config_data: Dict[str, Any]):
         
         # 创建临时的OpenAI客户端进行测试
         try:
-            client = OpenAI(
+            client = AsyncOpenAI(
                 base_url=api_base,
                 api_key=api_key,
-                timeout=10.0,
-                http_client=httpx.Client(limits=httpx.Limits(max_connections=10, max_keepalive_connections=5))
+                timeout=http_pool.build_timeout(10.0),
+                max_retries=0,
+                http_client=http_pool.get_client()
             )
             
             # 尝试发送一个简单的测试请求
-            response = client.chat.completions.create(
+            response = await client.chat.completions.create(
                 model=model,
                 messages=[{
                     "role": "user", 
@@ -335,8 +336,8 @@ async def test_llm_config(config_data: Dict[str, Any]):
 async def test_embedding_config(config_data: Dict[str, Any]):
     """测试Embedding配置连接"""
     try:
-        from openai import OpenAI
-        import httpx
+        from openai import AsyncOpenAI
+        from app.services.http_pool import http_pool
         
         # 使用传入的配置参数测试连接
         service_type = config_data.get("service_type", "openai-compatible")
@@ -348,16 +349,17 @@ async def test_embedding_config(config_data: Dict[str, Any]):
         
         # 创建临时的OpenAI客户端进行测试
         try:
-            client = OpenAI(
+            client = AsyncOpenAI(
                 base_url=api_base,
                 api_key=api_key,
-                timeout=min(timeout, 30.0),  # 测试连接时最多等待30秒
-                http_client=httpx.Client(limits=httpx.Limits(max_connections=10, max_keepalive_connections=5))
+                timeout=http_pool.build_timeout(min(timeout, 30.0)),  # 测试连接时最多等待30秒
+                max_retries=0,
+                http_client=http_pool.get_client()
             )
             
             # 尝试发送一个简单的测试请求
             test_text = "这是测试文本"
-            response = client.embeddings.create(
+            response = await client.embeddings.create(
                 model=model,
                 input=test_text
             )
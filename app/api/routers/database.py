@@ -1,16 +1,33 @@
 """数据库管理API路由"""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 from app.api.dependencies import DatabaseDep
+from app.api.conditional import table_generation, make_etag, is_not_modified, validator_headers, not_modified_response
+from app.core.config import config
 from app.core.database import db_manager
 from app.core.logger_manager import log, LogType
-from app.core.table_operations import TableOperationService
+from app.core.table_operations import SERVICE_MANAGED_TABLES, TableOperationService
 from app.core.table_config import get_table_config, get_all_table_configs
+from app.services.vector_transfer import bulk_upsert, vector_transfer_service
 
 router = APIRouter(prefix="/api/v1", tags=["数据库管理"])
 
+# 单次按ID查询ChromaDB的最大ID数量
+_ID_LOOKUP_CHUNK_SIZE = 500
+
+
+def _existing_ids(collection, ids: List[str]) -> set:
+    """按ID精确查询ChromaDB，返回其中已存在的ID（不读取文档、元数据和向量）"""
+    existing = set()
+    unique_ids = list(dict.fromkeys(ids))
+    for start in range(0, len(unique_ids), _ID_LOOKUP_CHUNK_SIZE):
+        result = collection.get(ids=unique_ids[start:start + _ID_LOOKUP_CHUNK_SIZE], include=[])
+        existing.update(result.get("ids", []) or [])
+    return existing
+
+
 
 # SQLite数据库管理接口
 @router.get("/sqlite/tables")
@@ -54,15 +71,25 @@ async def get_sqlite_tables(
 @router.get("/sqlite/tables/{table_name}")
 async def get_sqlite_table_data(
     table_name: str,
+    request: Request,
+    response: Response,
     db: DatabaseDep,
     page: int = 1,
     size: int = 20
 ):
-    """获取SQLite表数据"""
+    """获取SQLite表数据（支持ETag条件请求，表未发生写入时返回304）"""
     try:
         # 初始化表操作服务
         table_service = TableOperationService(db["sqlite"], get_all_table_configs())
         
+        etag = None
+        if table_service.is_valid_user_table(table_name):
+            generation = table_generation(db["sqlite"], [table_name])
+            if generation is not None:
+                etag = make_etag("sqlite_table", table_name, generation, page, size)
+                if is_not_modified(request, etag):
+                    return not_modified_response(etag)
+        
         # 获取表数据
         result = table_service.get_table_data(table_name, page, size)
         
@@ -80,6 +107,8 @@ async def get_sqlite_table_data(
                     "type": field['type']
                 })
         
+        if etag:
+            response.headers.update(validator_headers(etag))
         return {
             "data": {
                 "records": result['data'],
@@ -97,6 +126,13 @@ async def get_sqlite_table_data(
         raise HTTPException(status_code=500, detail=f"获取表数据失败: {str(e)}")
 
 
+def _read_only_detail(table_name: str) -> str:
+    """只读表写入请求的错误信息"""
+    if table_name in SERVICE_MANAGED_TABLES:
+        return f"表 {table_name} 由资料接口维护，请使用 /api/v1/artifacts 创建、修改或删除资料"
+    return f"表 {table_name} 为只读"
+
+
 @router.post("/sqlite/tables/{table_name}")
 async def create_sqlite_record(
     table_name: str,
@@ -108,14 +144,9 @@ async def create_sqlite_record(
         # 初始化表操作服务
         table_service = TableOperationService(db["sqlite"], get_all_table_configs())
         
-        # 为资料表添加默认值
-        if table_name == "artifacts":
-            if "created_at" not in data:
-                data["created_at"] = datetime.now().isoformat()
-            if "updated_at" not in data:
-                data["updated_at"] = datetime.now().isoformat()
-            if "is_active" not in data:
-                data["is_active"] = 1
+        # 资料表由资料接口维护（正文存放在资料内容表并需同步向量），不允许在此创建
+        if table_service.is_read_only(table_name):
+            raise HTTPException(status_code=403, detail=_read_only_detail(table_name))
         
         # 创建记录
         result = table_service.create_record(table_name, data)
@@ -146,9 +177,8 @@ async def update_sqlite_record(
         # 初始化表操作服务
         table_service = TableOperationService(db["sqlite"], get_all_table_configs())
         
-        # 为资料表更新updated_at
-        if table_name == "artifacts":
-            data["updated_at"] = datetime.now().isoformat()
+        if table_service.is_read_only(table_name):
+            raise HTTPException(status_code=403, detail=_read_only_detail(table_name))
         
         # 移除ID字段（不允许更新）
         if "id" in data:
@@ -187,6 +217,9 @@ async def delete_sqlite_record(
         # 初始化表操作服务
         table_service = TableOperationService(db["sqlite"], get_all_table_configs())
         
+        if table_service.is_read_only(table_name):
+            raise HTTPException(status_code=403, detail=_read_only_detail(table_name))
+        
         # 删除记录
         result = table_service.delete_record(table_name, record_id)
         
@@ -250,60 +283,44 @@ async def clear_sqlite_database():
 @router.get("/chromadb/documents")
 async def get_chromadb_documents(
     db: DatabaseDep,
-    page: int = 1,
-    size: int = 20
+    page: int = Query(1, ge=1, description="页码"),
+    size: int = Query(20, ge=1, le=200, description="每页大小")
 ):
-    """获取ChromaDB文档列表"""
+    """获取ChromaDB文档列表（分页在ChromaDB中完成，列表不返回向量数据）"""
     try:
         if not db["collection"]:
             raise HTTPException(status_code=400, detail="ChromaDB集合未初始化")
         
-        # 获取所有文档，包括documents字段
-        result = db["collection"].get(include=["embeddings", "documents", "metadatas"])
+        collection = db["collection"]
+        total = collection.count()
         
-        if not result or "ids" not in result:
-            log(f"ChromaDB - 结果为空或缺少ids字段", LogType.DATABASE, "INFO")
-            return {
-                "data": {
-                    "records": [],
-                    "total": 0,
-                    "page": page,
-                    "size": size
-                }
-            }
+        # 只读取当前页，且不包含embeddings，避免每次翻页传输整个集合的向量
+        result = collection.get(
+            limit=size,
+            offset=(page - 1) * size,
+            include=["documents", "metadatas"]
+        )
         
         # 确保所有字段都是列表，避免NoneType错误
-        ids_list = result.get("ids", []) or []
-        documents_list = result.get("documents", []) or []
-        metadatas_list = result.get("metadatas", []) or []
-        embeddings_list = result.get("embeddings", []) or []
-        
-        log(f"ChromaDB - ids数量: {len(ids_list)}, documents数量: {len(documents_list)}, metadatas数量: {len(metadatas_list)}, embeddings数量: {len(embeddings_list)}", LogType.DATABASE, "INFO")
+        ids_list = (result or {}).get("ids", []) or []
+        documents_list = (result or {}).get("documents", []) or [None] * len(ids_list)
+        metadatas_list = (result or {}).get("metadatas", []) or [None] * len(ids_list)
         
         # 构建文档列表（只使用ChromaDB中的数据，不依赖SQLite）
-        documents = []
-        
-        for i, (doc_id, document, metadata) in enumerate(zip(ids_list, documents_list, metadatas_list)):
-            # 只返回是否有向量的布尔值，不返回完整的向量数据
-            has_embedding = i < len(embeddings_list) and embeddings_list[i] is not None
-            
-            # 直接使用ChromaDB中的数据，包括documents字段
-            documents.append({
+        # ChromaDB中的每条记录都带有向量，完整向量通过单条文档接口获取
+        documents = [
+            {
                 "id": doc_id,
                 "document": document or "",
                 "metadata": metadata or {},
-                "has_embedding": has_embedding
-            })
-        
-        # 分页
-        total = len(documents)
-        start = (page - 1) * size
-        end = start + size
-        paginated_docs = documents[start:end]
+                "has_embedding": True
+            }
+            for doc_id, document, metadata in zip(ids_list, documents_list, metadatas_list)
+        ]
         
         return {
             "data": {
-                "records": paginated_docs,
+                "records": documents,
                 "total": total,
                 "page": page,
                 "size": size
@@ -376,11 +393,12 @@ async def search_chromadb_documents(
         
         # 使用外部Embedding API生成查询向量
         from app.services.ai_clients import embedding_client
+        from app.services.rate_limiter import PRIORITY_INTERACTIVE
         
         log("开始执行ChromaDB向量搜索", LogType.DATABASE, "INFO")
         
         # 生成查询向量
-        query_embedding = await embedding_client.embed(query)
+        query_embedding = await embedding_client.embed(query, priority=PRIORITY_INTERACTIVE)
         log(f"生成查询向量成功，维度: {len(query_embedding)}", LogType.DATABASE, "INFO")
         
         # 执行向量搜索（不获取documents，从SQLite查询）
@@ -403,9 +421,9 @@ async def search_chromadb_documents(
         if artifact_ids:
             placeholders = ','.join(['?' for _ in artifact_ids])
             cursor.execute(f"""
-                SELECT id, title, content, category, created_at, updated_at, is_active
-                FROM artifacts
-                WHERE id IN ({placeholders}) AND is_active = 1
+                SELECT a.id, a.title, c.content, a.category, a.created_at, a.updated_at, a.is_active
+                FROM artifacts a LEFT JOIN artifact_contents c ON c.artifact_id = a.id
+                WHERE a.id IN ({placeholders}) AND a.is_active = 1
             """, artifact_ids)
             sqlite_results = {row[0]: row for row in cursor.fetchall()}
         
@@ -421,8 +439,9 @@ async def search_chromadb_documents(
             
             # 只添加相似度大于等于阈值的结果
             if similarity >= threshold:
-                # 从SQLite获取完整的资料信息
-                sqlite_row = sqlite_results.get(int(doc_id)) if doc_id.isdigit() else None
+                # 从SQLite获取完整的资料信息（切片向量按元数据中的artifact_id关联资料）
+                artifact_id = (metadata or {}).get('artifact_id')
+                sqlite_row = sqlite_results.get(int(artifact_id)) if artifact_id else None
                 
                 if sqlite_row:
                     documents.append({
@@ -466,15 +485,8 @@ async def check_document_id_exists(
         if not db["collection"]:
             raise HTTPException(status_code=400, detail="ChromaDB集合未初始化")
         
-        # 获取所有文档ID
-        result = db["collection"].get(include=["documents"])
-        if not result or "ids" not in result:
-            return {
-                "exists": False
-            }
-        
-        # 检查ID是否存在
-        exists = document_id in result["ids"]
+        # 按ID精确查询，不读取文档内容和向量
+        exists = document_id in _existing_ids(db["collection"], [document_id])
         
         return {
             "exists": exists
@@ -487,6 +499,286 @@ async def check_document_id_exists(
         raise HTTPException(status_code=500, detail=f"检查文档ID失败: {str(e)}")
 
 
+@router.post("/chromadb/documents/exists")
+async def check_document_ids_exist(
+    data: Dict[str, Any],
+    db: DatabaseDep
+):
+    """批量检查ChromaDB文档ID是否存在"""
+    try:
+        if not db["collection"]:
+            raise HTTPException(status_code=400, detail="ChromaDB集合未初始化")
+        
+        ids = data.get("ids")
+        if not isinstance(ids, list) or not all(isinstance(doc_id, str) for doc_id in ids):
+            raise HTTPException(status_code=400, detail="ids必须是字符串列表")
+        
+        existing = _existing_ids(db["collection"], ids)
+        
+        return {
+            "data": {
+                "exists": {doc_id: doc_id in existing for doc_id in ids},
+                "found": len(existing),
+                "missing": [doc_id for doc_id in dict.fromkeys(ids) if doc_id not in existing]
+            }
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        log(f"ChromaDB - 批量检查文档ID失败: {e}", LogType.DATABASE, "ERROR")
+        raise HTTPException(status_code=500, detail=f"批量检查文档ID失败: {str(e)}")
+
+
+@router.post("/chromadb/documents/bulk")
+async def bulk_upsert_chromadb_documents(
+    data: Dict[str, Any],
+    db: DatabaseDep
+):
+    """
+    批量写入ChromaDB文档
+    
+    请求体: {"documents": [{"id", "document", "embedding", "metadata"}, ...]}
+    未提供embedding的文档统一批量生成向量
+    """
+    try:
+        if not db["collection"]:
+            raise HTTPException(status_code=400, detail="ChromaDB集合未初始化")
+        
+        items = data.get("documents")
+        if not isinstance(items, list) or not items:
+            raise HTTPException(status_code=400, detail="documents必须是非空列表")
+        
+        ids, embeddings, documents, metadatas = [], [], [], []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not item.get("id"):
+                raise HTTPException(status_code=400, detail=f"第{index + 1}条文档缺少id")
+            if item.get("embedding") is None and not item.get("document"):
+                raise HTTPException(status_code=400, detail=f"第{index + 1}条文档的Embeddings和Documents至少填写一个")
+            ids.append(str(item["id"]))
+            embeddings.append(item.get("embedding"))
+            documents.append(item.get("document"))
+            metadatas.append(item.get("metadata"))
+        
+        if len(set(ids)) != len(ids):
+            raise HTTPException(status_code=400, detail="文档ID重复")
+        
+        # 缺少向量的文档批量生成
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            from app.services.ai_clients import embedding_client
+            log(f"ChromaDB - 开始为 {len(missing)} 条文档批量生成向量", LogType.DATABASE, "INFO")
+            vectors = await embedding_client.embed_batch([documents[i] for i in missing])
+            for index, vector in zip(missing, vectors):
+                embeddings[index] = vector
+        
+        chunks = bulk_upsert(db["collection"], ids, embeddings, documents, metadatas)
+        
+        log(f"ChromaDB - 批量写入文档成功，数量: {len(ids)}，生成向量: {len(missing)}，批次: {chunks}", LogType.DATABASE, "INFO")
+        
+        return {
+            "success": True,
+            "data": {
+                "upserted": len(ids),
+                "embedded": len(missing),
+                "chunks": chunks
+            }
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        log(f"ChromaDB - 批量写入文档失败: {e}", LogType.DATABASE, "ERROR")
+        raise HTTPException(status_code=500, detail=f"批量写入文档失败: {str(e)}")
+
+
+@router.post("/chromadb/documents/bulk/binary")
+async def bulk_upsert_chromadb_vectors_binary(
+    request: Request,
+    db: DatabaseDep
+):
+    """
+    以二进制格式批量写入预计算向量
+    
+    请求体格式（小端序）:
+    - 4字节无符号整数: JSON头长度
+    - JSON头: {"ids": [...], "dims": 1024, "documents": [...可选], "metadatas": [...可选]}
+    - float32矩阵: len(ids) * dims 个浮点数，按行排列
+    """
+    try:
+        if not db["collection"]:
+            raise HTTPException(status_code=400, detail="ChromaDB集合未初始化")
+        
+        import json
+        import struct
+        import numpy as np
+        
+        body = await request.body()
+        if len(body) < 4:
+            raise HTTPException(status_code=400, detail="请求体格式错误：缺少头部长度")
+        
+        header_length = struct.unpack("<I", body[:4])[0]
+        if len(body) < 4 + header_length:
+            raise HTTPException(status_code=400, detail="请求体格式错误：头部不完整")
+        
+        try:
+            header = json.loads(body[4:4 + header_length].decode("utf-8"))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"头部JSON解析失败: {str(e)}")
+        
+        ids = [str(doc_id) for doc_id in header.get("ids") or []]
+        dims = int(header.get("dims") or 0)
+        if not ids or dims <= 0:
+            raise HTTPException(status_code=400, detail="头部必须包含非空ids和正整数dims")
+        if len(set(ids)) != len(ids):
+            raise HTTPException(status_code=400, detail="文档ID重复")
+        
+        payload = memoryview(body)[4 + header_length:]
+        expected = len(ids) * dims * 4
+        if len(payload) != expected:
+            raise HTTPException(status_code=400, detail=f"向量数据长度错误，应为 {expected} 字节，实际 {len(payload)} 字节")
+        
+        matrix = np.frombuffer(payload, dtype="<f4").reshape(len(ids), dims)
+        
+        documents = header.get("documents") or [None] * len(ids)
+        metadatas = header.get("metadatas") or [None] * len(ids)
+        if len(documents) != len(ids) or len(metadatas) != len(ids):
+            raise HTTPException(status_code=400, detail="documents/metadatas数量必须与ids一致")
+        
+        chunks = bulk_upsert(db["collection"], ids, matrix, documents, metadatas)
+        
+        log(f"ChromaDB - 二进制批量写入向量成功，数量: {len(ids)}，维度: {dims}，批次: {chunks}", LogType.DATABASE, "INFO")
+        
+        return {
+            "success": True,
+            "data": {
+                "upserted": len(ids),
+                "dims": dims,
+                "chunks": chunks
+            }
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        log(f"ChromaDB - 二进制批量写入向量失败: {e}", LogType.DATABASE, "ERROR")
+        raise HTTPException(status_code=500, detail=f"二进制批量写入向量失败: {str(e)}")
+
+
+@router.post("/chromadb/documents/bulk/delete")
+async def bulk_delete_chromadb_documents(
+    data: Dict[str, Any],
+    db: DatabaseDep
+):
+    """批量删除ChromaDB文档，请求体: {"ids": [...]}"""
+    try:
+        if not db["collection"]:
+            raise HTTPException(status_code=400, detail="ChromaDB集合未初始化")
+        
+        ids = data.get("ids")
+        if not isinstance(ids, list) or not ids:
+            raise HTTPException(status_code=400, detail="ids必须是非空列表")
+        ids = list(dict.fromkeys(str(doc_id) for doc_id in ids))
+        
+        chunk_size = max(config.CHROMA_BULK_CHUNK_SIZE, 1)
+        chunks = 0
+        for start in range(0, len(ids), chunk_size):
+            db["collection"].delete(ids=ids[start:start + chunk_size])
+            chunks += 1
+        
+        log(f"ChromaDB - 批量删除文档成功，数量: {len(ids)}，批次: {chunks}", LogType.DATABASE, "INFO")
+        
+        return {
+            "success": True,
+            "data": {
+                "requested": len(ids),
+                "chunks": chunks
+            }
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        log(f"ChromaDB - 批量删除文档失败: {e}", LogType.DATABASE, "ERROR")
+        raise HTTPException(status_code=500, detail=f"批量删除文档失败: {str(e)}")
+
+
+@router.post("/chromadb/export")
+async def export_chromadb_vectors(data: Optional[Dict[str, Any]] = None):
+    """
+    导出当前向量集合为 .npy 矩阵 + .jsonl ID/元数据文件
+    
+    请求体（可选）: {"name": "导出文件名", "dtype": "float32" | "float16"}
+    """
+    try:
+        data = data or {}
+        task_id = vector_transfer_service.start_export(data.get("name"), data.get("dtype", "float32"))
+        
+        return {
+            "success": True,
+            "message": "向量导出任务已启动",
+            "task_id": task_id
+        }
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        log(f"ChromaDB - 向量导出启动失败: {e}", LogType.DATABASE, "ERROR")
+        raise HTTPException(status_code=500, detail=f"向量导出启动失败: {str(e)}")
+
+
+@router.post("/chromadb/import")
+async def import_chromadb_vectors(data: Dict[str, Any]):
+    """
+    从导出文件导入向量到当前集合
+    
+    请求体: {"name": "导出文件名", "force": false}；向量维度或向量模型与当前集合不一致时拒绝导入，force为true时跳过检查
+    """
+    try:
+        name = data.get("name")
+        if not name:
+            raise HTTPException(status_code=400, detail="缺少导出文件名")
+        
+        task_id = vector_transfer_service.start_import(name, force=bool(data.get("force", False)))
+        
+        return {
+            "success": True,
+            "message": "向量导入任务已启动",
+            "task_id": task_id
+        }
+        
+    except HTTPException:
+        raise
+    except (ValueError, FileNotFoundError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        log(f"ChromaDB - 向量导入启动失败: {e}", LogType.DATABASE, "ERROR")
+        raise HTTPException(status_code=500, detail=f"向量导入启动失败: {str(e)}")
+
+
+@router.get("/chromadb/exports")
+async def list_chromadb_exports():
+    """列出可导入的向量导出文件"""
+    return {
+        "data": {
+            "exports": vector_transfer_service.list_exports()
+        }
+    }
+
+
+@router.get("/chromadb/transfer/status/{task_id}")
+async def get_chromadb_transfer_status(task_id: str):
+    """获取向量导出/导入任务状态"""
+    status = vector_transfer_service.get_task_status(task_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    
+    return {
+        "success": True,
+        "data": status
+    }
+
+
 @router.post("/chromadb/documents")
 async def create_chromadb_document(
     data: Dict[str, Any],
@@ -502,9 +794,8 @@ async def create_chromadb_document(
         # 使用前端传递的ID或生成新ID
         doc_id = data.get("id", f"doc_{int(datetime.now().timestamp() * 1000)}")
         
-        # 检查ID是否已存在
-        result = db["collection"].get()
-        if result and "ids" in result and doc_id in result["ids"]:
+        # 检查ID是否已存在（按ID精确查询）
+        if doc_id in _existing_ids(db["collection"], [doc_id]):
             raise HTTPException(status_code=400, detail="文档ID已存在")
         
         # 检查是否提供了embedding
@@ -693,18 +984,13 @@ async def get_chromadb_info(
         if not db["collection"]:
             raise HTTPException(status_code=400, detail="ChromaDB集合未初始化")
         
-        # 获取集合信息
+        # 获取集合信息（文档数量由ChromaDB直接统计，无需读取文档）
         collection_info = {
-            "name": "artifact_embeddings",
-            "count": 0,
+            "name": db["collection"].name,
+            "count": db["collection"].count(),
             "dimension": 1024  # 默认向量维度
         }
         
-        # 获取文档数量（不获取embeddings，避免输出大量向量数据）
-        result = db["collection"].get(include=["documents"])
-        if result and "documents" in result:
-            collection_info["count"] = len(result["documents"])
-        
         return {
             "data": collection_info
         }
@@ -731,10 +1017,9 @@ async def get_chromadb_collections(
         # 构建集合列表
         collection_list = []
         for collection in collections:
-            # 获取集合文档数量（不获取embeddings，避免输出大量向量数据）
+            # 获取集合文档数量（由ChromaDB直接统计，无需读取文档）
             try:
-                result = collection.get(include=["documents"])
-                count = len(result["documents"]) if result and "documents" in result else 0
+                count = collection.count()
             except:
                 count = 0
             
@@ -766,23 +1051,17 @@ async def recreate_chromadb_collection(
             raise HTTPException(status_code=400, detail="ChromaDB客户端未初始化")
         
         # 删除现有集合
-        log("ChromaDB - 开始删除现有集合", LogType.DATABASE, "INFO")
+        collection_name = db["collection"].name if db["collection"] else config.CHROMA_COLLECTION_NAME
+        log(f"ChromaDB - 开始删除现有集合: {collection_name}", LogType.DATABASE, "INFO")
         try:
-            db["chroma"].delete_collection(name="artifact_embeddings")
+            db["chroma"].delete_collection(name=collection_name)
             log("ChromaDB - 删除集合成功", LogType.DATABASE, "INFO")
         except Exception as e:
             log(f"ChromaDB - 删除集合失败（可能不存在）: {e}", LogType.DATABASE, "WARNING")
         
         # 重新创建集合，使用预计算的向量
         log("ChromaDB - 开始创建新集合", LogType.DATABASE, "INFO")
-        new_collection = db["chroma"].create_collection(
-            name="artifact_embeddings",
-            metadata={
-                "description": "语义检索系统资料向量存储",
-                "use_precomputed_embeddings": "true"
-            },
-            embedding_function=None
-        )
+        new_collection = db_manager.create_collection(collection_name)
         
         # 更新数据库管理器中的集合引用
         db["collection"] = new_collection
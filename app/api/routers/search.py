@@ -1,235 +1,260 @@
 """检索API路由"""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from typing import List, Optional
+import asyncio
 import time
 from datetime import datetime
 
-from app.models.schemas import SearchRequest, SearchResult, SearchResponse
-from app.api.dependencies import DatabaseDep
+from app.models.schemas import SearchRequest, SearchResult, SearchResponse, AnswerRequest
+from app.api.responses import FastJSONResponse, dumps
+from app.api.dependencies import DatabaseDep, get_db
+from app.core.config import config
 from app.core.logger_manager import log, LogType
+from app.services.search_pipeline import SearchPipeline, STAGE_SUMMARY
+from app.services.artifact_projection import parse_fields
+from app.services.answer_context import build_context
 import logging
 
 router = APIRouter(prefix="/api/v1", tags=["检索服务"])
 
+
+def _record_search(db, query: str) -> int:
+    """记录检索历史，返回记录ID"""
+    cursor = db["sqlite"].cursor()
+    cursor.execute("""
+        INSERT INTO search_history (query, created_at)
+        VALUES (?, datetime('now', 'localtime'))
+    """, (query,))
+    db["sqlite"].commit()
+    return cursor.lastrowid
+
+
+def _finish_search(db, search_id: int, artifact_count: int, response_time: float):
+    """更新检索历史记录的结果数和响应时间"""
+    db["sqlite"].execute("""
+        UPDATE search_history 
+        SET artifact_count = ?, response_time = ?
+        WHERE id = ?
+    """, (artifact_count, response_time, search_id))
+    db["sqlite"].commit()
+
+
+def _record_failed_search(db, query: str):
+    """记录失败的检索历史"""
+    try:
+        db["sqlite"].execute("""
+            INSERT INTO search_history (query, response_time, created_at)
+            VALUES (?, -1, datetime('now', 'localtime'))
+        """, (query,))
+        db["sqlite"].commit()
+    except:
+        pass
+
+
+def _create_pipeline(search_request: SearchRequest, db) -> SearchPipeline:
+    """创建检索流水线，字段参数无效时返回400"""
+    try:
+        return SearchPipeline(search_request, db)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/search/retrieve")
 async def retrieve_documents(search_request: SearchRequest, db: DatabaseDep):
     """检索相关文档"""
-    start_time = time.time()
+    pipeline = _create_pipeline(search_request, db)
     
     try:
         # 记录用户调用API的详细参数
         log(f"收到检索请求，参数: query='{search_request.query}', top_k={search_request.top_k}, threshold={search_request.threshold}, category_filter={search_request.category_filter}", LogType.SERVER, "INFO")
         
-        # 记录检索历史
-        cursor = db["sqlite"].cursor()
-        cursor.execute("""
-            INSERT INTO search_history (query, created_at)
-            VALUES (?, datetime('now', 'localtime'))
-        """, (search_request.query,))
-        db["sqlite"].commit()
-        search_id = cursor.lastrowid
-        
-        # 检查是否可以使用向量数据库
-        chroma_client = db.get("chroma")
-        collection = db.get("collection")
-        
-        final_results = []
-        
-        # 启用向量搜索功能
-        if chroma_client and collection:
-            try:
-                from app.services.ai_clients import embedding_client
-                import asyncio
-                
-                log("开始执行向量搜索", LogType.SERVER, "INFO")
-                
-                from app.core.config import config
-                
-                # 生成查询向量
-                query_embedding = await embedding_client.embed(search_request.query)
-                log(f"生成查询向量成功，维度: {len(query_embedding)}", LogType.SERVER, "INFO")
-                log(f"配置文件中设置的向量维度: {config.EMBEDDING_DIMENSIONS}", LogType.SERVER, "INFO")
-                
-                # 执行向量搜索（不获取documents，从SQLite查询）
-                vector_results = collection.query(
-                    query_embeddings=[query_embedding],
-                    n_results=search_request.top_k,
-                    include=["distances", "metadatas"]
-                )
-                
-                log(f"向量搜索执行成功，返回 {len(vector_results['metadatas'][0])} 个结果", LogType.SERVER, "INFO")
-                
-                # 获取匹配的artifact_id列表
-                artifact_ids = []
-                for metadata in vector_results['metadatas'][0]:
-                    artifact_id = metadata.get('artifact_id') if metadata else None
-                    if artifact_id:
-                        artifact_ids.append(int(artifact_id))
-                
-                # 批量查询SQLite获取完整的资料信息
-                sqlite_results = {}
-                if artifact_ids:
-                    placeholders = ','.join(['?' for _ in artifact_ids])
-                    cursor.execute(f"""
-                        SELECT id, title, content, category, created_at, updated_at, is_active
-                        FROM artifacts
-                        WHERE id IN ({placeholders}) AND is_active = 1
-                    """, artifact_ids)
-                    
-                    sqlite_results = {row[0]: row for row in cursor.fetchall()}
-                
-                # 处理向量搜索结果
-                log(f"开始处理向量搜索结果，总结果数: {len(vector_results['metadatas'][0])}", LogType.SERVER, "INFO")
-                
-                for i, (distance, metadata) in enumerate(zip(
-                    vector_results['distances'][0], 
-                    vector_results['metadatas'][0]
-                )):
-                    # 计算相似度（距离越小，相似度越高）
-                    similarity = 1.0 / (1.0 + distance)
-                    
-                    log(f"处理结果 {i+1}: distance={distance}, similarity={similarity}, threshold={search_request.threshold}", LogType.SERVER, "INFO")
-                    log(f"结果 {i+1} 的metadata: {metadata}", LogType.SERVER, "INFO")
-                    
-                    if similarity >= search_request.threshold:
-                        # 从metadata中获取artifact_id
-                        artifact_id = int(metadata.get('artifact_id')) if metadata else None
-                        
-                        # 从SQLite获取完整的资料信息
-                        if artifact_id and artifact_id in sqlite_results:
-                            row = sqlite_results[artifact_id]
-                            result = SearchResult(
-                                id=row[0],
-                                title=row[1],
-                                content=row[2],
-                                category=row[3],
-                                created_at=row[4],
-                                updated_at=row[5],
-                                is_active=row[6],
-                                similarity=similarity
-                            )
-                            log(f"添加结果 {i+1} 到最终结果列表", LogType.SERVER, "INFO")
-                            final_results.append(result)
-                        else:
-                            log(f"结果 {i+1} 在SQLite中未找到，跳过", LogType.SERVER, "WARNING")
-                    else:
-                        log(f"结果 {i+1} 相似度低于阈值，被过滤", LogType.SERVER, "INFO")
-                
-                log(f"向量搜索结果处理完成，添加了 {len(final_results)} 个结果", LogType.SERVER, "INFO")
-                
-            except Exception as e:
-                log(f"向量搜索失败: {str(e)}", LogType.SERVER, "ERROR")
-                # 向量搜索失败，继续使用关键词搜索
-        else:
-            log("ChromaDB客户端或集合不可用，使用关键词搜索", LogType.SERVER, "WARNING")
-                
-        # 如果向量搜索没有返回足够的结果或失败，则使用关键词搜索作为补充
-        if len(final_results) < search_request.top_k:
-            remaining_slots = search_request.top_k - len(final_results)
-            
-            # 构建查询条件
-            conditions = ["a.is_active = 1"]
-            params = []
-            
-            # 添加关键词搜索条件
-            if search_request.query:
-                conditions.append("(a.title LIKE ? OR a.content LIKE ?)")
-                params.extend([f"%{search_request.query}%", f"%{search_request.query}%"])
-            
-            # 添加分类过滤条件
-            if search_request.category_filter:
-                category_placeholders = ','.join(['?' for _ in search_request.category_filter])
-                conditions.append(f"a.category IN ({category_placeholders})")
-                params.extend(search_request.category_filter)
-            
-            where_clause = " AND ".join(conditions)
-            
-            # 执行关键词搜索
-            keyword_query = f"""
-                SELECT id, title, content, category, created_at, updated_at, is_active
-                FROM artifacts a
-                WHERE {where_clause}
-                ORDER BY CASE 
-                    WHEN a.title LIKE ? THEN 1
-                    WHEN a.content LIKE ? THEN 2
-                    ELSE 3
-                END, a.created_at DESC
-                LIMIT ?
-            """
-            keyword_params = params + [f"%{search_request.query}%", f"%{search_request.query}%", remaining_slots]
-            
-            cursor.execute(keyword_query, keyword_params)
-            keyword_results = cursor.fetchall()
-            
-            # 添加关键词搜索结果，但不重复添加已有的结果
-            existing_ids = {result.id for result in final_results}
-            for row in keyword_results:
-                artifact_id = row[0]
-                if artifact_id not in existing_ids:
-                    # 对于关键词匹配的结果，给予一个较低的相似度分数
-                    similarity = 0.5  # 默认相似度
-                    
-                    # 如果标题匹配，提高相似度
-                    if search_request.query.lower() in (row[1] or "").lower():
-                        similarity = 0.7
-                    elif search_request.query.lower() in (row[2] or "").lower():
-                        similarity = 0.5
-                        
-                    if similarity >= search_request.threshold:
-                        final_results.append(SearchResult(
-                            id=row[0],
-                            title=row[1],
-                            content=row[2],
-                            category=row[3],
-                            created_at=row[4],
-                            updated_at=row[5],
-                            is_active=bool(row[6]),
-                            similarity=similarity
-                        ))
-                        
-                        if len(final_results) >= search_request.top_k:
-                            break
-        
-        # 按相似度排序
-        final_results.sort(key=lambda x: x.similarity or 0, reverse=True)
-        
-        # 限制结果数量
-        final_results = final_results[:search_request.top_k]
-        
-        # 计算响应时间
-        response_time = time.time() - start_time
-        
-        # 更新检索历史记录响应时间
-        cursor.execute("""
-            UPDATE search_history 
-            SET artifact_count = ?, response_time = ?
-            WHERE id = ?
-        """, (len(final_results), response_time, search_id))
-        db["sqlite"].commit()
+        search_id = _record_search(db, search_request.query)
+        final_results = await pipeline.run()
+        response_time = pipeline.elapsed
+        _finish_search(db, search_id, len(final_results), response_time)
         
         # 返回包装在data字段中的格式以匹配前端的响应拦截器期望
-        return {
+        return FastJSONResponse({
             "data": {
                 "query": search_request.query,
-                "artifacts": [artifact.dict() for artifact in final_results],
+                "artifacts": final_results,
                 "total_count": len(final_results),
                 "response_time": response_time
             }
-        }
+        })
         
     except Exception as e:
         # 记录错误的检索历史
-        try:
-            cursor.execute("""
-                INSERT INTO search_history (query, response_time, created_at)
-                VALUES (?, -1, datetime('now', 'localtime'))
-            """, (search_request.query,))
-            db["sqlite"].commit()
-        except:
-            pass
-            
+        _record_failed_search(db, search_request.query)
         raise HTTPException(status_code=500, detail=f"检索失败: {str(e)}")
 
+
+def _sse_event(event: str, data) -> bytes:
+    """编码一条SSE事件"""
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+async def _stream_search(search_request: SearchRequest):
+    """
+    流式检索事件生成器
+
+    使用独立的数据库连接（与get_db相同的方式创建），在响应发送完毕后关闭，不依赖请求依赖项的生命周期
+    """
+    db_source = get_db()
+    db = next(db_source)
+    try:
+        pipeline = SearchPipeline(search_request, db)
+        try:
+            search_id = _record_search(db, search_request.query)
+            async for stage, data in pipeline.stream():
+                yield _sse_event(stage, data)
+                if stage == STAGE_SUMMARY:
+                    _finish_search(db, search_id, data["total_count"], data["response_time"])
+        except Exception as e:
+            log(f"流式检索失败: {str(e)}", LogType.SERVER, "ERROR")
+            _record_failed_search(db, search_request.query)
+            yield _sse_event("error", {"detail": f"检索失败: {str(e)}"})
+    finally:
+        db_source.close()
+
+
+def _sse_response(search_request: SearchRequest) -> StreamingResponse:
+    """创建SSE响应（禁用代理缓冲，保证每个阶段的结果即时送达）"""
+    # 开始推送前校验字段参数，参数错误时返回400而不是在事件流中报错
+    try:
+        parse_fields(search_request.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    log(f"收到流式检索请求，参数: query='{search_request.query}', top_k={search_request.top_k}, threshold={search_request.threshold}", LogType.SERVER, "INFO")
+    return StreamingResponse(
+        _stream_search(search_request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/search/stream")
+async def stream_documents(search_request: SearchRequest):
+    """
+    流式检索（SSE）
+
+    依次推送 vector（向量检索结果）、keyword（关键词补充结果）和 summary（最终排序）事件，出错时推送 error 事件
+    """
+    return _sse_response(search_request)
+
+
+@router.get("/search/stream")
+async def stream_documents_get(
+    query: str = Query(..., description="查询语句"),
+    top_k: int = Query(5, description="返回结果数量"),
+    threshold: float = Query(0.7, description="相似度阈值"),
+    category: Optional[List[str]] = Query(None, description="分类过滤，可重复传递"),
+    fields: Optional[str] = Query(None, description="返回字段（逗号分隔）"),
+    snippet_length: int = Query(200, description="内容摘要长度（字符）")
+):
+    """流式检索（SSE，GET版本，便于浏览器EventSource直接调用）"""
+    try:
+        search_request = SearchRequest(
+            query=query,
+            top_k=top_k,
+            threshold=threshold,
+            category_filter=category,
+            fields=fields.split(",") if fields else None,
+            snippet_length=snippet_length
+        )
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    return _sse_response(search_request)
+
+
+async def _stream_answer(answer_request: AnswerRequest):
+    """
+    检索问答事件生成器
+
+    检索开始前即并行预热LLM连接，检索完成后直接在已建立的连接上发起流式对话；
+    与流式检索相同，使用独立的数据库连接
+    """
+    from app.services.ai_clients import llm_client
+
+    start_time = time.time()
+    warm_up = asyncio.create_task(llm_client.warm_up())
+    try:
+        db_source = get_db()
+        db = next(db_source)
+        try:
+            try:
+                search_id = _record_search(db, answer_request.query)
+                pipeline = SearchPipeline(SearchRequest(
+                    query=answer_request.query,
+                    top_k=answer_request.top_k,
+                    threshold=answer_request.threshold,
+                    category_filter=answer_request.category_filter
+                ), db)
+                results = await pipeline.run()
+                _finish_search(db, search_id, len(results), pipeline.elapsed)
+
+                context, sources = build_context(
+                    results, answer_request.max_context_tokens or config.ANSWER_CONTEXT_MAX_TOKENS
+                )
+                yield _sse_event("sources", {"sources": sources, "retrieval_time": pipeline.elapsed})
+            except Exception as e:
+                log(f"问答检索失败: {str(e)}", LogType.SERVER, "ERROR")
+                _record_failed_search(db, answer_request.query)
+                yield _sse_event("error", {"detail": f"检索失败: {str(e)}"})
+                return
+        finally:
+            db_source.close()
+
+        if not sources:
+            yield _sse_event("done", {"answer_time": time.time() - start_time, "first_token_latency": None, "sources": 0})
+            return
+
+        first_token_latency = None
+        try:
+            # 预热未完成时等待其建立连接，避免并发再发起一次握手
+            await warm_up
+            # 资料更新后缓存的回答失效
+            updated_at = {result["id"]: result.get("updated_at") for result in results}
+            context_versions = [(source["id"], updated_at.get(source["id"])) for source in sources]
+            async for text in llm_client.stream_answer(
+                answer_request.query, context,
+                max_tokens=config.ANSWER_MAX_TOKENS, context_versions=context_versions
+            ):
+                if first_token_latency is None:
+                    first_token_latency = time.time() - start_time
+                yield _sse_event("token", {"text": text})
+        except Exception as e:
+            log(f"问答生成失败: {str(e)}", LogType.SERVER, "ERROR")
+            yield _sse_event("error", {"detail": f"回答生成失败: {str(e)}"})
+            return
+
+        yield _sse_event("done", {
+            "answer_time": time.time() - start_time,
+            "first_token_latency": first_token_latency,
+            "sources": len(sources)
+        })
+    finally:
+        # 客户端断开、检索失败或无需生成回答时，取消尚未完成的预热
+        warm_up.cancel()
+
+
+@router.post("/search/answer")
+async def answer_question(answer_request: AnswerRequest):
+    """
+    检索问答（SSE）
+
+    检索top_k资料并按token预算构建上下文，依次推送 sources（参考资料）、token（回答片段）和 done 事件，出错时推送 error 事件
+    """
+    log(f"收到检索问答请求，参数: query='{answer_request.query}', top_k={answer_request.top_k}, threshold={answer_request.threshold}", LogType.SERVER, "INFO")
+    return StreamingResponse(
+        _stream_answer(answer_request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/search/history")
 async def get_search_history(
     db: DatabaseDep,
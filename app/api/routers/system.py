@@ -1,7 +1,7 @@
 """系统管理API路由"""
 from datetime import datetime
-from fastapi import APIRouter, Depends
-from typing import Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, Any, Literal
 import psutil
 import time
 
@@ -46,18 +46,19 @@ async def health_check(db: DatabaseDep):
         try:
             if hasattr(config, 'LLM_API_BASE_URL') and config.LLM_API_BASE_URL:
                 # 尝试调用实际的LLM API端点进行测试
-                from openai import OpenAI
-                import httpx
+                from openai import AsyncOpenAI
+                from app.services.http_pool import http_pool
                 
-                client = OpenAI(
+                client = AsyncOpenAI(
                     base_url=config.LLM_API_BASE_URL,
                     api_key=config.LLM_API_KEY if hasattr(config, 'LLM_API_KEY') else "test",
-                    timeout=10.0,
-                    http_client=httpx.Client(limits=httpx.Limits(max_connections=10, max_keepalive_connections=5))
+                    timeout=http_pool.build_timeout(10.0),
+                    max_retries=0,
+                    http_client=http_pool.get_client()
                 )
                 
                 # 尝试生成一个简单的测试文本
-                test_response = client.chat.completions.create(
+                test_response = await client.chat.completions.create(
                     model=config.LLM_MODEL,
                     messages=[
                         {"role": "system", "content": "你是一个专业的AI助手"},
@@ -82,23 +83,29 @@ async def health_check(db: DatabaseDep):
         services_status["llm_service"] = "configured"  # 已配置但未启用
     
     # 检查嵌入服务配置和可用性
-    if hasattr(config, 'EMBEDDING_MODEL') and config.EMBEDDING_MODEL:
+    if config.EMBEDDING_PROVIDER == "onnx":
+        # 本地ONNX模型：检查模型与分词器文件是否就绪
+        import os
+        model_ready = os.path.exists(config.EMBEDDING_ONNX_MODEL_PATH) and os.path.exists(config.EMBEDDING_ONNX_TOKENIZER_PATH)
+        services_status["embedding_service"] = "healthy" if model_ready else "configured"
+    elif hasattr(config, 'EMBEDDING_MODEL') and config.EMBEDDING_MODEL:
         try:
             # 尝试连接到嵌入服务
             if hasattr(config, 'EMBEDDING_API_BASE_URL') and config.EMBEDDING_API_BASE_URL:
                 # 尝试调用实际的embedding API端点进行测试
-                from openai import OpenAI
-                import httpx
+                from openai import AsyncOpenAI
+                from app.services.http_pool import http_pool
                 
-                client = OpenAI(
+                client = AsyncOpenAI(
                     base_url=config.EMBEDDING_API_BASE_URL,
                     api_key=config.EMBEDDING_API_KEY if hasattr(config, 'EMBEDDING_API_KEY') else "test",
-                    timeout=10.0,
-                    http_client=httpx.Client(limits=httpx.Limits(max_connections=10, max_keepalive_connections=5))
+                    timeout=http_pool.build_timeout(10.0),
+                    max_retries=0,
+                    http_client=http_pool.get_client()
                 )
                 
                 # 尝试生成一个简单的测试向量
-                test_response = client.embeddings.create(
+                test_response = await client.embeddings.create(
                     model=config.EMBEDDING_MODEL,
                     input="test"
                 )
@@ -119,6 +126,11 @@ async def health_check(db: DatabaseDep):
     else:
         services_status["embedding_service"] = "configured"  # 已配置但未启用
     
+    # AI服务熔断器状态
+    from app.services.ai_clients import llm_client, embedding_client
+    services_status["llm_circuit"] = llm_client.breaker.state
+    services_status["embedding_circuit"] = embedding_client.breaker.state
+    
     # 只有核心服务健康时，系统状态才是健康
     core_services_healthy = (
         services_status.get("database") == "healthy" and 
@@ -167,12 +179,27 @@ async def get_metrics(db: DatabaseDep):
     cpu_percent = psutil.cpu_percent(interval=1)
     memory_percent = psutil.virtual_memory().percent
     
+    from app.services.ai_clients import llm_client, embedding_client
+    from app.services.embedding_store import embedding_store
+    from app.services.llm_cache import llm_cache
+    from app.services.vector_outbox import vector_outbox_worker
+    from app.services.enrichment import enrichment_queue
+    
     return MetricsResponse(
         uptime=uptime,
         artifact_count=artifact_count,
         chunk_count=chunk_count,
         search_count=search_count,
-        avg_response_time=avg_response_time
+        avg_response_time=avg_response_time,
+        circuit_breakers={
+            "llm": llm_client.breaker.snapshot(),
+            "embedding": embedding_client.breaker.snapshot()
+        },
+        embedding_rate_limit=embedding_client.rate_limiter.snapshot(),
+        embedding_store_size=embedding_store.count() if embedding_store.enabled else None,
+        llm_cache=llm_cache.metrics() if llm_cache.enabled else None,
+        vector_sync_outbox=vector_outbox_worker.metrics(),
+        enrichment=enrichment_queue.metrics()
     )
 
 
@@ -200,9 +227,27 @@ async def get_system_info():
 
 
 @router.post("/reindex")
-async def reindex_vectors(db: DatabaseDep):
+async def reindex_vectors(
+    db: DatabaseDep,
+    mode: Literal["in_place", "blue_green"] = Query("in_place", description="重建模式: in_place（原地重建）或 blue_green（后台构建影子集合后切换）")
+):
     """重建向量索引"""
     try:
+        if mode == "blue_green":
+            # 后台构建影子集合，构建期间检索继续使用当前集合
+            started = vector_sync_service.start_blue_green_reindex()
+            if not started:
+                return {
+                    "success": False,
+                    "message": "已有蓝绿重建索引任务正在运行"
+                }
+            
+            return {
+                "success": True,
+                "message": "蓝绿重建索引任务已启动",
+                "mode": mode
+            }
+        
         # 使用向量同步服务重新索引所有资料
         success = await vector_sync_service.reindex_all_artifacts()
         
@@ -230,6 +275,133 @@ async def reindex_vectors(db: DatabaseDep):
         }
 
 
+@router.get("/reindex/status")
+async def get_reindex_status():
+    """获取蓝绿重建索引任务状态"""
+    from app.core.database import db_manager
+    
+    status = vector_sync_service.get_reindex_status()
+    status["current_collection"] = db_manager.collection.name if db_manager.collection else None
+    status["previous_collection"] = db_manager.previous_collection.name if db_manager.previous_collection else None
+    
+    return {
+        "success": True,
+        "data": status
+    }
+
+
+@router.post("/reindex/rollback")
+async def rollback_reindex():
+    """回滚到蓝绿切换前的旧集合"""
+    from app.core.database import db_manager
+    
+    try:
+        collection = db_manager.rollback_collection()
+        return {
+            "success": True,
+            "message": f"已回滚到集合 {collection.name}"
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"回滚失败: {str(e)}"
+        }
+
+
+@router.post("/consistency/check")
+async def start_consistency_check(
+    repair: bool = Query(True, description="是否修复：缺失的向量加入同步队列，孤儿向量直接删除")
+):
+    """启动SQLite与向量数据库一致性检查"""
+    from app.services.consistency_checker import consistency_checker
+    
+    if not consistency_checker.start(repair):
+        return {
+            "success": False,
+            "message": "已有一致性检查任务正在运行"
+        }
+    
+    return {
+        "success": True,
+        "message": "一致性检查任务已启动",
+        "repair": repair
+    }
+
+
+@router.get("/consistency/status")
+async def get_consistency_status():
+    """获取一致性检查任务状态与统计"""
+    from app.services.consistency_checker import consistency_checker
+    
+    return {
+        "success": True,
+        "data": consistency_checker.get_status()
+    }
+
+
+@router.get("/enrichment/status")
+async def get_enrichment_status():
+    """获取资料增强队列状态和吞吐量"""
+    from app.services.enrichment import enrichment_queue
+    
+    return {
+        "success": True,
+        "data": enrichment_queue.metrics()
+    }
+
+
+@router.post("/enrichment/pause")
+async def pause_enrichment():
+    """暂停资料增强（进行中的任务继续完成）"""
+    from app.services.enrichment import enrichment_queue
+    
+    if not enrichment_queue.running:
+        return {"success": False, "message": "资料增强队列未运行"}
+    enrichment_queue.pause()
+    return {"success": True, "message": "资料增强已暂停"}
+
+
+@router.post("/enrichment/resume")
+async def resume_enrichment():
+    """恢复资料增强"""
+    from app.services.enrichment import enrichment_queue
+    
+    if not enrichment_queue.running:
+        return {"success": False, "message": "资料增强队列未运行"}
+    enrichment_queue.resume()
+    return {"success": True, "message": "资料增强已恢复"}
+
+
+@router.post("/enrichment/backfill")
+async def backfill_enrichment():
+    """将尚未增强的资料加入队列（低优先级）"""
+    from app.services.enrichment import enrichment_queue
+    
+    if not enrichment_queue.running:
+        return {"success": False, "message": "资料增强队列未运行"}
+    try:
+        queued = enrichment_queue.backfill()
+        return {"success": True, "message": f"已将 {queued} 条资料加入增强队列", "queued": queued}
+    except Exception as e:
+        return {"success": False, "message": f"补齐入队失败: {str(e)}"}
+
+
+@router.post("/enrichment/artifacts/{artifact_id}")
+async def enrich_artifact(artifact_id: int, db: DatabaseDep):
+    """立即增强指定资料（高优先级）"""
+    from app.services.enrichment import enrichment_queue, PRIORITY_HIGH
+    
+    cursor = db["sqlite"].cursor()
+    cursor.execute("SELECT id FROM artifacts WHERE id = ? AND is_active = 1", (artifact_id,))
+    if not cursor.fetchone():
+        raise HTTPException(status_code=404, detail="资料不存在")
+    if not enrichment_queue.running:
+        return {"success": False, "message": "资料增强队列未运行"}
+    
+    enrichment_queue.submit(artifact_id, PRIORITY_HIGH)
+    return {"success": True, "message": "资料已加入增强队列"}
+
+
 @router.post("/server/restart")
 async def restart_server():
     """重启服务器"""
@@ -119,6 +119,22 @@ class Config:
     def CHROMA_COLLECTION_NAME(self, value: str):
         setattr(self._rt_config, 'CHROMA_COLLECTION_NAME', value)
     
+    @property
+    def CHROMA_BULK_CHUNK_SIZE(self) -> int:
+        return getattr(self._rt_config, 'CHROMA_BULK_CHUNK_SIZE', 1000)
+    
+    @CHROMA_BULK_CHUNK_SIZE.setter
+    def CHROMA_BULK_CHUNK_SIZE(self, value: int):
+        setattr(self._rt_config, 'CHROMA_BULK_CHUNK_SIZE', value)
+    
+    @property
+    def CHROMA_EXPORT_DIR(self) -> str:
+        return getattr(self._rt_config, 'CHROMA_EXPORT_DIR', './data/exports')
+    
+    @CHROMA_EXPORT_DIR.setter
+    def CHROMA_EXPORT_DIR(self, value: str):
+        setattr(self._rt_config, 'CHROMA_EXPORT_DIR', value)
+    
     # AI服务配置
     @property
     def LLM_PROVIDER(self) -> str:
@@ -168,6 +184,38 @@ class Config:
     def LLM_MAX_RETRIES(self, value: int):
         setattr(self._rt_config, 'LLM_MAX_RETRIES', value)
     
+    @property
+    def LLM_CACHE_ENABLED(self) -> bool:
+        return getattr(self._rt_config, 'LLM_CACHE_ENABLED', True)
+    
+    @LLM_CACHE_ENABLED.setter
+    def LLM_CACHE_ENABLED(self, value: bool):
+        setattr(self._rt_config, 'LLM_CACHE_ENABLED', value)
+    
+    @property
+    def LLM_CACHE_PATH(self) -> str:
+        return getattr(self._rt_config, 'LLM_CACHE_PATH', './data/llm_cache/llm_cache.db')
+    
+    @LLM_CACHE_PATH.setter
+    def LLM_CACHE_PATH(self, value: str):
+        setattr(self._rt_config, 'LLM_CACHE_PATH', value)
+    
+    @property
+    def LLM_CACHE_TTL(self) -> int:
+        return getattr(self._rt_config, 'LLM_CACHE_TTL', 604800)
+    
+    @LLM_CACHE_TTL.setter
+    def LLM_CACHE_TTL(self, value: int):
+        setattr(self._rt_config, 'LLM_CACHE_TTL', value)
+    
+    @property
+    def LLM_CACHE_MAX_ENTRIES(self) -> int:
+        return getattr(self._rt_config, 'LLM_CACHE_MAX_ENTRIES', 10000)
+    
+    @LLM_CACHE_MAX_ENTRIES.setter
+    def LLM_CACHE_MAX_ENTRIES(self, value: int):
+        setattr(self._rt_config, 'LLM_CACHE_MAX_ENTRIES', value)
+    
     @property
     def EMBEDDING_PROVIDER(self) -> str:
         return getattr(self._rt_config, 'EMBEDDING_PROVIDER', 'openai_compatible')
@@ -224,6 +272,270 @@ class Config:
     def EMBEDDING_MAX_RETRIES(self, value: int):
         setattr(self._rt_config, 'EMBEDDING_MAX_RETRIES', value)
     
+    @property
+    def EMBEDDING_ONNX_MODEL_PATH(self) -> str:
+        return getattr(self._rt_config, 'EMBEDDING_ONNX_MODEL_PATH', './models/embedding/model.onnx')
+    
+    @EMBEDDING_ONNX_MODEL_PATH.setter
+    def EMBEDDING_ONNX_MODEL_PATH(self, value: str):
+        setattr(self._rt_config, 'EMBEDDING_ONNX_MODEL_PATH', value)
+    
+    @property
+    def EMBEDDING_ONNX_TOKENIZER_PATH(self) -> str:
+        return getattr(self._rt_config, 'EMBEDDING_ONNX_TOKENIZER_PATH', './models/embedding/tokenizer.json')
+    
+    @EMBEDDING_ONNX_TOKENIZER_PATH.setter
+    def EMBEDDING_ONNX_TOKENIZER_PATH(self, value: str):
+        setattr(self._rt_config, 'EMBEDDING_ONNX_TOKENIZER_PATH', value)
+    
+    @property
+    def EMBEDDING_ONNX_MAX_LENGTH(self) -> int:
+        return getattr(self._rt_config, 'EMBEDDING_ONNX_MAX_LENGTH', 512)
+    
+    @EMBEDDING_ONNX_MAX_LENGTH.setter
+    def EMBEDDING_ONNX_MAX_LENGTH(self, value: int):
+        setattr(self._rt_config, 'EMBEDDING_ONNX_MAX_LENGTH', value)
+    
+    @property
+    def EMBEDDING_ONNX_BATCH_SIZE(self) -> int:
+        return getattr(self._rt_config, 'EMBEDDING_ONNX_BATCH_SIZE', 32)
+    
+    @EMBEDDING_ONNX_BATCH_SIZE.setter
+    def EMBEDDING_ONNX_BATCH_SIZE(self, value: int):
+        setattr(self._rt_config, 'EMBEDDING_ONNX_BATCH_SIZE', value)
+    
+    @property
+    def EMBEDDING_ONNX_INTRA_OP_THREADS(self) -> int:
+        return getattr(self._rt_config, 'EMBEDDING_ONNX_INTRA_OP_THREADS', 0)
+    
+    @EMBEDDING_ONNX_INTRA_OP_THREADS.setter
+    def EMBEDDING_ONNX_INTRA_OP_THREADS(self, value: int):
+        setattr(self._rt_config, 'EMBEDDING_ONNX_INTRA_OP_THREADS', value)
+    
+    @property
+    def EMBEDDING_MICRO_BATCH_ENABLED(self) -> bool:
+        return getattr(self._rt_config, 'EMBEDDING_MICRO_BATCH_ENABLED', True)
+    
+    @EMBEDDING_MICRO_BATCH_ENABLED.setter
+    def EMBEDDING_MICRO_BATCH_ENABLED(self, value: bool):
+        setattr(self._rt_config, 'EMBEDDING_MICRO_BATCH_ENABLED', value)
+    
+    @property
+    def EMBEDDING_MICRO_BATCH_WINDOW_MS(self) -> float:
+        return getattr(self._rt_config, 'EMBEDDING_MICRO_BATCH_WINDOW_MS', 3)
+    
+    @EMBEDDING_MICRO_BATCH_WINDOW_MS.setter
+    def EMBEDDING_MICRO_BATCH_WINDOW_MS(self, value: float):
+        setattr(self._rt_config, 'EMBEDDING_MICRO_BATCH_WINDOW_MS', value)
+    
+    @property
+    def EMBEDDING_MICRO_BATCH_MAX_SIZE(self) -> int:
+        return getattr(self._rt_config, 'EMBEDDING_MICRO_BATCH_MAX_SIZE', 32)
+    
+    @EMBEDDING_MICRO_BATCH_MAX_SIZE.setter
+    def EMBEDDING_MICRO_BATCH_MAX_SIZE(self, value: int):
+        setattr(self._rt_config, 'EMBEDDING_MICRO_BATCH_MAX_SIZE', value)
+    
+    @property
+    def EMBEDDING_BATCH_MAX_CHARS(self) -> int:
+        return getattr(self._rt_config, 'EMBEDDING_BATCH_MAX_CHARS', 8000)
+    
+    @EMBEDDING_BATCH_MAX_CHARS.setter
+    def EMBEDDING_BATCH_MAX_CHARS(self, value: int):
+        setattr(self._rt_config, 'EMBEDDING_BATCH_MAX_CHARS', value)
+    
+    @property
+    def EMBEDDING_BATCH_MAX_CONCURRENCY(self) -> int:
+        return getattr(self._rt_config, 'EMBEDDING_BATCH_MAX_CONCURRENCY', 4)
+    
+    @EMBEDDING_BATCH_MAX_CONCURRENCY.setter
+    def EMBEDDING_BATCH_MAX_CONCURRENCY(self, value: int):
+        setattr(self._rt_config, 'EMBEDDING_BATCH_MAX_CONCURRENCY', value)
+    
+    @property
+    def EMBEDDING_STORE_ENABLED(self) -> bool:
+        return getattr(self._rt_config, 'EMBEDDING_STORE_ENABLED', True)
+    
+    @EMBEDDING_STORE_ENABLED.setter
+    def EMBEDDING_STORE_ENABLED(self, value: bool):
+        setattr(self._rt_config, 'EMBEDDING_STORE_ENABLED', value)
+    
+    @property
+    def EMBEDDING_STORE_PATH(self) -> str:
+        return getattr(self._rt_config, 'EMBEDDING_STORE_PATH', './data/embedding_store/embeddings.db')
+    
+    @EMBEDDING_STORE_PATH.setter
+    def EMBEDDING_STORE_PATH(self, value: str):
+        setattr(self._rt_config, 'EMBEDDING_STORE_PATH', value)
+    
+    @property
+    def EMBEDDING_RATE_LIMIT_ENABLED(self) -> bool:
+        return getattr(self._rt_config, 'EMBEDDING_RATE_LIMIT_ENABLED', False)
+    
+    @EMBEDDING_RATE_LIMIT_ENABLED.setter
+    def EMBEDDING_RATE_LIMIT_ENABLED(self, value: bool):
+        setattr(self._rt_config, 'EMBEDDING_RATE_LIMIT_ENABLED', value)
+    
+    @property
+    def EMBEDDING_RATE_LIMIT_REQUESTS_PER_SECOND(self) -> float:
+        return getattr(self._rt_config, 'EMBEDDING_RATE_LIMIT_REQUESTS_PER_SECOND', 20.0)
+    
+    @EMBEDDING_RATE_LIMIT_REQUESTS_PER_SECOND.setter
+    def EMBEDDING_RATE_LIMIT_REQUESTS_PER_SECOND(self, value: float):
+        setattr(self._rt_config, 'EMBEDDING_RATE_LIMIT_REQUESTS_PER_SECOND', value)
+    
+    @property
+    def EMBEDDING_RATE_LIMIT_TOKENS_PER_SECOND(self) -> float:
+        return getattr(self._rt_config, 'EMBEDDING_RATE_LIMIT_TOKENS_PER_SECOND', 20000.0)
+    
+    @EMBEDDING_RATE_LIMIT_TOKENS_PER_SECOND.setter
+    def EMBEDDING_RATE_LIMIT_TOKENS_PER_SECOND(self, value: float):
+        setattr(self._rt_config, 'EMBEDDING_RATE_LIMIT_TOKENS_PER_SECOND', value)
+    
+    @property
+    def EMBEDDING_RATE_LIMIT_BACKGROUND_RESERVE(self) -> float:
+        return getattr(self._rt_config, 'EMBEDDING_RATE_LIMIT_BACKGROUND_RESERVE', 0.2)
+    
+    @EMBEDDING_RATE_LIMIT_BACKGROUND_RESERVE.setter
+    def EMBEDDING_RATE_LIMIT_BACKGROUND_RESERVE(self, value: float):
+        setattr(self._rt_config, 'EMBEDDING_RATE_LIMIT_BACKGROUND_RESERVE', value)
+    
+    @property
+    def AI_RETRY_BASE_DELAY(self) -> float:
+        return getattr(self._rt_config, 'AI_RETRY_BASE_DELAY', 0.5)
+    
+    @AI_RETRY_BASE_DELAY.setter
+    def AI_RETRY_BASE_DELAY(self, value: float):
+        setattr(self._rt_config, 'AI_RETRY_BASE_DELAY', value)
+    
+    @property
+    def AI_RETRY_MAX_DELAY(self) -> float:
+        return getattr(self._rt_config, 'AI_RETRY_MAX_DELAY', 10.0)
+    
+    @AI_RETRY_MAX_DELAY.setter
+    def AI_RETRY_MAX_DELAY(self, value: float):
+        setattr(self._rt_config, 'AI_RETRY_MAX_DELAY', value)
+    
+    @property
+    def AI_CIRCUIT_FAILURE_THRESHOLD(self) -> int:
+        return getattr(self._rt_config, 'AI_CIRCUIT_FAILURE_THRESHOLD', 5)
+    
+    @AI_CIRCUIT_FAILURE_THRESHOLD.setter
+    def AI_CIRCUIT_FAILURE_THRESHOLD(self, value: int):
+        setattr(self._rt_config, 'AI_CIRCUIT_FAILURE_THRESHOLD', value)
+    
+    @property
+    def AI_CIRCUIT_RECOVERY_TIMEOUT(self) -> float:
+        return getattr(self._rt_config, 'AI_CIRCUIT_RECOVERY_TIMEOUT', 30.0)
+    
+    @AI_CIRCUIT_RECOVERY_TIMEOUT.setter
+    def AI_CIRCUIT_RECOVERY_TIMEOUT(self, value: float):
+        setattr(self._rt_config, 'AI_CIRCUIT_RECOVERY_TIMEOUT', value)
+    
+    @property
+    def HTTP_POOL_MAX_CONNECTIONS(self) -> int:
+        return getattr(self._rt_config, 'HTTP_POOL_MAX_CONNECTIONS', 100)
+    
+    @HTTP_POOL_MAX_CONNECTIONS.setter
+    def HTTP_POOL_MAX_CONNECTIONS(self, value: int):
+        setattr(self._rt_config, 'HTTP_POOL_MAX_CONNECTIONS', value)
+    
+    @property
+    def HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS(self) -> int:
+        return getattr(self._rt_config, 'HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS', 20)
+    
+    @HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS.setter
+    def HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS(self, value: int):
+        setattr(self._rt_config, 'HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS', value)
+    
+    @property
+    def HTTP_POOL_KEEPALIVE_EXPIRY(self) -> float:
+        return getattr(self._rt_config, 'HTTP_POOL_KEEPALIVE_EXPIRY', 30.0)
+    
+    @HTTP_POOL_KEEPALIVE_EXPIRY.setter
+    def HTTP_POOL_KEEPALIVE_EXPIRY(self, value: float):
+        setattr(self._rt_config, 'HTTP_POOL_KEEPALIVE_EXPIRY', value)
+    
+    @property
+    def HTTP_POOL_CONNECT_TIMEOUT(self) -> float:
+        return getattr(self._rt_config, 'HTTP_POOL_CONNECT_TIMEOUT', 5.0)
+    
+    @HTTP_POOL_CONNECT_TIMEOUT.setter
+    def HTTP_POOL_CONNECT_TIMEOUT(self, value: float):
+        setattr(self._rt_config, 'HTTP_POOL_CONNECT_TIMEOUT', value)
+    
+    @property
+    def HTTP_POOL_WRITE_TIMEOUT(self) -> float:
+        return getattr(self._rt_config, 'HTTP_POOL_WRITE_TIMEOUT', 30.0)
+    
+    @HTTP_POOL_WRITE_TIMEOUT.setter
+    def HTTP_POOL_WRITE_TIMEOUT(self, value: float):
+        setattr(self._rt_config, 'HTTP_POOL_WRITE_TIMEOUT', value)
+    
+    @property
+    def HTTP_POOL_POOL_TIMEOUT(self) -> float:
+        return getattr(self._rt_config, 'HTTP_POOL_POOL_TIMEOUT', 10.0)
+    
+    @HTTP_POOL_POOL_TIMEOUT.setter
+    def HTTP_POOL_POOL_TIMEOUT(self, value: float):
+        setattr(self._rt_config, 'HTTP_POOL_POOL_TIMEOUT', value)
+    
+    @property
+    def HTTP_POOL_HTTP2(self) -> bool:
+        return getattr(self._rt_config, 'HTTP_POOL_HTTP2', True)
+    
+    @HTTP_POOL_HTTP2.setter
+    def HTTP_POOL_HTTP2(self, value: bool):
+        setattr(self._rt_config, 'HTTP_POOL_HTTP2', value)
+    
+    @property
+    def VECTOR_SYNC_OUTBOX_BATCH_SIZE(self) -> int:
+        return getattr(self._rt_config, 'VECTOR_SYNC_OUTBOX_BATCH_SIZE', 100)
+    
+    @VECTOR_SYNC_OUTBOX_BATCH_SIZE.setter
+    def VECTOR_SYNC_OUTBOX_BATCH_SIZE(self, value: int):
+        setattr(self._rt_config, 'VECTOR_SYNC_OUTBOX_BATCH_SIZE', value)
+    
+    @property
+    def VECTOR_SYNC_OUTBOX_POLL_INTERVAL(self) -> float:
+        return getattr(self._rt_config, 'VECTOR_SYNC_OUTBOX_POLL_INTERVAL', 1.0)
+    
+    @VECTOR_SYNC_OUTBOX_POLL_INTERVAL.setter
+    def VECTOR_SYNC_OUTBOX_POLL_INTERVAL(self, value: float):
+        setattr(self._rt_config, 'VECTOR_SYNC_OUTBOX_POLL_INTERVAL', value)
+    
+    @property
+    def VECTOR_SYNC_OUTBOX_RETRY_BASE_DELAY(self) -> float:
+        return getattr(self._rt_config, 'VECTOR_SYNC_OUTBOX_RETRY_BASE_DELAY', 2.0)
+    
+    @VECTOR_SYNC_OUTBOX_RETRY_BASE_DELAY.setter
+    def VECTOR_SYNC_OUTBOX_RETRY_BASE_DELAY(self, value: float):
+        setattr(self._rt_config, 'VECTOR_SYNC_OUTBOX_RETRY_BASE_DELAY', value)
+    
+    @property
+    def VECTOR_SYNC_OUTBOX_RETRY_MAX_DELAY(self) -> float:
+        return getattr(self._rt_config, 'VECTOR_SYNC_OUTBOX_RETRY_MAX_DELAY', 300.0)
+    
+    @VECTOR_SYNC_OUTBOX_RETRY_MAX_DELAY.setter
+    def VECTOR_SYNC_OUTBOX_RETRY_MAX_DELAY(self, value: float):
+        setattr(self._rt_config, 'VECTOR_SYNC_OUTBOX_RETRY_MAX_DELAY', value)
+    
+    @property
+    def VECTOR_SYNC_OUTBOX_MAX_ATTEMPTS(self) -> int:
+        return getattr(self._rt_config, 'VECTOR_SYNC_OUTBOX_MAX_ATTEMPTS', 20)
+    
+    @VECTOR_SYNC_OUTBOX_MAX_ATTEMPTS.setter
+    def VECTOR_SYNC_OUTBOX_MAX_ATTEMPTS(self, value: int):
+        setattr(self._rt_config, 'VECTOR_SYNC_OUTBOX_MAX_ATTEMPTS', value)
+    
+    @property
+    def VECTOR_SYNC_CONSISTENCY_BATCH_SIZE(self) -> int:
+        return getattr(self._rt_config, 'VECTOR_SYNC_CONSISTENCY_BATCH_SIZE', 500)
+    
+    @VECTOR_SYNC_CONSISTENCY_BATCH_SIZE.setter
+    def VECTOR_SYNC_CONSISTENCY_BATCH_SIZE(self, value: int):
+        setattr(self._rt_config, 'VECTOR_SYNC_CONSISTENCY_BATCH_SIZE', value)
+    
     # 检索参数
     @property
     def DEFAULT_TOP_K(self) -> int:
@@ -257,6 +569,30 @@ class Config:
     def OVERLAP_SIZE(self, value: int):
         setattr(self._rt_config, 'OVERLAP_SIZE', value)
     
+    @property
+    def CHUNKING_PROCESS_WORKERS(self) -> int:
+        return getattr(self._rt_config, 'CHUNKING_PROCESS_WORKERS', 2)
+    
+    @CHUNKING_PROCESS_WORKERS.setter
+    def CHUNKING_PROCESS_WORKERS(self, value: int):
+        setattr(self._rt_config, 'CHUNKING_PROCESS_WORKERS', value)
+    
+    @property
+    def CHUNKING_PARALLEL_MIN_CHARS(self) -> int:
+        return getattr(self._rt_config, 'CHUNKING_PARALLEL_MIN_CHARS', 200000)
+    
+    @CHUNKING_PARALLEL_MIN_CHARS.setter
+    def CHUNKING_PARALLEL_MIN_CHARS(self, value: int):
+        setattr(self._rt_config, 'CHUNKING_PARALLEL_MIN_CHARS', value)
+    
+    @property
+    def CHUNKING_BATCH_CHARS(self) -> int:
+        return getattr(self._rt_config, 'CHUNKING_BATCH_CHARS', 500000)
+    
+    @CHUNKING_BATCH_CHARS.setter
+    def CHUNKING_BATCH_CHARS(self, value: int):
+        setattr(self._rt_config, 'CHUNKING_BATCH_CHARS', value)
+    
     @property
     def BATCH_SIZE(self) -> int:
         return getattr(self._rt_config, 'BATCH_SIZE', 10)
@@ -265,6 +601,22 @@ class Config:
     def BATCH_SIZE(self, value: int):
         setattr(self._rt_config, 'BATCH_SIZE', value)
     
+    @property
+    def ANSWER_CONTEXT_MAX_TOKENS(self) -> int:
+        return getattr(self._rt_config, 'ANSWER_CONTEXT_MAX_TOKENS', 3000)
+    
+    @ANSWER_CONTEXT_MAX_TOKENS.setter
+    def ANSWER_CONTEXT_MAX_TOKENS(self, value: int):
+        setattr(self._rt_config, 'ANSWER_CONTEXT_MAX_TOKENS', value)
+    
+    @property
+    def ANSWER_MAX_TOKENS(self) -> int:
+        return getattr(self._rt_config, 'ANSWER_MAX_TOKENS', 800)
+    
+    @ANSWER_MAX_TOKENS.setter
+    def ANSWER_MAX_TOKENS(self, value: int):
+        setattr(self._rt_config, 'ANSWER_MAX_TOKENS', value)
+    
     # Web服务配置
     @property
     def WEB_SERVICE_ENABLED(self) -> bool:
@@ -274,6 +626,94 @@ class Config:
     def WEB_SERVICE_ENABLED(self, value: bool):
         setattr(self._rt_config, 'WEB_SERVICE_ENABLED', value)
     
+    @property
+    def COMPRESSION_ENABLED(self) -> bool:
+        return getattr(self._rt_config, 'COMPRESSION_ENABLED', True)
+    
+    @COMPRESSION_ENABLED.setter
+    def COMPRESSION_ENABLED(self, value: bool):
+        setattr(self._rt_config, 'COMPRESSION_ENABLED', value)
+    
+    @property
+    def COMPRESSION_MINIMUM_SIZE(self) -> int:
+        return getattr(self._rt_config, 'COMPRESSION_MINIMUM_SIZE', 1024)
+    
+    @COMPRESSION_MINIMUM_SIZE.setter
+    def COMPRESSION_MINIMUM_SIZE(self, value: int):
+        setattr(self._rt_config, 'COMPRESSION_MINIMUM_SIZE', value)
+    
+    @property
+    def COMPRESSION_GZIP_LEVEL(self) -> int:
+        return getattr(self._rt_config, 'COMPRESSION_GZIP_LEVEL', 6)
+    
+    @COMPRESSION_GZIP_LEVEL.setter
+    def COMPRESSION_GZIP_LEVEL(self, value: int):
+        setattr(self._rt_config, 'COMPRESSION_GZIP_LEVEL', value)
+    
+    @property
+    def COMPRESSION_BROTLI_QUALITY(self) -> int:
+        return getattr(self._rt_config, 'COMPRESSION_BROTLI_QUALITY', 4)
+    
+    @COMPRESSION_BROTLI_QUALITY.setter
+    def COMPRESSION_BROTLI_QUALITY(self, value: int):
+        setattr(self._rt_config, 'COMPRESSION_BROTLI_QUALITY', value)
+    
+    @property
+    def ENRICHMENT_ENABLED(self) -> bool:
+        return getattr(self._rt_config, 'ENRICHMENT_ENABLED', False)
+    
+    @ENRICHMENT_ENABLED.setter
+    def ENRICHMENT_ENABLED(self, value: bool):
+        setattr(self._rt_config, 'ENRICHMENT_ENABLED', value)
+    
+    @property
+    def ENRICHMENT_CONCURRENCY(self) -> int:
+        return getattr(self._rt_config, 'ENRICHMENT_CONCURRENCY', 2)
+    
+    @ENRICHMENT_CONCURRENCY.setter
+    def ENRICHMENT_CONCURRENCY(self, value: int):
+        setattr(self._rt_config, 'ENRICHMENT_CONCURRENCY', value)
+    
+    @property
+    def ENRICHMENT_MAX_INPUT_CHARS(self) -> int:
+        return getattr(self._rt_config, 'ENRICHMENT_MAX_INPUT_CHARS', 6000)
+    
+    @ENRICHMENT_MAX_INPUT_CHARS.setter
+    def ENRICHMENT_MAX_INPUT_CHARS(self, value: int):
+        setattr(self._rt_config, 'ENRICHMENT_MAX_INPUT_CHARS', value)
+    
+    @property
+    def ENRICHMENT_SUMMARY_MAX_TOKENS(self) -> int:
+        return getattr(self._rt_config, 'ENRICHMENT_SUMMARY_MAX_TOKENS', 300)
+    
+    @ENRICHMENT_SUMMARY_MAX_TOKENS.setter
+    def ENRICHMENT_SUMMARY_MAX_TOKENS(self, value: int):
+        setattr(self._rt_config, 'ENRICHMENT_SUMMARY_MAX_TOKENS', value)
+    
+    @property
+    def ENRICHMENT_BACKFILL_ON_START(self) -> bool:
+        return getattr(self._rt_config, 'ENRICHMENT_BACKFILL_ON_START', False)
+    
+    @ENRICHMENT_BACKFILL_ON_START.setter
+    def ENRICHMENT_BACKFILL_ON_START(self, value: bool):
+        setattr(self._rt_config, 'ENRICHMENT_BACKFILL_ON_START', value)
+    
+    @property
+    def ENRICHMENT_EMBED_SUMMARIES(self) -> bool:
+        return getattr(self._rt_config, 'ENRICHMENT_EMBED_SUMMARIES', False)
+    
+    @ENRICHMENT_EMBED_SUMMARIES.setter
+    def ENRICHMENT_EMBED_SUMMARIES(self, value: bool):
+        setattr(self._rt_config, 'ENRICHMENT_EMBED_SUMMARIES', value)
+    
+    @property
+    def ENRICHMENT_SUMMARY_COLLECTION(self) -> str:
+        return getattr(self._rt_config, 'ENRICHMENT_SUMMARY_COLLECTION', 'artifact_summaries')
+    
+    @ENRICHMENT_SUMMARY_COLLECTION.setter
+    def ENRICHMENT_SUMMARY_COLLECTION(self, value: str):
+        setattr(self._rt_config, 'ENRICHMENT_SUMMARY_COLLECTION', value)
+    
     @property
     def STATIC_FILES_DIR(self) -> str:
         return getattr(self._rt_config, 'STATIC_FILES_DIR', './app/web/static')
@@ -31,6 +31,8 @@ class RuntimeConfig:
             'SQLITE_TIMEOUT': ('database', 'sqlite', 'timeout'),
             'CHROMA_PERSIST_DIR': ('database', 'chroma', 'persist_directory'),
             'CHROMA_COLLECTION_NAME': ('database', 'chroma', 'collection_name'),
+            'CHROMA_BULK_CHUNK_SIZE': ('database', 'chroma', 'bulk_chunk_size'),
+            'CHROMA_EXPORT_DIR': ('database', 'chroma', 'export_directory'),
             'HOST': ('app', 'host'),
             'PORT': ('app', 'port'),
             'LOG_LEVEL': ('app', 'log_level'),
@@ -44,6 +46,10 @@ class RuntimeConfig:
             'LLM_MODEL': ('ai_services', 'llm', 'default_model'),
             'LLM_TIMEOUT': ('ai_services', 'llm', 'timeout'),
             'LLM_MAX_RETRIES': ('ai_services', 'llm', 'max_retries'),
+            'LLM_CACHE_ENABLED': ('ai_services', 'llm', 'cache', 'enabled'),
+            'LLM_CACHE_PATH': ('ai_services', 'llm', 'cache', 'path'),
+            'LLM_CACHE_TTL': ('ai_services', 'llm', 'cache', 'ttl'),
+            'LLM_CACHE_MAX_ENTRIES': ('ai_services', 'llm', 'cache', 'max_entries'),
             'EMBEDDING_PROVIDER': ('ai_services', 'embedding', 'provider'),
             'EMBEDDING_API_BASE_URL': ('ai_services', 'embedding', 'base_url'),
             'EMBEDDING_API_KEY': ('ai_services', 'embedding', 'api_key'),
@@ -51,12 +57,61 @@ class RuntimeConfig:
             'EMBEDDING_DIMENSIONS': ('ai_services', 'embedding', 'dimensions'),
             'EMBEDDING_TIMEOUT': ('ai_services', 'embedding', 'timeout'),
             'EMBEDDING_MAX_RETRIES': ('ai_services', 'embedding', 'max_retries'),
+            'EMBEDDING_ONNX_MODEL_PATH': ('ai_services', 'embedding', 'onnx', 'model_path'),
+            'EMBEDDING_ONNX_TOKENIZER_PATH': ('ai_services', 'embedding', 'onnx', 'tokenizer_path'),
+            'EMBEDDING_ONNX_MAX_LENGTH': ('ai_services', 'embedding', 'onnx', 'max_length'),
+            'EMBEDDING_ONNX_BATCH_SIZE': ('ai_services', 'embedding', 'onnx', 'batch_size'),
+            'EMBEDDING_ONNX_INTRA_OP_THREADS': ('ai_services', 'embedding', 'onnx', 'intra_op_threads'),
+            'EMBEDDING_MICRO_BATCH_ENABLED': ('ai_services', 'embedding', 'micro_batch', 'enabled'),
+            'EMBEDDING_MICRO_BATCH_WINDOW_MS': ('ai_services', 'embedding', 'micro_batch', 'window_ms'),
+            'EMBEDDING_MICRO_BATCH_MAX_SIZE': ('ai_services', 'embedding', 'micro_batch', 'max_batch_size'),
+            'EMBEDDING_BATCH_MAX_CHARS': ('ai_services', 'embedding', 'batch', 'max_chars'),
+            'EMBEDDING_BATCH_MAX_CONCURRENCY': ('ai_services', 'embedding', 'batch', 'max_concurrency'),
+            'EMBEDDING_STORE_ENABLED': ('ai_services', 'embedding', 'store', 'enabled'),
+            'EMBEDDING_STORE_PATH': ('ai_services', 'embedding', 'store', 'path'),
+            'EMBEDDING_RATE_LIMIT_ENABLED': ('ai_services', 'embedding', 'rate_limit', 'enabled'),
+            'EMBEDDING_RATE_LIMIT_REQUESTS_PER_SECOND': ('ai_services', 'embedding', 'rate_limit', 'requests_per_second'),
+            'EMBEDDING_RATE_LIMIT_TOKENS_PER_SECOND': ('ai_services', 'embedding', 'rate_limit', 'tokens_per_second'),
+            'EMBEDDING_RATE_LIMIT_BACKGROUND_RESERVE': ('ai_services', 'embedding', 'rate_limit', 'background_reserve'),
+            'AI_RETRY_BASE_DELAY': ('ai_services', 'resilience', 'retry_base_delay'),
+            'AI_RETRY_MAX_DELAY': ('ai_services', 'resilience', 'retry_max_delay'),
+            'AI_CIRCUIT_FAILURE_THRESHOLD': ('ai_services', 'resilience', 'circuit_failure_threshold'),
+            'AI_CIRCUIT_RECOVERY_TIMEOUT': ('ai_services', 'resilience', 'circuit_recovery_timeout'),
+            'HTTP_POOL_MAX_CONNECTIONS': ('http_pool', 'max_connections'),
+            'HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS': ('http_pool', 'max_keepalive_connections'),
+            'HTTP_POOL_KEEPALIVE_EXPIRY': ('http_pool', 'keepalive_expiry'),
+            'HTTP_POOL_CONNECT_TIMEOUT': ('http_pool', 'connect_timeout'),
+            'HTTP_POOL_WRITE_TIMEOUT': ('http_pool', 'write_timeout'),
+            'HTTP_POOL_POOL_TIMEOUT': ('http_pool', 'pool_timeout'),
+            'HTTP_POOL_HTTP2': ('http_pool', 'http2'),
+            'VECTOR_SYNC_OUTBOX_BATCH_SIZE': ('vector_sync', 'outbox', 'batch_size'),
+            'VECTOR_SYNC_OUTBOX_POLL_INTERVAL': ('vector_sync', 'outbox', 'poll_interval'),
+            'VECTOR_SYNC_OUTBOX_RETRY_BASE_DELAY': ('vector_sync', 'outbox', 'retry_base_delay'),
+            'VECTOR_SYNC_OUTBOX_RETRY_MAX_DELAY': ('vector_sync', 'outbox', 'retry_max_delay'),
+            'VECTOR_SYNC_OUTBOX_MAX_ATTEMPTS': ('vector_sync', 'outbox', 'max_attempts'),
+            'VECTOR_SYNC_CONSISTENCY_BATCH_SIZE': ('vector_sync', 'consistency', 'batch_size'),
             'DEFAULT_TOP_K': ('retrieval', 'default_top_k'),
             'SIMILARITY_THRESHOLD': ('retrieval', 'similarity_threshold'),
             'MAX_CHUNK_SIZE': ('retrieval', 'max_chunk_size'),
             'OVERLAP_SIZE': ('retrieval', 'overlap_size'),
+            'CHUNKING_PROCESS_WORKERS': ('retrieval', 'chunking', 'process_workers'),
+            'CHUNKING_PARALLEL_MIN_CHARS': ('retrieval', 'chunking', 'parallel_min_chars'),
+            'CHUNKING_BATCH_CHARS': ('retrieval', 'chunking', 'batch_chars'),
             'BATCH_SIZE': ('retrieval', 'batch_size'),
+            'ANSWER_CONTEXT_MAX_TOKENS': ('retrieval', 'answer', 'context_max_tokens'),
+            'ANSWER_MAX_TOKENS': ('retrieval', 'answer', 'max_tokens'),
             'WEB_SERVICE_ENABLED': ('web_service', 'enabled'),
+            'COMPRESSION_ENABLED': ('web_service', 'compression', 'enabled'),
+            'COMPRESSION_MINIMUM_SIZE': ('web_service', 'compression', 'minimum_size'),
+            'COMPRESSION_GZIP_LEVEL': ('web_service', 'compression', 'gzip_level'),
+            'COMPRESSION_BROTLI_QUALITY': ('web_service', 'compression', 'brotli_quality'),
+            'ENRICHMENT_ENABLED': ('enrichment', 'enabled'),
+            'ENRICHMENT_CONCURRENCY': ('enrichment', 'concurrency'),
+            'ENRICHMENT_MAX_INPUT_CHARS': ('enrichment', 'max_input_chars'),
+            'ENRICHMENT_SUMMARY_MAX_TOKENS': ('enrichment', 'summary_max_tokens'),
+            'ENRICHMENT_BACKFILL_ON_START': ('enrichment', 'backfill_on_start'),
+            'ENRICHMENT_EMBED_SUMMARIES': ('enrichment', 'embed_summaries'),
+            'ENRICHMENT_SUMMARY_COLLECTION': ('enrichment', 'summary_collection'),
             'STATIC_FILES_DIR': ('web_service', 'static_files', 'directory'),
             'STATIC_MOUNT_PATH': ('web_service', 'static_files', 'mount_path'),
             'TEMPLATES_DIR': ('web_service', 'templates', 'directory'),
@@ -80,6 +135,8 @@ class RuntimeConfig:
                 'SQLITE_TIMEOUT': 30.0,
                 'CHROMA_PERSIST_DIR': './data/chroma',
                 'CHROMA_COLLECTION_NAME': 'artifact_embeddings',
+                'CHROMA_BULK_CHUNK_SIZE': 1000,
+                'CHROMA_EXPORT_DIR': './data/exports',
                 'HOST': '0.0.0.0',
                 'PORT': 8001,
                 'LOG_LEVEL': 'INFO',
@@ -93,6 +150,10 @@ class RuntimeConfig:
                 'LLM_MODEL': 'qwen2:7b',
                 'LLM_TIMEOUT': 300,
                 'LLM_MAX_RETRIES': 3,
+                'LLM_CACHE_ENABLED': True,
+                'LLM_CACHE_PATH': './data/llm_cache/llm_cache.db',
+                'LLM_CACHE_TTL': 604800,
+                'LLM_CACHE_MAX_ENTRIES': 10000,
                 'EMBEDDING_PROVIDER': 'openai_compatible',
                 'EMBEDDING_API_BASE_URL': 'http://127.0.0.1:11434/v1',
                 'EMBEDDING_API_KEY': 'ollama',
@@ -100,12 +161,61 @@ class RuntimeConfig:
                 'EMBEDDING_DIMENSIONS': 1024,
                 'EMBEDDING_TIMEOUT': 300,
                 'EMBEDDING_MAX_RETRIES': 3,
+                'EMBEDDING_ONNX_MODEL_PATH': './models/embedding/model.onnx',
+                'EMBEDDING_ONNX_TOKENIZER_PATH': './models/embedding/tokenizer.json',
+                'EMBEDDING_ONNX_MAX_LENGTH': 512,
+                'EMBEDDING_ONNX_BATCH_SIZE': 32,
+                'EMBEDDING_ONNX_INTRA_OP_THREADS': 0,
+                'EMBEDDING_MICRO_BATCH_ENABLED': True,
+                'EMBEDDING_MICRO_BATCH_WINDOW_MS': 3,
+                'EMBEDDING_MICRO_BATCH_MAX_SIZE': 32,
+                'EMBEDDING_BATCH_MAX_CHARS': 8000,
+                'EMBEDDING_BATCH_MAX_CONCURRENCY': 4,
+                'EMBEDDING_STORE_ENABLED': True,
+                'EMBEDDING_STORE_PATH': './data/embedding_store/embeddings.db',
+                'EMBEDDING_RATE_LIMIT_ENABLED': False,
+                'EMBEDDING_RATE_LIMIT_REQUESTS_PER_SECOND': 20.0,
+                'EMBEDDING_RATE_LIMIT_TOKENS_PER_SECOND': 20000.0,
+                'EMBEDDING_RATE_LIMIT_BACKGROUND_RESERVE': 0.2,
+                'AI_RETRY_BASE_DELAY': 0.5,
+                'AI_RETRY_MAX_DELAY': 10.0,
+                'AI_CIRCUIT_FAILURE_THRESHOLD': 5,
+                'AI_CIRCUIT_RECOVERY_TIMEOUT': 30.0,
+                'HTTP_POOL_MAX_CONNECTIONS': 100,
+                'HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS': 20,
+                'HTTP_POOL_KEEPALIVE_EXPIRY': 30.0,
+                'HTTP_POOL_CONNECT_TIMEOUT': 5.0,
+                'HTTP_POOL_WRITE_TIMEOUT': 30.0,
+                'HTTP_POOL_POOL_TIMEOUT': 10.0,
+                'HTTP_POOL_HTTP2': True,
+                'VECTOR_SYNC_OUTBOX_BATCH_SIZE': 100,
+                'VECTOR_SYNC_OUTBOX_POLL_INTERVAL': 1.0,
+                'VECTOR_SYNC_OUTBOX_RETRY_BASE_DELAY': 2.0,
+                'VECTOR_SYNC_OUTBOX_RETRY_MAX_DELAY': 300.0,
+                'VECTOR_SYNC_OUTBOX_MAX_ATTEMPTS': 20,
+                'VECTOR_SYNC_CONSISTENCY_BATCH_SIZE': 500,
                 'DEFAULT_TOP_K': 5,
                 'SIMILARITY_THRESHOLD': 0.7,
                 'MAX_CHUNK_SIZE': 1000,
                 'OVERLAP_SIZE': 100,
+                'CHUNKING_PROCESS_WORKERS': 2,
+                'CHUNKING_PARALLEL_MIN_CHARS': 200000,
+                'CHUNKING_BATCH_CHARS': 500000,
                 'BATCH_SIZE': 10,
+                'ANSWER_CONTEXT_MAX_TOKENS': 3000,
+                'ANSWER_MAX_TOKENS': 800,
                 'WEB_SERVICE_ENABLED': True,
+                'COMPRESSION_ENABLED': True,
+                'COMPRESSION_MINIMUM_SIZE': 1024,
+                'COMPRESSION_GZIP_LEVEL': 6,
+                'COMPRESSION_BROTLI_QUALITY': 4,
+                'ENRICHMENT_ENABLED': False,
+                'ENRICHMENT_CONCURRENCY': 2,
+                'ENRICHMENT_MAX_INPUT_CHARS': 6000,
+                'ENRICHMENT_SUMMARY_MAX_TOKENS': 300,
+                'ENRICHMENT_BACKFILL_ON_START': False,
+                'ENRICHMENT_EMBED_SUMMARIES': False,
+                'ENRICHMENT_SUMMARY_COLLECTION': 'artifact_summaries',
                 'STATIC_FILES_DIR': './app/web/static',
                 'STATIC_MOUNT_PATH': '/static',
                 'TEMPLATES_DIR': './app/web/templates',
@@ -151,6 +261,12 @@ class RuntimeConfig:
                 current_db_config['chroma'] = {}
             current_db_config['chroma']['persist_directory'] = value
             set_config(current_db_config, 'database')
+        elif name == 'CHROMA_COLLECTION_NAME':
+            current_db_config = get_config('database') or {}
+            if 'chroma' not in current_db_config:
+                current_db_config['chroma'] = {}
+            current_db_config['chroma']['collection_name'] = value
+            set_config(current_db_config, 'database')
         elif name == 'HOST':
             current_app_config = get_config('app') or {}
             current_app_config['host'] = value
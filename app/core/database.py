@@ -4,6 +4,8 @@
 """
 import sqlite3
 import os
+import re
+import threading
 from typing import Optional
 from .logger_manager import log, LogType
 
@@ -16,6 +18,23 @@ except ImportError:
         log("ChromaDB - ChromaDB未安装或不可用，向量搜索功能将被禁用", LogType.DATABASE, "WARNING")
 
 from .config import config
+from .table_config import get_all_table_configs
+from .yaml_config import get_config_manager
+
+# 资料表列定义（正文、标签和元数据存放在资料内容表 artifact_contents 中）
+_ARTIFACTS_COLUMNS = """
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    source_type VARCHAR(32),
+    source_path TEXT,
+    category VARCHAR(64),
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    is_active BOOLEAN DEFAULT 1
+"""
+
+# 资料接口按这些表的版本号生成ETag（表浏览器中配置的表另外加入）
+GENERATION_TABLES = ("artifacts", "artifact_contents")
 
 
 class DatabaseManager:
@@ -26,6 +45,10 @@ class DatabaseManager:
         self.chroma_client = None
         self.collection = None
         self.chroma_available = CHROMA_AVAILABLE
+        # 蓝绿重建索引：构建中的影子集合与切换前保留用于回滚的旧集合
+        self.shadow_collection = None
+        self.previous_collection = None
+        self._collection_lock = threading.Lock()
         
     def init_sqlite(self) -> sqlite3.Connection:
         """初始化SQLite数据库连接"""
@@ -60,103 +83,146 @@ class DatabaseManager:
             
         return self.sqlite_conn
     
+    def _needs_rebuild(self, cursor, table_name: str) -> bool:
+        """判断表是否需要（重新）创建：表不存在，或者主键不是自增列的旧结构"""
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+        row = cursor.fetchone()
+        return row is None or 'AUTOINCREMENT' not in (row[0] or '').upper()
+    
     def _create_tables(self):
         """创建数据库表"""
         cursor = self.sqlite_conn.cursor()
         
         # 资料表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS artifacts_new (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                content TEXT NOT NULL,
-                source_type VARCHAR(32),
-                source_path TEXT,
-                category VARCHAR(64),
-                tags TEXT,
-                metadata TEXT,
-                created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
-                updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
-                is_active BOOLEAN DEFAULT 1
-            )
-        """)
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name IN ('artifacts', 'artifacts_new')")
+        if not cursor.fetchall():
+            # 新数据库直接创建拆分后的结构
+            cursor.execute(f"CREATE TABLE artifacts ({_ARTIFACTS_COLUMNS})")
+        # 仅在资料表仍为旧结构（无自增主键）时重建并迁移，避免每次启动重写数据导致ID变化；
+        # 迁移后的表仍包含正文列，随后由 _split_artifact_contents 拆分
+        elif self._needs_rebuild(cursor, 'artifacts'):
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS artifacts_new (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    source_type VARCHAR(32),
+                    source_path TEXT,
+                    category VARCHAR(64),
+                    tags TEXT,
+                    metadata TEXT,
+                    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+                    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+                    is_active BOOLEAN DEFAULT 1
+                )
+            """)
         
-        # 检查是否需要迁移数据
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='artifacts_new'")
-        new_table_exists = cursor.fetchone()
+            # 检查是否需要迁移数据
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='artifacts_new'")
+            new_table_exists = cursor.fetchone()
         
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='artifacts'")
-        old_table_exists = cursor.fetchone()
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='artifacts'")
+            old_table_exists = cursor.fetchone()
         
-        if old_table_exists and new_table_exists:
-            # 将旧表数据迁移到新表（忽略id列，让SQLite自动生成）
-            try:
-                cursor.execute("""
-                    INSERT INTO artifacts_new (title, content, source_type, source_path, 
-                                             category, tags, metadata, created_at, updated_at, is_active)
-                    SELECT title, content, source_type, source_path, 
-                           category, tags, metadata, created_at, updated_at, is_active
-                    FROM artifacts
-                    WHERE id IS NOT NULL
-                """)
+            if old_table_exists and new_table_exists:
+                # 将旧表数据迁移到新表（忽略id列，让SQLite自动生成）
+                try:
+                    cursor.execute("""
+                        INSERT INTO artifacts_new (title, content, source_type, source_path, 
+                                                 category, tags, metadata, created_at, updated_at, is_active)
+                        SELECT title, content, source_type, source_path, 
+                               category, tags, metadata, created_at, updated_at, is_active
+                        FROM artifacts
+                        WHERE id IS NOT NULL
+                    """)
                 
-                # 删除旧表
-                cursor.execute("DROP TABLE artifacts")
+                    # 删除旧表
+                    cursor.execute("DROP TABLE artifacts")
                 
-                # 重命名新表
-                cursor.execute("ALTER TABLE artifacts_new RENAME TO artifacts")
+                    # 重命名新表
+                    cursor.execute("ALTER TABLE artifacts_new RENAME TO artifacts")
                 
-            except sqlite3.Error:
-                # 如果迁移失败，删除新表
-                cursor.execute("DROP TABLE IF EXISTS artifacts_new")
+                except sqlite3.Error:
+                    # 如果迁移失败，删除新表
+                    cursor.execute("DROP TABLE IF EXISTS artifacts_new")
         
-        elif new_table_exists and not old_table_exists:
-            # 如果只有新表存在，重命名它
-            cursor.execute("ALTER TABLE artifacts_new RENAME TO artifacts")
+            elif new_table_exists and not old_table_exists:
+                # 如果只有新表存在，重命名它
+                cursor.execute("ALTER TABLE artifacts_new RENAME TO artifacts")
         
-        # 切片表
+        # 资料内容表：正文、标签和元数据与资料表分开存放，资料表只保留列表、统计和排序用到的小字段
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS chunks_new (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                artifact_id INTEGER NOT NULL,
-                chunk_index INTEGER NOT NULL,
+            CREATE TABLE IF NOT EXISTS artifact_contents (
+                artifact_id INTEGER PRIMARY KEY,
                 content TEXT NOT NULL,
-                token_count INTEGER,
+                tags TEXT,
                 metadata TEXT,
-                created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
                 FOREIGN KEY (artifact_id) REFERENCES artifacts(id) ON DELETE CASCADE
             )
         """)
+        self._split_artifact_contents(cursor)
+        # 未开启外键约束，删除资料时由触发器清理对应内容
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_artifacts_delete_contents
+            AFTER DELETE ON artifacts
+            BEGIN
+                DELETE FROM artifact_contents WHERE artifact_id = OLD.id;
+            END
+        """)
         
-        # 检查是否需要迁移数据
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='chunks_new'")
-        new_chunks_table_exists = cursor.fetchone()
+        # 切片表
+        if self._needs_rebuild(cursor, 'chunks'):
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS chunks_new (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    artifact_id INTEGER NOT NULL,
+                    chunk_index INTEGER NOT NULL,
+                    content TEXT NOT NULL,
+                    token_count INTEGER,
+                    metadata TEXT,
+                    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+                    FOREIGN KEY (artifact_id) REFERENCES artifacts(id) ON DELETE CASCADE
+                )
+            """)
         
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='chunks'")
-        old_chunks_table_exists = cursor.fetchone()
+            # 检查是否需要迁移数据
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='chunks_new'")
+            new_chunks_table_exists = cursor.fetchone()
         
-        if old_chunks_table_exists and new_chunks_table_exists:
-            # 将旧表数据迁移到新表
-            try:
-                cursor.execute("""
-                    INSERT INTO chunks_new (artifact_id, chunk_index, content, token_count, metadata, created_at)
-                    SELECT CAST(artifact_id AS INTEGER), chunk_index, content, token_count, metadata, created_at
-                    FROM chunks
-                """)
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='chunks'")
+            old_chunks_table_exists = cursor.fetchone()
+        
+            if old_chunks_table_exists and new_chunks_table_exists:
+                # 将旧表数据迁移到新表
+                try:
+                    cursor.execute("""
+                        INSERT INTO chunks_new (artifact_id, chunk_index, content, token_count, metadata, created_at)
+                        SELECT CAST(artifact_id AS INTEGER), chunk_index, content, token_count, metadata, created_at
+                        FROM chunks
+                    """)
                 
-                # 删除旧表
-                cursor.execute("DROP TABLE chunks")
+                    # 删除旧表
+                    cursor.execute("DROP TABLE chunks")
                 
-                # 重命名新表
-                cursor.execute("ALTER TABLE chunks_new RENAME TO chunks")
+                    # 重命名新表
+                    cursor.execute("ALTER TABLE chunks_new RENAME TO chunks")
                 
-            except sqlite3.Error:
-                # 如果迁移失败，删除新表
-                cursor.execute("DROP TABLE IF EXISTS chunks_new")
+                except sqlite3.Error:
+                    # 如果迁移失败，删除新表
+                    cursor.execute("DROP TABLE IF EXISTS chunks_new")
+        
+            elif new_chunks_table_exists and not old_chunks_table_exists:
+                # 如果只有新表存在，重命名它
+                cursor.execute("ALTER TABLE chunks_new RENAME TO chunks")
         
-        elif new_chunks_table_exists and not old_chunks_table_exists:
-            # 如果只有新表存在，重命名它
-            cursor.execute("ALTER TABLE chunks_new RENAME TO chunks")
+        # 删除资料时一并删除切片
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_artifacts_delete_chunks
+            AFTER DELETE ON artifacts
+            BEGIN
+                DELETE FROM chunks WHERE artifact_id = OLD.id;
+            END
+        """)
         
         # 检索历史表
         cursor.execute("""
@@ -186,15 +252,117 @@ class DatabaseManager:
         
 
         
+        # 向量同步outbox表：与资料变更同一事务写入，由后台任务同步到向量数据库
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS vector_sync_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                artifact_id INTEGER NOT NULL,
+                operation VARCHAR(16) NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                dead_at REAL
+            )
+        """)
+        # 旧版outbox表没有死信列：重试次数用尽的记录写入 dead_at 后不再处理
+        cursor.execute("PRAGMA table_info(vector_sync_outbox)")
+        if 'dead_at' not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE vector_sync_outbox ADD COLUMN dead_at REAL")
+        
         # 创建索引
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_category ON artifacts(category)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_created_at ON artifacts(created_at)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_chunks_artifact_id ON chunks(artifact_id)")
+        # 按分类筛选的列表与统计只需读取索引
+        cursor.execute("DROP INDEX IF EXISTS idx_artifacts_category")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_category_created_at ON artifacts(category, created_at DESC, id DESC)")
+        # 有效资料的统计与按ID分批读取
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_active_id ON artifacts(is_active, id)")
+        # 资料列表按 (created_at, id) 排序并做游标分页，复合索引覆盖排序与范围条件
+        cursor.execute("DROP INDEX IF EXISTS idx_artifacts_created_at")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_created_at_id ON artifacts(created_at DESC, id DESC)")
+        # 按资料读取切片（按切片序号排序）
+        cursor.execute("DROP INDEX IF EXISTS idx_chunks_artifact_id")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_chunks_artifact_id_chunk_index ON chunks(artifact_id, chunk_index)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_api_access_logs_created_at ON api_access_logs(created_at)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_api_access_logs_endpoint ON api_access_logs(endpoint)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_vector_sync_outbox_next_attempt ON vector_sync_outbox(next_attempt_at)")
+        
+        self._create_generation_triggers(cursor)
         
         self.sqlite_conn.commit()
     
+    def _create_generation_triggers(self, cursor):
+        """
+        为计算ETag的表创建写入触发器，维护表版本号（表数据变化后版本号递增）
+        
+        只覆盖资料表、资料内容表和表浏览器配置中的表，outbox、缓存等频繁写入的内部表不维护版本号；
+        不在范围内的表上旧版本创建的触发器会被删除
+        """
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS table_generations (
+                table_name TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        """)
+        tracked = set(GENERATION_TABLES) | set(get_all_table_configs().keys())
+        
+        cursor.execute("SELECT name, tbl_name FROM sqlite_master WHERE type = 'trigger'")
+        for trigger_name, table_name in cursor.fetchall():
+            if table_name not in tracked and trigger_name.startswith(f"trg_{table_name}_generation_"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+        
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND name != 'table_generations'
+        """)
+        for (table_name,) in cursor.fetchall():
+            if table_name not in tracked:
+                continue
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table_name}_generation_{event.lower()}
+                    AFTER {event} ON {table_name}
+                    BEGIN
+                        INSERT INTO table_generations (table_name, generation) VALUES ('{table_name}', 1)
+                        ON CONFLICT(table_name) DO UPDATE SET generation = generation + 1;
+                    END
+                """)
+    
+    def _split_artifact_contents(self, cursor):
+        """将旧结构资料表中的正文、标签和元数据迁移到资料内容表，并重建不含大字段的资料表（保留原有ID）"""
+        cursor.execute("PRAGMA table_info(artifacts)")
+        if 'content' not in {row[1] for row in cursor.fetchall()}:
+            return
+        
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'artifacts'")
+        row = cursor.fetchone()
+        last_seq = row[0] if row else 0
+        
+        try:
+            cursor.execute("DROP TABLE IF EXISTS artifacts_slim")
+            cursor.execute(f"CREATE TABLE artifacts_slim ({_ARTIFACTS_COLUMNS})")
+            cursor.execute("""
+                INSERT OR REPLACE INTO artifact_contents (artifact_id, content, tags, metadata)
+                SELECT id, COALESCE(content, ''), tags, metadata FROM artifacts
+            """)
+            migrated = cursor.rowcount
+            cursor.execute("""
+                INSERT INTO artifacts_slim (id, title, source_type, source_path, category, created_at, updated_at, is_active)
+                SELECT id, title, source_type, source_path, category, created_at, updated_at, is_active
+                FROM artifacts
+            """)
+            cursor.execute("DROP TABLE artifacts")
+            cursor.execute("ALTER TABLE artifacts_slim RENAME TO artifacts")
+            # 保留自增序列，已删除资料的ID不会被重新分配
+            cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'artifacts'", (last_seq,))
+            self.sqlite_conn.commit()
+            if migrated:
+                log(f"SQLite - 已将 {migrated} 条资料的正文迁移到资料内容表", LogType.DATABASE, "INFO")
+        except sqlite3.Error as e:
+            self.sqlite_conn.rollback()
+            cursor.execute("DROP TABLE IF EXISTS artifacts_slim")
+            log(f"SQLite - 迁移资料内容表失败: {e}", LogType.DATABASE, "ERROR")
+            raise
+    
     def init_chroma(self):
         """初始化Chroma向量数据库"""
         if not self.chroma_available:
@@ -239,10 +407,11 @@ class DatabaseManager:
                     )
                 )
                 
-                # 检查集合是否存在
+                # 检查集合是否存在（集合名称来自配置，蓝绿切换后指向新版本集合）
+                collection_name = config.CHROMA_COLLECTION_NAME
                 try:
                     existing_collection = self.chroma_client.get_collection(
-                        name="artifact_embeddings",
+                        name=collection_name,
                         embedding_function=None
                     )
                     # 检查集合是否使用了预计算的向量
@@ -253,30 +422,18 @@ class DatabaseManager:
                     else:
                         # 集合存在但配置不正确，删除并重新创建
                         log("ChromaDB - 现有ChromaDB集合配置不正确，重新创建", LogType.DATABASE, "WARNING")
-                        self.chroma_client.delete_collection(name="artifact_embeddings")
+                        self.chroma_client.delete_collection(name=collection_name)
                         # 重新创建集合，使用预计算的向量
-                        self.collection = self.chroma_client.create_collection(
-                            name="artifact_embeddings",
-                            metadata={
-                                "description": "语义检索系统资料向量存储",
-                                "use_precomputed_embeddings": "true"
-                            },
-                            embedding_function=None
-                        )
+                        self.collection = self.create_collection(collection_name)
                         log("ChromaDB - 重新创建ChromaDB集合成功，使用预计算的向量", LogType.DATABASE, "INFO")
                 except:
                     # 集合不存在，创建新的
                     # 有些版本的ChromaDB使用不同的异常类型
                     # 重要：不指定embedding_function，使用预计算的向量
-                    self.collection = self.chroma_client.create_collection(
-                        name="artifact_embeddings",
-                        metadata={
-                            "description": "语义检索系统资料向量存储",
-                            "use_precomputed_embeddings": "true"
-                        },
-                        embedding_function=None
-                    )
+                    self.collection = self.create_collection(collection_name)
                     log("ChromaDB - 创建ChromaDB集合成功，使用预计算的向量", LogType.DATABASE, "INFO")
+                
+                self._restore_previous_collection()
                     
             except Exception as e:
                 log(f"ChromaDB - ChromaDB初始化失败: {e}", LogType.DATABASE, "ERROR")
@@ -285,6 +442,154 @@ class DatabaseManager:
                 
         return self.chroma_client
         
+    def create_collection(self, name: str):
+        """创建使用预计算向量的集合"""
+        return self.chroma_client.create_collection(
+            name=name,
+            metadata={
+                "description": "语义检索系统资料向量存储",
+                "use_precomputed_embeddings": "true"
+            },
+            embedding_function=None
+        )
+    
+    def get_summary_collection(self):
+        """获取资料摘要向量集合（资料增强生成的摘要，作为第二检索字段），不存在时创建；ChromaDB不可用时返回None"""
+        if self.init_chroma() is None:
+            return None
+        return self.chroma_client.get_or_create_collection(
+            name=config.ENRICHMENT_SUMMARY_COLLECTION,
+            metadata={
+                "description": "语义检索系统资料摘要向量存储",
+                "use_precomputed_embeddings": "true"
+            },
+            embedding_function=None
+        )
+    
+    def _next_collection_name(self) -> str:
+        """生成下一个版本的集合名称，例如 artifact_embeddings__v2"""
+        current_name = self.collection.name if self.collection else config.CHROMA_COLLECTION_NAME
+        base_name = current_name.split("__v")[0]
+        
+        # 在现有集合中查找同一基础名称下的最大版本号
+        max_version = 1
+        pattern = re.compile(rf"^{re.escape(base_name)}__v(\d+)$")
+        for collection in self.chroma_client.list_collections():
+            match = pattern.match(collection.name)
+            if match:
+                max_version = max(max_version, int(match.group(1)))
+        
+        return f"{base_name}__v{max_version + 1}"
+    
+    def create_shadow_collection(self):
+        """
+        创建影子集合，用于在后台重建向量索引
+        
+        构建期间查询仍然访问当前集合，写入会同时应用到影子集合
+        """
+        if not self.chroma_available or not self.chroma_client:
+            raise RuntimeError("ChromaDB不可用，无法创建影子集合")
+        
+        with self._collection_lock:
+            if self.shadow_collection is not None:
+                raise RuntimeError(f"已有影子集合正在构建: {self.shadow_collection.name}")
+            
+            shadow_name = self._next_collection_name()
+            self.shadow_collection = self.create_collection(shadow_name)
+        
+        log(f"ChromaDB - 创建影子集合成功: {shadow_name}", LogType.DATABASE, "INFO")
+        return self.shadow_collection
+    
+    def _persist_collection_name(self, name: str, previous_name: Optional[str]):
+        """
+        将当前集合和保留用于回滚的旧集合名称写入配置文件
+        
+        不通知配置监听器，集合切换不影响HTTP连接池等其他组件
+        """
+        config_manager = get_config_manager()
+        db_config = config_manager.get_config('database') or {}
+        chroma_config = db_config.setdefault('chroma', {})
+        chroma_config['collection_name'] = name
+        if previous_name:
+            chroma_config['previous_collection_name'] = previous_name
+        else:
+            chroma_config.pop('previous_collection_name', None)
+        config_manager.set_config(db_config, 'database', notify=False)
+    
+    def _restore_previous_collection(self):
+        """重启后恢复蓝绿切换前保留的旧集合，使回滚和过期集合清理在重启后仍然有效"""
+        db_config = get_config_manager().get_config('database') or {}
+        previous_name = (db_config.get('chroma') or {}).get('previous_collection_name')
+        if not previous_name or previous_name == self.collection.name:
+            return
+        
+        try:
+            self.previous_collection = self.chroma_client.get_collection(
+                name=previous_name,
+                embedding_function=None
+            )
+            log(f"ChromaDB - 已恢复可回滚的旧集合: {previous_name}", LogType.DATABASE, "INFO")
+        except Exception:
+            log(f"ChromaDB - 旧集合 {previous_name} 不存在，已清除回滚记录", LogType.DATABASE, "WARNING")
+            self._persist_collection_name(self.collection.name, None)
+    
+    def swap_collection(self):
+        """
+        将影子集合原子地切换为当前集合
+        
+        旧集合保留用于回滚，更早的旧集合会被删除
+        """
+        with self._collection_lock:
+            if self.shadow_collection is None:
+                raise RuntimeError("没有可切换的影子集合")
+            
+            stale_collection = self.previous_collection
+            self.previous_collection = self.collection
+            self.collection = self.shadow_collection
+            self.shadow_collection = None
+            new_name = self.collection.name
+            previous_name = self.previous_collection.name
+        
+        # 持久化当前集合和旧集合名称，重启后继续使用新集合并保留回滚能力
+        self._persist_collection_name(new_name, previous_name)
+        log(f"ChromaDB - 集合切换完成，当前集合: {new_name}", LogType.DATABASE, "INFO")
+        
+        if stale_collection is not None and stale_collection.name != new_name:
+            try:
+                self.chroma_client.delete_collection(name=stale_collection.name)
+                log(f"ChromaDB - 已删除过期集合: {stale_collection.name}", LogType.DATABASE, "INFO")
+            except Exception as e:
+                log(f"ChromaDB - 删除过期集合失败: {e}", LogType.DATABASE, "WARNING")
+        
+        return self.collection
+    
+    def rollback_collection(self):
+        """回滚到切换前保留的旧集合"""
+        with self._collection_lock:
+            if self.previous_collection is None:
+                raise RuntimeError("没有可回滚的旧集合")
+            
+            self.collection, self.previous_collection = self.previous_collection, self.collection
+            current_name = self.collection.name
+            previous_name = self.previous_collection.name
+        
+        self._persist_collection_name(current_name, previous_name)
+        log(f"ChromaDB - 已回滚到集合: {current_name}", LogType.DATABASE, "INFO")
+        return self.collection
+    
+    def discard_shadow_collection(self):
+        """丢弃构建失败的影子集合"""
+        with self._collection_lock:
+            shadow = self.shadow_collection
+            self.shadow_collection = None
+        
+        if shadow is not None:
+            try:
+                self.chroma_client.delete_collection(name=shadow.name)
+                log(f"ChromaDB - 已丢弃影子集合: {shadow.name}", LogType.DATABASE, "INFO")
+            except Exception as e:
+                log(f"ChromaDB - 丢弃影子集合失败: {e}", LogType.DATABASE, "WARNING")
+    
     def get_all_vectors(self):
         """获取所有向量数据（用于内存搜索）"""
         try:
@@ -330,7 +635,8 @@ class DatabaseManager:
                 AND name NOT IN ('sqlite_sequence')
             """)
             
-            tables = [row[0] for row in cursor.fetchall()]
+            # 表版本号不清空，避免版本号回到旧值后客户端缓存的ETag误判为未修改
+            tables = [row[0] for row in cursor.fetchall() if row[0] != 'table_generations']
             
             # 开始事务
             cursor.execute("BEGIN TRANSACTION")
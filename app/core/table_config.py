@@ -28,7 +28,8 @@ class TableConfigManager:
                     'sort_field': 'created_at',
                     'order': 'DESC',
                     'default_fields': ['created_at', 'updated_at', 'is_active'],
-                    'business_logic': ['vector_sync']
+                    'business_logic': ['vector_sync'],
+                    'read_only': True
                 },
                 'search_history': {
                     'sort_field': 'created_at',
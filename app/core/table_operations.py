@@ -2,6 +2,9 @@
 from typing import Dict, List, Optional, Any
 import sqlite3
 
+# 由资料接口统一维护的表（正文分表存放、向量同步），通用表操作只允许读取
+SERVICE_MANAGED_TABLES = ('artifacts', 'artifact_contents')
+
 
 class TableOperationService:
     """表操作服务类"""
@@ -33,6 +36,19 @@ class TableOperationService:
         except Exception:
             return False
     
+    def is_read_only(self, table_name: str) -> bool:
+        """判断表是否只读（由资料接口维护的表，或表配置指定了read_only）
+        
+        Args:
+            table_name: 表名
+            
+        Returns:
+            bool: 是否只读
+        """
+        if table_name in SERVICE_MANAGED_TABLES:
+            return True
+        return bool(self.table_config.get(table_name, {}).get('read_only', False))
+    
     def get_table_schema(self, table_name: str) -> Optional[List[Dict]]:
         """获取表结构
         
@@ -196,6 +212,13 @@ class TableOperationService:
                 'record_id': None
             }
         
+        if self.is_read_only(table_name):
+            return {
+                'success': False,
+                'message': '表为只读，不允许写入',
+                'record_id': None
+            }
+        
         try:
             cursor = self.db.cursor()
             
@@ -242,6 +265,12 @@ class TableOperationService:
                 'message': '无效的表名'
             }
         
+        if self.is_read_only(table_name):
+            return {
+                'success': False,
+                'message': '表为只读，不允许写入'
+            }
+        
         try:
             cursor = self.db.cursor()
             primary_key = self.get_primary_key(table_name)
@@ -297,6 +326,12 @@ class TableOperationService:
                 'message': '无效的表名'
             }
         
+        if self.is_read_only(table_name):
+            return {
+                'success': False,
+                'message': '表为只读，不允许写入'
+            }
+        
         try:
             cursor = self.db.cursor()
             primary_key = self.get_primary_key(table_name)
@@ -87,27 +87,37 @@ class ConfigManager:
         
         return default
     
-    def set_config(self, value, section: str = None, key: str = None):
-        """设置配置值 - 这将触发自动同步到文件"""
+    def set_config(self, value, section: str = None, key: str = None, notify: bool = True):
+        """
+        设置配置值 - 这将触发自动同步到文件
+
+        Args:
+            notify: 是否通知配置变化监听器（运行时状态的持久化无需通知）
+        """
         if section is None:
             # 设置整个配置数据
             old_value = deepcopy(self._config_data)
             self._config_data = value
-            self._on_config_changed("root", old_value, value)
+            key_path = "root"
         elif key is None:
             # 设置整个section
             old_value = deepcopy(self._config_data.get(section))
             if section not in self._config_data:
                 self._config_data[section] = {}
             self._config_data[section] = value
-            self._on_config_changed(f"section:{section}", old_value, value)
+            key_path = f"section:{section}"
         else:
             # 设置特定的key
             if section not in self._config_data:
                 self._config_data[section] = {}
             old_value = self._config_data[section].get(key)
             self._config_data[section][key] = value
-            self._on_config_changed(f"{section}.{key}", old_value, value)
+            key_path = f"{section}.{key}"
+
+        if notify:
+            self._on_config_changed(key_path, old_value, value)
+        else:
+            self._save_current_config()
     
     def update_config(self, updates: Dict[str, Any]):
         """批量更新配置"""
@@ -55,12 +55,28 @@ class ArtifactResponse(ArtifactBase):
         from_attributes = True
 
 
+class ArtifactProjection(BaseModel):
+    """资料字段投影模型（仅返回请求的字段，snippet为命中位置附近的内容摘要）"""
+    id: int = Field(..., description="资料ID")
+    title: Optional[str] = Field(None, description="资料标题")
+    content: Optional[str] = Field(None, description="资料内容")
+    snippet: Optional[str] = Field(None, description="内容摘要")
+    category: Optional[str] = Field(None, description="分类标签")
+    source_type: Optional[str] = Field(None, description="来源类型")
+    source_path: Optional[str] = Field(None, description="来源路径")
+    similarity: Optional[float] = Field(None, description="相似度得分")
+    created_at: Optional[datetime] = Field(None, description="创建时间")
+    updated_at: Optional[datetime] = Field(None, description="更新时间")
+    is_active: Optional[bool] = Field(None, description="是否激活")
+
+
 class ArtifactListResponse(BaseModel):
     """资料列表响应模型"""
-    artifacts: List[ArtifactResponse] = Field(..., description="资料列表")
-    total_count: int = Field(..., description="总数量")
+    artifacts: List[ArtifactProjection] = Field(..., description="资料列表")
+    total_count: Optional[int] = Field(None, description="总数量（count=none时不统计）")
     page: int = Field(..., description="当前页码")
     size: int = Field(..., description="每页大小")
+    next_cursor: Optional[str] = Field(None, description="下一页游标，没有更多数据时为空")
 
 
 class SearchResult(ArtifactResponse):
@@ -75,6 +91,17 @@ class SearchRequest(BaseModel):
     threshold: float = Field(0.7, description="相似度阈值", ge=0.0, le=1.0)
     category_filter: Optional[List[str]] = Field(None, description="分类过滤")
     metadata_filter: Optional[Dict[str, Any]] = Field(None, description="元数据过滤")
+    fields: Optional[List[str]] = Field(None, description="返回字段（为空时返回完整资料），可包含snippet以返回内容摘要")
+    snippet_length: int = Field(200, description="内容摘要长度（字符）", ge=20, le=2000)
+
+
+class AnswerRequest(BaseModel):
+    """检索问答请求模型"""
+    query: str = Field(..., description="问题", min_length=1, max_length=1000)
+    top_k: int = Field(5, description="检索的参考资料数量", ge=1, le=20)
+    threshold: float = Field(0.7, description="相似度阈值", ge=0.0, le=1.0)
+    category_filter: Optional[List[str]] = Field(None, description="分类过滤")
+    max_context_tokens: Optional[int] = Field(None, description="参考资料上下文的token预算（为空时使用配置值）", ge=256, le=32000)
 
 
 class SearchResponse(BaseModel):
@@ -99,6 +126,12 @@ class MetricsResponse(BaseModel):
     chunk_count: int = Field(..., description="切片总数")
     search_count: int = Field(..., description="检索次数")
     avg_response_time: float = Field(..., description="平均响应时间(秒)")
+    circuit_breakers: Optional[Dict[str, Dict[str, Any]]] = Field(None, description="AI服务熔断器状态")
+    embedding_rate_limit: Optional[Dict[str, Any]] = Field(None, description="Embedding客户端限流状态")
+    embedding_store_size: Optional[int] = Field(None, description="本地向量存储中的向量数量")
+    llm_cache: Optional[Dict[str, Any]] = Field(None, description="LLM响应缓存状态（条目数和命中率）")
+    vector_sync_outbox: Optional[Dict[str, Any]] = Field(None, description="向量同步outbox积压状态")
+    enrichment: Optional[Dict[str, Any]] = Field(None, description="资料增强队列状态")
 
 
 class BatchImportRequest(BaseModel):
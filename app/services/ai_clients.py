@@ -3,29 +3,115 @@ AI服务客户端模块
 包含LLM和Embedding服务的客户端实现
 """
 import asyncio
-from typing import List, Optional, Dict, Any
+import os
+from typing import List, Optional, Dict, Any, AsyncIterator, Iterable, Tuple
+import httpx
 import openai
 from openai import AsyncOpenAI
 import logging
 
 from ..core.config import config
+from .embedding_dispatcher import EmbeddingDispatcher
+from .http_pool import http_pool
+from .llm_cache import llm_cache, cache_key
+from .rate_limiter import PriorityRateLimiter, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, estimate_tokens
+from .resilience import CircuitBreaker, retry_async
 
 logger = logging.getLogger(__name__)
 
 
+def _is_transient_error(error: Exception) -> bool:
+    """
+    判断异常是否为可重试的瞬时故障（网络错误、超时、限流、服务端错误）
+    
+    参数错误、响应解析失败等其他异常不重试，也不计入熔断
+    """
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    # APITimeoutError 是 APIConnectionError 的子类
+    return isinstance(error, (openai.APIConnectionError, httpx.TransportError))
+
+
+# 提示词模板版本，修改对应提示词时递增，使旧的缓存结果失效
+_SUMMARY_TEMPLATE = "summary:v1"
+_METADATA_TEMPLATE = "metadata:v1"
+_ANSWER_TEMPLATE = "answer:v1"
+
+
+def _create_breaker(name: str) -> CircuitBreaker:
+    """按配置创建熔断器"""
+    return CircuitBreaker(
+        name,
+        failure_threshold=config.AI_CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout=config.AI_CIRCUIT_RECOVERY_TIMEOUT
+    )
+
+
 class LLMClient:
     """大语言模型客户端"""
     
     def __init__(self):
         """初始化LLM客户端"""
+        self._build_client()
+        self.max_retries = config.LLM_MAX_RETRIES if hasattr(config, 'LLM_MAX_RETRIES') else 3
+        self.breaker = _create_breaker("llm")
+        logger.info(f"LLM客户端初始化完成，模型: {self.model}")
+    
+    def _build_client(self):
+        """基于共享连接池创建SDK客户端"""
+        # 重试由容错层统一处理，关闭SDK内置重试避免重复退避
         self.client = AsyncOpenAI(
             base_url=config.LLM_API_BASE_URL,
             api_key=config.LLM_API_KEY,
-            timeout=config.LLM_TIMEOUT
+            timeout=http_pool.build_timeout(config.LLM_TIMEOUT),
+            max_retries=0,
+            http_client=http_pool.get_client()
         )
         self.model = config.LLM_MODEL
-        self.max_retries = config.LLM_MAX_RETRIES if hasattr(config, 'LLM_MAX_RETRIES') else 3
-        logger.info(f"LLM客户端初始化完成，模型: {self.model}")
+        self._pool_generation = http_pool.generation
+    
+    def _get_client(self) -> AsyncOpenAI:
+        """获取SDK客户端，配置变更导致连接池重建后同步更新"""
+        if self._pool_generation != http_pool.generation:
+            self._build_client()
+        return self.client
+    
+    async def _chat_completion(self, **kwargs):
+        """带重试和熔断的对话补全调用"""
+        client = self._get_client()
+        return await retry_async(
+            lambda: client.chat.completions.create(model=self.model, **kwargs),
+            max_retries=self.max_retries,
+            base_delay=config.AI_RETRY_BASE_DELAY,
+            max_delay=config.AI_RETRY_MAX_DELAY,
+            breaker=self.breaker,
+            retryable=_is_transient_error
+        )
+    
+    def _cache_lookup(self, template: str, inputs: Any, context_versions: Optional[Iterable[Tuple]] = None):
+        """
+        查询LLM缓存
+        
+        Returns:
+            (缓存键, 缓存结果)：缓存未启用或不可用时缓存键为None，未命中时结果为None
+        """
+        if not llm_cache.enabled:
+            return None, None
+        key = cache_key(self.model, template, inputs, context_versions)
+        try:
+            return key, llm_cache.get(key)
+        except Exception as e:
+            logger.warning(f"读取LLM缓存失败: {str(e)}")
+            return None, None
+    
+    def _cache_store(self, key: Optional[str], template: str, value: Any):
+        """写入LLM缓存，失败时只记录日志"""
+        if key is None:
+            return
+        try:
+            llm_cache.put(key, template, value)
+        except Exception as e:
+            logger.warning(f"写入LLM缓存失败: {str(e)}")
     
     async def generate_summary(self, text: str, max_tokens: int = 300) -> str:
         """
@@ -38,9 +124,12 @@ class LLMClient:
         Returns:
             生成的摘要文本
         """
+        key, cached = self._cache_lookup(_SUMMARY_TEMPLATE, {"text": text, "max_tokens": max_tokens})
+        if cached is not None:
+            return cached
+        
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
+            response = await self._chat_completion(
                 messages=[
                     {
                         "role": "system", 
@@ -54,7 +143,9 @@ class LLMClient:
                 temperature=0.3,
                 max_tokens=max_tokens
             )
-            return response.choices[0].message.content.strip()
+            summary = response.choices[0].message.content.strip()
+            self._cache_store(key, _SUMMARY_TEMPLATE, summary)
+            return summary
         except Exception as e:
             logger.error(f"生成摘要失败: {str(e)}")
             raise
@@ -69,6 +160,11 @@ class LLMClient:
         Returns:
             提取的元数据字典
         """
+        # 提示词只使用前2000个字符，超出部分不影响结果
+        key, cached = self._cache_lookup(_METADATA_TEMPLATE, {"text": text[:2000]})
+        if cached is not None:
+            return cached
+        
         try:
             prompt = f"""
             请从以下文本中提取相关的元数据信息，以JSON格式返回：
@@ -86,8 +182,7 @@ class LLMClient:
             只返回有效的JSON对象，不要包含其他解释文字。
             """
             
-            response = await self.client.chat.completions.create(
-                model=self.model,
+            response = await self._chat_completion(
                 messages=[
                     {
                         "role": "system", 
@@ -101,41 +196,101 @@ class LLMClient:
             
             import json
             result = json.loads(response.choices[0].message.content)
+            self._cache_store(key, _METADATA_TEMPLATE, result)
             return result
         except Exception as e:
             logger.error(f"提取元数据失败: {str(e)}")
             return {}
     
-    async def answer_question(self, query: str, context: str) -> str:
+    def _answer_messages(self, query: str, context: str) -> List[Dict[str, str]]:
+        """构建基于上下文回答问题的对话消息"""
+        return [
+            {
+                "role": "system", 
+                "content": "你是一个专业的知识问答助手，请基于提供的资料准确回答用户问题"
+            },
+            {
+                "role": "user", 
+                "content": f"参考资料：\n{context}\n\n问题：{query}"
+            }
+        ]
+    
+    async def answer_question(self, query: str, context: str,
+                              context_versions: Optional[Iterable[Tuple]] = None) -> str:
         """
         基于上下文回答问题
         
         Args:
             query: 用户问题
             context: 相关上下文
+            context_versions: 上下文资料版本，如 [(资料ID, 更新时间)]，用于缓存失效
             
         Returns:
             回答内容
         """
+        key, cached = self._cache_lookup(_ANSWER_TEMPLATE, {"query": query, "context": context}, context_versions)
+        if cached is not None:
+            return cached
+        
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "你是一个专业的知识问答助手，请基于提供的资料准确回答用户问题"
-                    },
-                    {
-                        "role": "user", 
-                        "content": f"参考资料：\n{context}\n\n问题：{query}"
-                    }
-                ],
+            response = await self._chat_completion(
+                messages=self._answer_messages(query, context),
                 temperature=0.2
             )
-            return response.choices[0].message.content.strip()
+            answer = response.choices[0].message.content.strip()
+            self._cache_store(key, _ANSWER_TEMPLATE, answer)
+            return answer
         except Exception as e:
             logger.error(f"回答问题失败: {str(e)}")
             raise
+    
+    async def stream_answer(self, query: str, context: str, max_tokens: Optional[int] = None,
+                            context_versions: Optional[Iterable[Tuple]] = None) -> AsyncIterator[str]:
+        """
+        基于上下文流式回答问题
+        
+        只对建立流式响应的请求做重试和熔断，开始输出后中断的错误直接抛出；
+        命中缓存时一次性返回完整回答，完整生成的回答写入缓存
+        
+        Args:
+            query: 用户问题
+            context: 相关上下文
+            max_tokens: 回答的最大token数
+            context_versions: 上下文资料版本，如 [(资料ID, 更新时间)]，用于缓存失效
+            
+        Yields:
+            回答内容片段
+        """
+        key, cached = self._cache_lookup(
+            _ANSWER_TEMPLATE, {"query": query, "context": context, "max_tokens": max_tokens}, context_versions
+        )
+        if cached is not None:
+            yield cached
+            return
+        
+        kwargs = {"messages": self._answer_messages(query, context), "temperature": 0.2, "stream": True}
+        if max_tokens:
+            kwargs["max_tokens"] = max_tokens
+        
+        parts = []
+        stream = await self._chat_completion(**kwargs)
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+        self._cache_store(key, _ANSWER_TEMPLATE, "".join(parts))
+    
+    async def warm_up(self):
+        """
+        预先建立到LLM服务的连接
+        
+        在共享连接池中完成TCP/TLS握手，与检索并行执行，随后的对话请求直接复用该连接；失败时忽略
+        """
+        try:
+            client = self._get_client().with_options(timeout=config.HTTP_POOL_CONNECT_TIMEOUT, max_retries=0)
+            await client.models.list()
+        except Exception as e:
+            logger.debug(f"LLM连接预热失败（忽略）: {str(e)}")
 
 
 class EmbeddingClient:
@@ -143,60 +298,206 @@ class EmbeddingClient:
     
     def __init__(self):
         """初始化Embedding客户端"""
+        self._build_client()
+        self.dimensions = config.EMBEDDING_DIMENSIONS
+        self.max_retries = config.EMBEDDING_MAX_RETRIES if hasattr(config, 'EMBEDDING_MAX_RETRIES') else 3
+        self.provider = config.EMBEDDING_PROVIDER
+        self.breaker = _create_breaker("embedding")
+        # 本地ONNX模型在首次使用时加载，避免导入模块时阻塞启动
+        self._onnx_backend = None
+        self._onnx_lock = asyncio.Lock()
+        # 客户端限流：交互式查询优先于后台导入/重建索引流量
+        self.rate_limiter = PriorityRateLimiter(
+            requests_per_second=config.EMBEDDING_RATE_LIMIT_REQUESTS_PER_SECOND,
+            tokens_per_second=config.EMBEDDING_RATE_LIMIT_TOKENS_PER_SECOND,
+            background_reserve=config.EMBEDDING_RATE_LIMIT_BACKGROUND_RESERVE,
+            enabled=config.EMBEDDING_RATE_LIMIT_ENABLED
+        )
+        # 并发的单条请求在短时间窗口内合并为一次批量请求（按优先级分别合并）
+        self.dispatchers = {
+            priority: EmbeddingDispatcher(
+                lambda texts, priority=priority: self._embed_texts(texts, priority),
+                window_ms=config.EMBEDDING_MICRO_BATCH_WINDOW_MS,
+                max_batch_size=config.EMBEDDING_MICRO_BATCH_MAX_SIZE
+            )
+            for priority in (PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND)
+        } if config.EMBEDDING_MICRO_BATCH_ENABLED else {}
+        logger.info(f"Embedding客户端初始化完成，提供方: {self.provider}，模型: {self.model}")
+    
+    def _build_client(self):
+        """基于共享连接池创建SDK客户端"""
+        # 重试由容错层统一处理，关闭SDK内置重试避免重复退避
         self.client = AsyncOpenAI(
             base_url=config.EMBEDDING_API_BASE_URL,
             api_key=config.EMBEDDING_API_KEY,
-            timeout=config.EMBEDDING_TIMEOUT
+            timeout=http_pool.build_timeout(config.EMBEDDING_TIMEOUT),
+            max_retries=0,
+            http_client=http_pool.get_client()
         )
         self.model = config.EMBEDDING_MODEL
-        self.dimensions = config.EMBEDDING_DIMENSIONS
-        self.max_retries = config.EMBEDDING_MAX_RETRIES if hasattr(config, 'EMBEDDING_MAX_RETRIES') else 3
-        logger.info(f"Embedding客户端初始化完成，模型: {self.model}")
+        self._pool_generation = http_pool.generation
+    
+    def _get_client(self) -> AsyncOpenAI:
+        """获取SDK客户端，配置变更导致连接池重建后同步更新"""
+        if self._pool_generation != http_pool.generation:
+            self._build_client()
+        return self.client
+    
+    @property
+    def model_key(self) -> str:
+        """
+        当前向量模型标识（用于向量缓存的键，区分远程模型与本地ONNX模型）
+        
+        本地模型文件名通常都是model.onnx，因此使用完整路径、文件大小和修改时间，替换或回滚模型文件后不会命中旧模型的向量
+        """
+        if self.provider == "onnx":
+            path = os.path.abspath(config.EMBEDDING_ONNX_MODEL_PATH)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return f"onnx:{path}"
+            return f"onnx:{path}:{stat.st_size}:{stat.st_mtime_ns}"
+        return self.model
+    
+    async def _get_onnx_backend(self):
+        """获取（必要时在执行器中加载）本地ONNX向量模型，并发的首次调用只加载一次"""
+        if self._onnx_backend is None:
+            async with self._onnx_lock:
+                if self._onnx_backend is None:
+                    from .onnx_embedding import load_onnx_backend
+                    self._onnx_backend = await load_onnx_backend(
+                        model_path=config.EMBEDDING_ONNX_MODEL_PATH,
+                        tokenizer_path=config.EMBEDDING_ONNX_TOKENIZER_PATH,
+                        max_length=config.EMBEDDING_ONNX_MAX_LENGTH,
+                        batch_size=config.EMBEDDING_ONNX_BATCH_SIZE,
+                        intra_op_threads=config.EMBEDDING_ONNX_INTRA_OP_THREADS,
+                        expected_dimensions=self.dimensions
+                    )
+        return self._onnx_backend
+    
+    async def _embed_texts(self, texts: List[str], priority: str = PRIORITY_BACKGROUND) -> List[List[float]]:
+        """
+        单次调用向量化一组文本
+        
+        Args:
+            texts: 文本列表
+            priority: 请求优先级，用于客户端限流
+            
+        Returns:
+            与输入顺序一致的向量列表
+        """
+        if self.provider == "onnx":
+            backend = await self._get_onnx_backend()
+            return await backend.embed_batch(texts)
+        
+        tokens = sum(estimate_tokens(text) for text in texts)
+        client = self._get_client()
+        
+        async def request():
+            # 每次尝试（包括重试）都先获取令牌，重试同样计入限流
+            await self.rate_limiter.acquire(tokens, priority)
+            return await client.embeddings.create(model=self.model, input=texts)
+        
+        # 远程调用带重试和熔断，批量调用时失败只重试当前批次
+        response = await retry_async(
+            request,
+            max_retries=self.max_retries,
+            base_delay=config.AI_RETRY_BASE_DELAY,
+            max_delay=config.AI_RETRY_MAX_DELAY,
+            breaker=self.breaker,
+            retryable=_is_transient_error
+        )
+        return [item.embedding for item in response.data]
     
-    async def embed(self, text: str) -> List[float]:
+    async def embed(self, text: str, priority: str = PRIORITY_BACKGROUND) -> List[float]:
         """
         将文本转换为向量
         
         Args:
             text: 输入文本
+            priority: 请求优先级，交互式查询使用 PRIORITY_INTERACTIVE
             
         Returns:
             向量表示（浮点数列表）
         """
         try:
-            response = await self.client.embeddings.create(
-                model=self.model,
-                input=text
-            )
-            return response.data[0].embedding
+            dispatcher = self.dispatchers.get(priority)
+            if dispatcher is not None:
+                return await dispatcher.submit(text)
+            
+            return (await self._embed_texts([text], priority))[0]
         except Exception as e:
             logger.error(f"文本向量化失败: {str(e)}")
             raise
     
-    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+    def _split_batches(self, texts: List[str]) -> List[List[int]]:
+        """
+        按文本数量和字符总数切分批次
+        
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            批次列表，每个批次为原列表中的下标
+        """
+        max_items = max(config.BATCH_SIZE, 1)
+        max_chars = max(config.EMBEDDING_BATCH_MAX_CHARS, 1)
+        
+        batches = []
+        current = []
+        current_chars = 0
+        for index, text in enumerate(texts):
+            text_chars = len(text)
+            # 超出数量或字符预算时开启新批次（单条超长文本独占一个批次）
+            if current and (len(current) >= max_items or current_chars + text_chars > max_chars):
+                batches.append(current)
+                current = []
+                current_chars = 0
+            current.append(index)
+            current_chars += text_chars
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def embed_batch(self, texts: List[str], priority: str = PRIORITY_BACKGROUND) -> List[List[float]]:
         """
         批量文本向量化
         
+        按数量和字符预算切分批次，并在信号量限制下并发发送，结果保持输入顺序；
+        任一批次失败时取消其余批次
+        
         Args:
             texts: 文本列表
+            priority: 请求优先级，默认为后台流量
             
         Returns:
             向量列表
         """
         try:
-            # 分批处理避免超出API限制
-            batch_size = 10
-            embeddings = []
-            
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i:i + batch_size]
-                response = await self.client.embeddings.create(
-                    model=self.model,
-                    input=batch
-                )
-                batch_embeddings = [item.embedding for item in response.data]
-                embeddings.extend(batch_embeddings)
-                
+            if self.provider == "onnx":
+                backend = await self._get_onnx_backend()
+                return await backend.embed_batch(texts)
+            
+            embeddings: List[Optional[List[float]]] = [None] * len(texts)
+            semaphore = asyncio.Semaphore(max(config.EMBEDDING_BATCH_MAX_CONCURRENCY, 1))
+            
+            async def run_batch(indices: List[int]):
+                async with semaphore:
+                    vectors = await self._embed_texts([texts[i] for i in indices], priority)
+                for index, vector in zip(indices, vectors):
+                    embeddings[index] = vector
+            
+            tasks = [asyncio.ensure_future(run_batch(indices)) for indices in self._split_batches(texts)]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                # 任一批次失败后结果会被整体丢弃，取消其余批次，避免继续消耗限流令牌和熔断预算
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+            
             return embeddings
         except Exception as e:
             logger.error(f"批量向量化失败: {str(e)}")
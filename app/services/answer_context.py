@@ -0,0 +1,71 @@
+"""
+问答上下文构建模块
+按相关度顺序将检索结果装入有token预算的参考资料上下文，超出预算的资料截断或舍弃
+"""
+from typing import List, Tuple
+
+from app.services.rate_limiter import estimate_tokens
+
+# 剩余预算不足该值时不再装入新的资料（过短的截断片段对回答没有帮助）
+_MIN_SOURCE_TOKENS = 64
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """按token预算截断文本（先按比例估算字符数，再逐步收缩到预算内）"""
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    length = len(text) * max_tokens // tokens
+    while length > 0 and estimate_tokens(text[:length]) > max_tokens:
+        length = length * 9 // 10
+    return text[:length].rstrip() + "…"
+
+
+def _source_text(result: dict) -> str:
+    """资料在上下文中使用的文本：有命中切片时按原文顺序拼接切片，否则使用全文"""
+    chunks = result.get("chunks")
+    if chunks:
+        return "\n…\n".join(chunk["content"] for chunk in sorted(chunks, key=lambda chunk: chunk["chunk_index"]))
+    return result.get("content") or ""
+
+
+def build_context(results: List[dict], max_tokens: int) -> Tuple[str, List[dict]]:
+    """
+    构建参考资料上下文
+
+    Args:
+        results: 检索结果（按相关度降序，需包含id、title、content，向量命中的结果可包含chunks）
+        max_tokens: 上下文token预算
+
+    Returns:
+        (上下文文本, 实际使用的资料列表)，资料编号与上下文中的 [n] 对应
+    """
+    sections = []
+    sources = []
+    remaining = max_tokens
+
+    for result in results:
+        content = _source_text(result).strip()
+        if not content:
+            continue
+
+        header = f"[{len(sources) + 1}] {result.get('title') or ''}".rstrip()
+        budget = remaining - estimate_tokens(header)
+        if budget < _MIN_SOURCE_TOKENS:
+            break
+
+        truncated = estimate_tokens(content) > budget
+        if truncated:
+            content = _truncate(content, budget)
+        section = f"{header}\n{content}"
+        sections.append(section)
+        remaining -= estimate_tokens(section)
+        sources.append({
+            "index": len(sources) + 1,
+            "id": result["id"],
+            "title": result.get("title"),
+            "similarity": result.get("similarity"),
+            "truncated": truncated
+        })
+
+    return "\n\n".join(sections), sources
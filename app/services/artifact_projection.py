@@ -0,0 +1,147 @@
+"""
+资料字段投影模块
+按请求的字段列表生成查询列，并截取命中关键词附近的内容摘要，避免列表和检索接口返回完整正文
+"""
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# 支持投影的字段（snippet为内容摘要）
+PROJECTABLE_FIELDS = (
+    "id", "title", "content", "snippet", "category", "source_type", "source_path",
+    "created_at", "updated_at", "is_active"
+)
+
+# 存放在资料内容表（artifact_contents）中的字段，查询时需要关联该表
+CONTENT_FIELDS = ("content", "snippet")
+
+# 以文本存储的时间字段，输出时转换为ISO 8601格式（与模型序列化结果一致）
+_TIMESTAMP_FIELDS = ("created_at", "updated_at")
+
+# 默认摘要长度（字符）
+DEFAULT_SNIPPET_LENGTH = 200
+
+
+def parse_fields(fields: Optional[Union[str, List[str]]]) -> Optional[List[str]]:
+    """
+    解析字段列表
+
+    Args:
+        fields: 逗号分隔的字段名或字段名列表，为空表示不投影（返回完整字段）
+
+    Returns:
+        去重后的字段列表（始终包含id），不投影时返回None
+
+    Raises:
+        ValueError: 包含不支持的字段
+    """
+    if not fields:
+        return None
+
+    names = fields.split(",") if isinstance(fields, str) else list(fields)
+    names = [name.strip() for name in names if name and name.strip()]
+    unknown = [name for name in names if name not in PROJECTABLE_FIELDS]
+    if unknown:
+        raise ValueError(f"不支持的字段: {', '.join(unknown)}，可选字段: {', '.join(PROJECTABLE_FIELDS)}")
+
+    return list(dict.fromkeys(["id"] + names))
+
+
+def needs_content(fields: List[str]) -> bool:
+    """投影字段中是否包含需要关联资料内容表的字段"""
+    return any(field in CONTENT_FIELDS for field in fields)
+
+
+def snippet_sql(term: Optional[str], length: int, alias: str = "c") -> Tuple[str, list]:
+    """
+    生成内容摘要列的SQL表达式
+
+    没有关键词时直接在SQL中截取开头部分；有关键词时读取正文，由 cut_snippet 定位截取
+    （SQLite内置的lower()只转换ASCII字母，无法不区分大小写地匹配非ASCII关键词）
+
+    Args:
+        term: 关键词，为空时截取开头
+        length: 摘要长度（字符）
+        alias: 资料内容表别名
+
+    Returns:
+        (SQL表达式, 参数列表)
+    """
+    column = f"{alias}.content"
+    if not term:
+        return f"substr({column}, 1, ?)", [length]
+    return column, []
+
+
+def cut_snippet(content: Optional[str], term: Optional[str], length: int) -> Optional[str]:
+    """
+    截取内容摘要
+
+    不区分大小写地查找关键词，命中时从关键词前约1/4长度处开始截取，否则截取开头部分
+
+    Args:
+        content: 正文
+        term: 关键词
+        length: 摘要长度（字符）
+
+    Returns:
+        摘要文本，正文为空时原样返回
+    """
+    if not content:
+        return content
+    position = content.lower().find(term.lower()) if term else -1
+    start = max(0, position - length // 4) if position >= 0 else 0
+    return content[start:start + length]
+
+
+def select_columns(fields: List[str], term: Optional[str], snippet_length: int,
+                   alias: str = "a", content_alias: str = "c") -> Tuple[str, list]:
+    """
+    生成投影字段对应的查询列
+
+    Args:
+        fields: parse_fields返回的字段列表
+        term: 摘要定位关键词
+        snippet_length: 摘要长度
+        alias: 资料表别名
+        content_alias: 资料内容表别名
+
+    Returns:
+        (逗号分隔的列SQL, 参数列表)，列顺序与fields一致
+    """
+    columns = []
+    params = []
+    for field in fields:
+        if field == "snippet":
+            expression, snippet_params = snippet_sql(term, snippet_length, content_alias)
+            columns.append(f"{expression} AS snippet")
+            params.extend(snippet_params)
+        elif field == "content":
+            columns.append(f"{content_alias}.content")
+        else:
+            columns.append(f"{alias}.{field}")
+    return ", ".join(columns), params
+
+
+def row_to_dict(fields: List[str], row, term: Optional[str] = None,
+                snippet_length: int = DEFAULT_SNIPPET_LENGTH) -> Dict[str, Any]:
+    """
+    将查询行直接转换为响应字典（数据来自本地数据库，不再经过模型校验）
+
+    Args:
+        fields: 与查询列顺序一致的字段列表（行中多出的列被忽略）
+        row: 查询结果行
+        term: 摘要定位关键词（与生成查询列时一致）
+        snippet_length: 摘要长度
+
+    Returns:
+        字段名到值的字典
+    """
+    values = dict(zip(fields, row))
+    if term and "snippet" in values:
+        values["snippet"] = cut_snippet(values["snippet"], term, snippet_length)
+    for field in _TIMESTAMP_FIELDS:
+        value = values.get(field)
+        if isinstance(value, str):
+            values[field] = value.replace(" ", "T", 1)
+    if values.get("is_active") is not None:
+        values["is_active"] = bool(values["is_active"])
+    return values
@@ -7,7 +7,8 @@ import asyncio
 import threading
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-from app.services.vector_sync import vector_sync_service
+from app.services.vector_outbox import vector_outbox_worker, enqueue_vector_sync
+from app.services.enrichment import enrichment_queue, PRIORITY_LOW
 from app.core.database import db_manager
 from app.core.logger_manager import log, LogType
 from app.models.schemas import ArtifactCreate
@@ -161,25 +162,6 @@ class BatchImportService:
                     if artifact:
                         log(f"批量导入 - 第 {i+1} 条记录创建成功，ID: {artifact.id}", LogType.DATABASE, "INFO")
                         
-                        # 同步到向量数据库 - 等待完成
-                        try:
-                            # 确保ID是整数类型
-                            artifact_id = int(artifact.id) if isinstance(artifact.id, str) else artifact.id
-                            
-                            # 直接等待向量同步完成
-                            await vector_sync_service.sync_artifact_to_vector_db(
-                                artifact_id,
-                                artifact.title,
-                                artifact.content,
-                                artifact.category or ""
-                            )
-                            log(f"批量导入 - 第 {i+1} 条记录向量同步成功", LogType.DATABASE, "INFO")
-                        except Exception as sync_error:
-                            import logging
-                            logger = logging.getLogger(__name__)
-                            logger.error(f"向量同步失败: {str(sync_error)}", exc_info=True)
-                            log(f"批量导入 - 第 {i+1} 条记录向量同步失败: {str(sync_error)}", LogType.DATABASE, "ERROR")
-                        
                         success_count += 1
                     else:
                         log(f"批量导入 - 第 {i+1} 条记录创建失败", LogType.DATABASE, "ERROR")
@@ -251,20 +233,15 @@ class BatchImportService:
             
             # 插入资料
             cursor.execute("""
-                INSERT INTO artifacts (title, content, category, tags, metadata, source_type, source_path, is_active, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, 1, datetime('now', 'localtime'), datetime('now', 'localtime'))
+                INSERT INTO artifacts (title, category, source_type, source_path, is_active, created_at, updated_at)
+                VALUES (?, ?, ?, ?, 1, datetime('now', 'localtime'), datetime('now', 'localtime'))
             """, (
                 artifact_create.title,
-                artifact_create.content,
                 artifact_create.category,
-                tags_str,
-                metadata_str,
                 artifact_create.source_type,
                 artifact_create.source_path
             ))
             
-            db["sqlite"].commit()
-            
             # 获取插入的ID
             artifact_id = cursor.lastrowid
             if artifact_id is None:
@@ -277,11 +254,23 @@ class BatchImportService:
                     # 如果还是获取不到，生成临时ID
                     artifact_id = int(time.time() * 1000) % 1000000
             
+            # 正文、标签和元数据写入资料内容表，与资料在同一事务中提交
+            cursor.execute("""
+                INSERT INTO artifact_contents (artifact_id, content, tags, metadata)
+                VALUES (?, ?, ?, ?)
+            """, (artifact_id, artifact_create.content, tags_str, metadata_str))
+            # 向量同步记录与资料同一事务提交，由outbox后台任务攒批切分和向量化，进程崩溃后重启继续处理
+            enqueue_vector_sync(cursor, artifact_id)
+            db["sqlite"].commit()
+            vector_outbox_worker.notify()
+            # 批量导入的资料以低优先级增强，不影响单条创建的资料
+            enrichment_queue.submit(artifact_id, PRIORITY_LOW)
+            
             # 返回创建的资料
             cursor.execute("""
-                SELECT id, title, content, category, tags, metadata, source_type, source_path, created_at, updated_at, is_active
-                FROM artifacts
-                WHERE id = ?
+                SELECT a.id, a.title, c.content, a.category, c.tags, c.metadata, a.source_type, a.source_path, a.created_at, a.updated_at, a.is_active
+                FROM artifacts a LEFT JOIN artifact_contents c ON c.artifact_id = a.id
+                WHERE a.id = ?
             """, (artifact_id,))
             
             row = cursor.fetchone()
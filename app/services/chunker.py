@@ -0,0 +1,184 @@
+"""
+资料切片模块
+按段落和句子边界将资料正文切分为不超过最大长度的切片，相邻切片之间保留按句子对齐的重叠；
+句末标点同时识别中日韩全角标点（不要求其后有空格）和西文标点。
+本模块只依赖标准库且函数均为顶层函数，可在进程池中执行
+"""
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from app.services.rate_limiter import estimate_tokens
+
+# 段落分隔：换行（连续空行视为一个分隔）
+_PARAGRAPH_PATTERN = re.compile(r"\n\s*")
+
+# 句子结束：全角句末标点（可带后引号/括号），或西文句末标点后跟空白
+_SENTENCE_PATTERN = re.compile(
+    r"(?<=[。！？；…][”’」』）】])"
+    r"|(?<=[。！？；…])(?![”’」』）】。！？；…])"
+    r"|(?<=[.!?;][\"')\]])\s+"
+    r"|(?<=[.!?;])\s+"
+)
+
+# 切片已达到最大长度的该比例时，遇到新段落即开始新切片，尽量不从段落中间切开
+_PARAGRAPH_FLUSH_RATIO = 0.6
+
+# 行内连续空白（不含换行）
+_INLINE_SPACE_PATTERN = re.compile(r"[^\S\n]+")
+
+# 在句子内部强制切分时优先选择的断点（空白和逗号类标点）
+_SOFT_BREAK_PATTERN = re.compile(r"[\s，、,：:]")
+
+
+def normalize_text(text: str) -> str:
+    """规范化文本：Unicode NFC、统一换行符、合并行内连续空白"""
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    return _INLINE_SPACE_PATTERN.sub(" ", text)
+
+
+def split_sentences(text: str) -> List[List[str]]:
+    """
+    将文本切分为段落，每个段落再切分为句子
+
+    Returns:
+        段落列表，每个段落为非空句子列表
+    """
+    paragraphs = []
+    for paragraph in _PARAGRAPH_PATTERN.split(text):
+        sentences = [sentence.strip() for sentence in _SENTENCE_PATTERN.split(paragraph)]
+        sentences = [sentence for sentence in sentences if sentence]
+        if sentences:
+            paragraphs.append(sentences)
+    return paragraphs
+
+
+def _split_long(sentence: str, max_chars: int) -> List[str]:
+    """将超过最大长度的句子切开，尽量在空白或逗号处断开"""
+    pieces = []
+    while len(sentence) > max_chars:
+        window = sentence[:max_chars]
+        breaks = [match.end() for match in _SOFT_BREAK_PATTERN.finditer(window)]
+        # 断点太靠前时直接按长度切分，避免产生过短的切片
+        cut = breaks[-1] if breaks and breaks[-1] > max_chars // 2 else max_chars
+        pieces.append(sentence[:cut].strip())
+        sentence = sentence[cut:].strip()
+    if sentence:
+        pieces.append(sentence)
+    return [piece for piece in pieces if piece]
+
+
+def _join(units: List[tuple]) -> str:
+    """拼接切片单元：同一段落内的句子直接相连（中文）或以空格分隔（西文），跨段落以换行分隔"""
+    parts = []
+    previous_paragraph = None
+    for text, paragraph in units:
+        if previous_paragraph is None:
+            parts.append(text)
+        elif paragraph != previous_paragraph:
+            parts.append("\n" + text)
+        elif parts[-1][-1:].isascii() and text[:1].isascii():
+            parts.append(" " + text)
+        else:
+            parts.append(text)
+        previous_paragraph = paragraph
+    return "".join(parts)
+
+
+def chunk_text(text: str, max_chars: int, overlap: int) -> List[str]:
+    """
+    将文本切分为切片
+
+    Args:
+        text: 原始文本
+        max_chars: 切片最大字符数
+        overlap: 相邻切片的重叠字符数上限（按完整句子重叠）
+
+    Returns:
+        切片列表
+    """
+    text = normalize_text(text or "").strip()
+    if not text:
+        return []
+    max_chars = max(max_chars, 1)
+    overlap = min(max(overlap, 0), max_chars // 2)
+    if len(text) <= max_chars:
+        return [text]
+
+    # 切片单元：(句子, 段落序号)，超长句子预先切开
+    units = [
+        (piece, paragraph_index)
+        for paragraph_index, sentences in enumerate(split_sentences(text))
+        for sentence in sentences
+        for piece in _split_long(sentence, max_chars)
+    ]
+
+    chunks = []
+    current: List[tuple] = []
+    # current拼接后的长度（单元之间的分隔符计1个字符）
+    current_length = 0
+    for unit in units:
+        overflow = current_length + 1 + len(unit[0]) > max_chars
+        paragraph_break = bool(current) and unit[1] != current[-1][1] \
+            and current_length >= max_chars * _PARAGRAPH_FLUSH_RATIO
+        if current and (overflow or paragraph_break):
+            chunks.append(_join(current))
+            # 从上一切片末尾取不超过overlap的完整句子作为下一切片的开头（新段落开始时不重叠）
+            carried = []
+            carried_length = -1
+            for previous in ([] if paragraph_break and not overflow else reversed(current)):
+                length = carried_length + 1 + len(previous[0])
+                if length > overlap or length + 1 + len(unit[0]) > max_chars:
+                    break
+                carried.insert(0, previous)
+                carried_length = length
+            current = carried
+            current_length = max(carried_length, 0)
+        current_length += (1 if current else 0) + len(unit[0])
+        current.append(unit)
+    if current:
+        chunks.append(_join(current))
+    return chunks
+
+
+def chunk_vector_id(artifact_id: int, chunk_index: int) -> str:
+    """切片在向量数据库中的ID"""
+    return f"{artifact_id}#{chunk_index}"
+
+
+def embedding_text(title: Optional[str], chunk: str) -> str:
+    """切片的向量化文本（带上资料标题，使切片脱离上下文时仍可被标题相关的查询命中）"""
+    return f"{title}\n\n{chunk}" if title and chunk else (title or chunk or "")
+
+
+def build_chunks(title: Optional[str], content: Optional[str], max_chars: int, overlap: int) -> List[Dict]:
+    """
+    生成资料的切片
+
+    正文为空时以标题作为唯一切片（与整篇向量化时的行为一致）
+
+    Returns:
+        切片列表，每个元素包含 chunk_index、content、token_count
+    """
+    pieces = chunk_text(content or "", max_chars, overlap)
+    if not pieces and title and title.strip():
+        pieces = [title.strip()]
+    return [
+        {"chunk_index": index, "content": piece, "token_count": estimate_tokens(piece)}
+        for index, piece in enumerate(pieces)
+    ]
+
+
+def chunk_batch(items: List[Tuple[int, Optional[str], Optional[str]]], max_chars: int, overlap: int) -> List[Tuple[int, List[Dict]]]:
+    """
+    批量切分资料（进程池任务入口，参数和返回值只包含基本类型，序列化开销与文本量成正比）
+
+    Args:
+        items: (资料ID, 标题, 正文) 列表
+        max_chars: 切片最大字符数
+        overlap: 相邻切片的重叠字符数上限
+
+    Returns:
+        (资料ID, 切片列表) 列表
+    """
+    return [(artifact_id, build_chunks(title, content, max_chars, overlap)) for artifact_id, title, content in items]
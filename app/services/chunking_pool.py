@@ -0,0 +1,117 @@
+"""
+切片进程池模块
+批量导入和重建索引时在独立进程中执行文本规范化、切片和token统计，避免CPU密集的切分阻塞事件循环并受GIL限制；
+任务按字符数打包成批，摊薄进程间序列化开销，文本量较小时直接在当前进程执行。
+
+子进程以spawn方式启动，启动时会以 __mp_main__ 重新导入主模块（python main.py 启动时即导入FastAPI、ChromaDB、OpenAI并构建应用），
+每个子进程的启动时间和常驻内存与一个应用实例相当，因此默认只使用少量进程，且进程池在首次需要并行切分时才创建
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+from app.core.config import config
+from app.services.chunker import chunk_batch
+
+logger = logging.getLogger(__name__)
+
+
+def _text_size(artifact: dict) -> int:
+    """资料参与切分的字符数"""
+    return len(artifact.get('title') or '') + len(artifact.get('content') or '')
+
+
+class ChunkingPool:
+    """切片进程池（首次使用时创建）"""
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._workers = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _worker_count() -> int:
+        """进程数（配置为0时使用全部CPU核心）"""
+        return max(config.CHUNKING_PROCESS_WORKERS, 0) or os.cpu_count() or 1
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """获取进程池，进程数配置变化时重建"""
+        workers = self._worker_count()
+        with self._lock:
+            if self._executor is None or self._workers != workers:
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                # 使用spawn启动子进程，避免fork继承事件循环、线程和数据库连接
+                self._executor = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                self._workers = workers
+                logger.info(f"切片进程池已创建，进程数: {workers}")
+            return self._executor
+
+    def _make_batches(self, artifacts: List[dict]) -> List[List[tuple]]:
+        """按字符数将资料打包成批：单批不超过batch_chars，且批数不少于进程数，使各进程都能分到任务"""
+        total = sum(_text_size(artifact) for artifact in artifacts)
+        workers = self._worker_count()
+        target = max(min(config.CHUNKING_BATCH_CHARS, total // workers + 1), 1)
+
+        batches, current, size = [], [], 0
+        for artifact in artifacts:
+            current.append((artifact['id'], artifact.get('title'), artifact.get('content')))
+            size += _text_size(artifact)
+            if size >= target:
+                batches.append(current)
+                current, size = [], 0
+        if current:
+            batches.append(current)
+        return batches
+
+    async def chunk_artifacts(self, artifacts: List[dict]) -> Dict[int, List[dict]]:
+        """
+        切分一批资料
+
+        Args:
+            artifacts: 资料列表，每个元素包含id、title、content
+
+        Returns:
+            资料ID到切片列表的映射
+        """
+        max_chars, overlap = config.MAX_CHUNK_SIZE, config.OVERLAP_SIZE
+        total = sum(_text_size(artifact) for artifact in artifacts)
+        items = [(artifact['id'], artifact.get('title'), artifact.get('content')) for artifact in artifacts]
+        if total < config.CHUNKING_PARALLEL_MIN_CHARS:
+            return dict(chunk_batch(items, max_chars, overlap))
+
+        loop = asyncio.get_running_loop()
+        batches = self._make_batches(artifacts)
+        try:
+            executor = self._get_executor()
+            results = await asyncio.gather(*[
+                loop.run_in_executor(executor, chunk_batch, batch, max_chars, overlap)
+                for batch in batches
+            ])
+        except BrokenProcessPool as e:
+            # 子进程异常退出（如被系统终止）时重建进程池，本次在线程中完成切分
+            logger.error(f"切片进程池不可用，改为在线程中切分: {str(e)}")
+            with self._lock:
+                self._executor = None
+            return dict(await loop.run_in_executor(None, chunk_batch, items, max_chars, overlap))
+
+        logger.debug(f"进程池切分完成，资料数: {len(artifacts)}，字符数: {total}，批次: {len(batches)}")
+        return {artifact_id: chunks for result in results for artifact_id, chunks in result}
+
+    def shutdown(self):
+        """关闭进程池（应用关闭时调用）"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# 全局切片进程池实例
+chunking_pool = ChunkingPool()
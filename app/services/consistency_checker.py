@@ -0,0 +1,197 @@
+"""
+SQLite与向量数据库一致性检查模块
+分批比对两侧的资料ID（向量按切片存储，元数据artifact_id指向所属资料），找出缺失向量的资料和已删除资料残留的孤儿向量，并可批量修复
+"""
+import asyncio
+import threading
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.database import db_manager
+from app.core.config import config
+from app.core.logger_manager import log, LogType
+from app.services.vector_outbox import vector_outbox_worker, enqueue_vector_sync
+
+logger = logging.getLogger(__name__)
+
+
+def _artifact_id_of(vector_id: str, metadata: Optional[Dict[str, Any]]) -> Optional[int]:
+    """从向量记录中解析所属资料ID（切片向量ID为 资料ID#切片序号），无法解析时返回None"""
+    value = (metadata or {}).get("artifact_id", vector_id.split("#", 1)[0])
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ConsistencyChecker:
+    """SQLite与向量数据库一致性检查任务"""
+
+    def __init__(self):
+        self.status: Dict[str, Any] = {'status': 'idle'}
+        self.lock = threading.Lock()
+        # 保留后台检查任务的引用，避免任务在运行中被垃圾回收
+        self._task: Optional[asyncio.Task] = None
+
+    def get_status(self) -> Dict[str, Any]:
+        """获取检查任务状态"""
+        with self.lock:
+            status = dict(self.status)
+        status['running'] = self._task is not None and not self._task.done()
+        return status
+
+    def _update(self, **values):
+        with self.lock:
+            self.status.update(values)
+
+    def start(self, repair: bool = True) -> bool:
+        """
+        启动后台一致性检查任务
+
+        Args:
+            repair: 是否修复发现的问题（缺失的向量加入同步队列，孤儿向量直接删除）
+
+        Returns:
+            是否成功启动（已有任务运行时返回False）
+        """
+        with self.lock:
+            if self._task is not None and not self._task.done():
+                return False
+            self.status = {
+                'status': 'processing',
+                'repair': repair,
+                'checked_artifacts': 0,
+                'checked_vectors': 0,
+                'missing_vectors': 0,
+                'orphan_vectors': 0,
+                'queued_for_sync': 0,
+                'deleted_orphans': 0,
+                'start_time': datetime.now()
+            }
+            self._task = asyncio.create_task(self.run(repair))
+        return True
+
+    def _active_ids_after(self, after_id: int, limit: int) -> List[int]:
+        """按ID顺序读取一批需要向量的资料ID（内容为空的资料不会生成向量）"""
+        cursor = db_manager.init_sqlite().cursor()
+        cursor.execute("""
+            SELECT a.id FROM artifacts a LEFT JOIN artifact_contents c ON c.artifact_id = a.id
+            WHERE a.is_active = 1 AND a.id > ?
+              AND (TRIM(COALESCE(a.title, '')) != '' OR TRIM(COALESCE(c.content, '')) != '')
+            ORDER BY a.id
+            LIMIT ?
+        """, (after_id, limit))
+        return [row[0] for row in cursor.fetchall()]
+
+    def _existing_active_ids(self, artifact_ids: List[int]) -> set:
+        """返回给定ID中在SQLite里仍然有效的资料ID"""
+        if not artifact_ids:
+            return set()
+        cursor = db_manager.init_sqlite().cursor()
+        placeholders = ",".join("?" * len(artifact_ids))
+        cursor.execute(
+            f"SELECT id FROM artifacts WHERE is_active = 1 AND id IN ({placeholders})",
+            artifact_ids
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+    async def _find_missing(self, collection, batch_size: int, repair: bool):
+        """SQLite → 向量数据库：按ID分批检查每条资料是否已有向量"""
+        last_id = 0
+        while True:
+            batch = self._active_ids_after(last_id, batch_size)
+            if not batch:
+                break
+            last_id = batch[-1]
+
+            # 资料至少有一个切片向量即视为已同步
+            page = collection.get(
+                where={"artifact_id": {"$in": [str(artifact_id) for artifact_id in batch]}},
+                include=["metadatas"]
+            )
+            present = {(metadata or {}).get("artifact_id") for metadata in page['metadatas'] or []}
+            missing = [artifact_id for artifact_id in batch if str(artifact_id) not in present]
+
+            if missing and repair:
+                # 缺失的向量交给outbox后台任务生成，复用向量缓存和失败重试
+                conn = db_manager.init_sqlite()
+                cursor = conn.cursor()
+                for artifact_id in missing:
+                    enqueue_vector_sync(cursor, artifact_id)
+                conn.commit()
+                vector_outbox_worker.notify()
+
+            with self.lock:
+                self.status['checked_artifacts'] += len(batch)
+                self.status['missing_vectors'] += len(missing)
+                if repair:
+                    self.status['queued_for_sync'] += len(missing)
+
+            # 让出事件循环，避免长时间阻塞其他请求
+            await asyncio.sleep(0)
+
+    async def _find_orphans(self, collection, batch_size: int, repair: bool):
+        """向量数据库 → SQLite：分页扫描向量记录，找出所属资料已不存在的孤儿向量"""
+        offset = 0
+        while True:
+            page = collection.get(limit=batch_size, offset=offset, include=["metadatas"])
+            vector_ids = page['ids']
+            if not vector_ids:
+                break
+
+            owners = [
+                _artifact_id_of(vector_id, metadata)
+                for vector_id, metadata in zip(vector_ids, page['metadatas'] or [None] * len(vector_ids))
+            ]
+            existing = self._existing_active_ids([owner for owner in owners if owner is not None])
+            orphans = [
+                vector_id for vector_id, owner in zip(vector_ids, owners)
+                if owner is None or owner not in existing
+            ]
+
+            deleted = 0
+            if orphans and repair:
+                collection.delete(ids=orphans)
+                deleted = len(orphans)
+
+            with self.lock:
+                self.status['checked_vectors'] += len(vector_ids)
+                self.status['orphan_vectors'] += len(orphans)
+                self.status['deleted_orphans'] += deleted
+
+            # 已删除的记录不再占用分页位置
+            offset += len(vector_ids) - deleted
+            await asyncio.sleep(0)
+
+    async def run(self, repair: bool = True) -> bool:
+        """执行一致性检查"""
+        try:
+            db_manager.init_chroma()
+            collection = db_manager.collection
+            if not db_manager.chroma_available or collection is None:
+                raise RuntimeError("ChromaDB集合不可用，无法执行一致性检查")
+
+            batch_size = max(config.VECTOR_SYNC_CONSISTENCY_BATCH_SIZE, 1)
+            self._update(collection=collection.name)
+            log(f"ChromaDB - 开始一致性检查，集合: {collection.name}，修复: {repair}", LogType.DATABASE, "INFO")
+
+            await self._find_missing(collection, batch_size, repair)
+            await self._find_orphans(collection, batch_size, repair)
+
+            self._update(status='completed', end_time=datetime.now())
+            status = self.get_status()
+            log(
+                f"ChromaDB - 一致性检查完成，缺失向量: {status['missing_vectors']}，孤儿向量: {status['orphan_vectors']}",
+                LogType.DATABASE, "INFO"
+            )
+            return True
+
+        except Exception as e:
+            log(f"ChromaDB - 一致性检查失败: {str(e)}", LogType.DATABASE, "ERROR")
+            self._update(status='failed', error=str(e), end_time=datetime.now())
+            return False
+
+
+# 全局一致性检查任务实例
+consistency_checker = ConsistencyChecker()
@@ -0,0 +1,97 @@
+"""
+向量请求合并调度模块
+将并发的单条文本向量化请求在短时间窗口内合并为一次批量请求
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingDispatcher:
+    """向量请求微批调度器"""
+
+    def __init__(
+        self,
+        embed_many: Callable[[List[str]], Awaitable[List[List[float]]]],
+        window_ms: float = 3,
+        max_batch_size: int = 32
+    ):
+        """
+        初始化调度器
+
+        Args:
+            embed_many: 批量向量化函数，输入文本列表，返回与之一一对应的向量列表
+            window_ms: 合并窗口（毫秒），第一条请求到达后最多等待该时长
+            max_batch_size: 单批最大文本数，达到后立即发送
+        """
+        self._embed_many = embed_many
+        self.window = max(window_ms, 0) / 1000.0
+        self.max_batch_size = max(max_batch_size, 1)
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # 进行中的批量调用任务（保持引用，避免任务运行期间被垃圾回收）
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, text: str) -> List[float]:
+        """
+        提交单条文本，等待所在批次完成后返回其向量
+
+        Args:
+            text: 输入文本
+
+        Returns:
+            向量表示（浮点数列表）
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """取出当前待发送的请求并发起批量调用"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """发送一批请求，并把结果分发给各个等待方"""
+        # 同一批次内的重复文本只向量化一次
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+
+        try:
+            vectors = await self._embed_many(unique_texts)
+            if len(vectors) != len(unique_texts):
+                raise RuntimeError(f"向量数量与输入不一致: 输入 {len(unique_texts)} 条，返回 {len(vectors)} 条")
+
+            vector_map = dict(zip(unique_texts, vectors))
+            for text, future in batch:
+                if not future.done():
+                    future.set_result(vector_map[text])
+        except Exception as e:
+            logger.error(f"批量向量化请求失败，批次大小: {len(batch)}，错误: {str(e)}")
+            self._fail(batch, e)
+        except BaseException as e:
+            # 任务被取消等情况同样要通知等待方，否则submit会永远挂起
+            self._fail(batch, RuntimeError(f"批量向量化请求被中断: {type(e).__name__}"))
+            raise
+
+    @staticmethod
+    def _fail(batch: List[Tuple[str, asyncio.Future]], error: Exception):
+        """将异常设置到批次中尚未完成的全部等待方"""
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
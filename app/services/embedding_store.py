@@ -0,0 +1,145 @@
+"""
+向量持久化存储模块
+按 (模型, 维度, 文本SHA256) 缓存已生成的向量，清空或重建向量集合时无需重新调用Embedding服务
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import logging
+from typing import List, Optional
+
+import numpy as np
+
+from ..core.config import config
+
+logger = logging.getLogger(__name__)
+
+# 单条SQL中IN参数的最大数量（低于SQLite默认上限999）
+_QUERY_CHUNK_SIZE = 500
+
+
+def text_hash(text: str) -> str:
+    """计算文本内容哈希"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    """基于SQLite的内容寻址向量存储"""
+
+    def __init__(self):
+        self._conn: Optional[sqlite3.Connection] = None
+        self._path: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用向量存储"""
+        return bool(config.EMBEDDING_STORE_ENABLED)
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取数据库连接（路径配置变化时重新打开）"""
+        path = config.EMBEDDING_STORE_PATH
+        if self._conn is not None and self._path == path:
+            return self._conn
+
+        if self._conn is not None:
+            self._conn.close()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=config.SQLITE_TIMEOUT)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                dims INTEGER NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (model, dims, text_hash)
+            ) WITHOUT ROWID
+        """)
+        conn.commit()
+
+        self._conn = conn
+        self._path = path
+        logger.info(f"向量存储已打开: {path}")
+        return conn
+
+    def get_many(self, model: str, dims: int, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        批量查询已存储的向量
+
+        Args:
+            model: 模型标识
+            dims: 向量维度
+            texts: 文本列表
+
+        Returns:
+            与输入顺序一致的向量列表，未命中的位置为None
+        """
+        hashes = [text_hash(text) for text in texts]
+        found = {}
+
+        with self._lock:
+            conn = self._connect()
+            unique_hashes = list(dict.fromkeys(hashes))
+            for start in range(0, len(unique_hashes), _QUERY_CHUNK_SIZE):
+                chunk = unique_hashes[start:start + _QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND dims = ? AND text_hash IN ({placeholders})",
+                    [model, dims, *chunk]
+                ).fetchall()
+                for row_hash, blob in rows:
+                    found[row_hash] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+        return [found.get(h) for h in hashes]
+
+    def put_many(self, model: str, dims: int, texts: List[str], vectors: List[List[float]]):
+        """
+        批量写入向量（已存在的键保持不变）
+
+        Args:
+            model: 模型标识
+            dims: 向量维度
+            texts: 文本列表
+            vectors: 与文本一一对应的向量列表
+        """
+        rows = [
+            (model, dims, text_hash(text), np.asarray(vector, dtype=np.float32).tobytes())
+            for text, vector in zip(texts, vectors)
+            if vector is not None
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, dims, text_hash, vector) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            conn.commit()
+
+    def count(self) -> int:
+        """已存储的向量数量"""
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self._path = None
+
+
+# 全局向量存储实例
+embedding_store = EmbeddingStore()
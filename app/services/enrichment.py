@@ -0,0 +1,302 @@
+"""
+资料增强模块
+后台按优先级队列对新增或变更的资料调用LLM生成摘要和提取元数据，结果写入资料元数据的 enrichment 字段；
+可选地将摘要向量化写入独立集合，作为检索的第二字段。导入流程只需入队，不等待LLM调用
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import time
+import logging
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.config import config
+from app.core.database import db_manager
+from app.core.logger_manager import log, LogType
+
+logger = logging.getLogger(__name__)
+
+# 任务优先级（数值越小越先处理）
+PRIORITY_HIGH = 0  # 手动触发
+PRIORITY_NORMAL = 1  # 单条资料创建/更新
+PRIORITY_LOW = 2  # 批量导入、启动补齐
+
+_PRIORITY_NAMES = {PRIORITY_HIGH: "high", PRIORITY_NORMAL: "normal", PRIORITY_LOW: "low"}
+
+# 增强结果在资料元数据中的键
+METADATA_KEY = "enrichment"
+
+# 吞吐量统计窗口（秒）
+_THROUGHPUT_WINDOW = 60
+
+
+def content_hash(title: Optional[str], content: Optional[str]) -> str:
+    """计算资料标题和正文的哈希，用于判断增强结果是否过期"""
+    return hashlib.sha256(f"{title or ''}\n{content or ''}".encode("utf-8")).hexdigest()
+
+
+def _load_metadata(metadata_str: Optional[str]) -> Optional[Dict[str, Any]]:
+    """解析资料元数据，为空时返回空字典，不是JSON对象时返回None（无法合并写入）"""
+    if not metadata_str:
+        return {}
+    try:
+        metadata = json.loads(metadata_str)
+    except (TypeError, ValueError):
+        return None
+    return metadata if isinstance(metadata, dict) else None
+
+
+class EnrichmentQueue:
+    """资料增强后台队列（asyncio优先级队列 + 固定数量的worker）"""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._resumed: Optional[asyncio.Event] = None
+        self._sequence = itertools.count()
+        # 排队中的资料及其最高优先级，重复提交时合并
+        self._pending: Dict[int, int] = {}
+        self._active = 0
+        self._completed_at: deque = deque(maxlen=10000)
+        self._stats = {
+            "enriched": 0,
+            "skipped": 0,
+            "failed": 0,
+            "total_duration": 0.0,
+            "last_error": None,
+            "last_enriched_at": None
+        }
+
+    @property
+    def running(self) -> bool:
+        """后台worker是否在运行"""
+        return any(not worker.done() for worker in self._workers)
+
+    def start(self):
+        """启动后台worker（应用启动时调用），按配置补齐尚未增强的资料"""
+        if not config.ENRICHMENT_ENABLED or self.running:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+        self._pending.clear()
+        concurrency = max(config.ENRICHMENT_CONCURRENCY, 1)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(concurrency)]
+        log(f"资料增强 - 后台队列已启动，并发数: {concurrency}", LogType.SERVER, "INFO")
+
+        if config.ENRICHMENT_BACKFILL_ON_START:
+            try:
+                self.backfill()
+            except Exception as e:
+                logger.error(f"资料增强补齐入队失败: {str(e)}")
+
+    async def stop(self):
+        """停止后台worker（应用关闭时调用），排队中的资料下次启动时由补齐重新入队"""
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+
+    def submit(self, artifact_id: int, priority: int = PRIORITY_NORMAL) -> bool:
+        """
+        提交资料增强任务
+
+        Args:
+            artifact_id: 资料ID
+            priority: 优先级，已在队列中的资料只会提升优先级
+
+        Returns:
+            是否入队（队列未启动或已以更高优先级排队时返回False）
+        """
+        if self._queue is None or not self.running:
+            return False
+        current = self._pending.get(artifact_id)
+        if current is not None and current <= priority:
+            return False
+        # 提升优先级时重新入队，旧条目出队时按_pending判断为过期并跳过
+        self._pending[artifact_id] = priority
+        self._queue.put_nowait((priority, next(self._sequence), artifact_id))
+        return True
+
+    def backfill(self, priority: int = PRIORITY_LOW) -> int:
+        """
+        将尚未增强或由其他模型增强的资料入队
+
+        Returns:
+            入队的资料数量
+        """
+        from app.services.ai_clients import llm_client
+
+        cursor = db_manager.init_sqlite().cursor()
+        cursor.execute("""
+            SELECT a.id
+            FROM artifacts a JOIN artifact_contents c ON c.artifact_id = a.id
+            WHERE a.is_active = 1 AND (
+                c.metadata IS NULL OR c.metadata = '' OR (
+                    json_valid(c.metadata) AND json_type(c.metadata) = 'object'
+                    AND json_extract(c.metadata, '$.enrichment.model') IS NOT ?
+                )
+            )
+            ORDER BY a.id
+        """, (llm_client.model,))
+        queued = sum(1 for (artifact_id,) in cursor.fetchall() if self.submit(artifact_id, priority))
+        if queued:
+            log(f"资料增强 - 补齐入队 {queued} 条资料", LogType.SERVER, "INFO")
+        return queued
+
+    def pause(self):
+        """暂停：worker不再取新任务，进行中的任务继续完成"""
+        if self._resumed is not None:
+            self._resumed.clear()
+            log("资料增强 - 队列已暂停", LogType.SERVER, "INFO")
+
+    def resume(self):
+        """恢复处理"""
+        if self._resumed is not None:
+            self._resumed.set()
+            log("资料增强 - 队列已恢复", LogType.SERVER, "INFO")
+
+    async def _worker(self):
+        """worker循环：等待未暂停后按优先级取任务处理"""
+        from app.services.ai_clients import llm_client
+
+        while True:
+            await self._resumed.wait()
+            priority, _, artifact_id = await self._queue.get()
+            if self._pending.get(artifact_id) != priority:
+                continue
+            del self._pending[artifact_id]
+
+            self._active += 1
+            start_time = time.time()
+            try:
+                enriched = await self._enrich(artifact_id)
+                self._stats["enriched" if enriched else "skipped"] += 1
+                if enriched:
+                    self._stats["total_duration"] += time.time() - start_time
+                    self._stats["last_enriched_at"] = datetime.now().isoformat(timespec="seconds")
+                    self._completed_at.append(time.time())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["failed"] += 1
+                self._stats["last_error"] = f"资料 {artifact_id}: {str(e)}"
+                logger.error(f"资料增强失败，ID: {artifact_id}: {str(e)}")
+                # LLM服务熔断时放回队列，等待熔断恢复后重试
+                if llm_client.breaker.is_open:
+                    self.submit(artifact_id, priority)
+                    await asyncio.sleep(config.AI_CIRCUIT_RECOVERY_TIMEOUT)
+            finally:
+                self._active -= 1
+
+    def _load_artifact(self, artifact_id: int):
+        """读取资料的标题、正文和元数据，资料不存在或已停用时返回None"""
+        cursor = db_manager.init_sqlite().cursor()
+        cursor.execute("""
+            SELECT a.title, c.content, c.metadata
+            FROM artifacts a JOIN artifact_contents c ON c.artifact_id = a.id
+            WHERE a.id = ? AND a.is_active = 1
+        """, (artifact_id,))
+        return cursor.fetchone()
+
+    async def _enrich(self, artifact_id: int) -> bool:
+        """
+        生成单条资料的摘要和元数据并写回
+
+        Returns:
+            是否调用了LLM并写入结果（资料不存在、内容为空或结果仍然有效时返回False）
+        """
+        from app.services.ai_clients import llm_client
+
+        row = self._load_artifact(artifact_id)
+        if row is None or not (row[1] or "").strip():
+            return False
+        title, content, metadata_str = row
+
+        digest = content_hash(title, content)
+        previous = (_load_metadata(metadata_str) or {}).get(METADATA_KEY)
+        if isinstance(previous, dict) and previous.get("content_hash") == digest and previous.get("model") == llm_client.model:
+            return False
+
+        text = f"{title}\n\n{content}"[:max(config.ENRICHMENT_MAX_INPUT_CHARS, 1)]
+        summary, extracted = await asyncio.gather(
+            llm_client.generate_summary(text, max_tokens=config.ENRICHMENT_SUMMARY_MAX_TOKENS),
+            llm_client.extract_metadata(text)
+        )
+        # extract_metadata失败时返回空字典，不能当作增强结果写入（写入后资料被视为已增强，不会再重试）
+        if not isinstance(extracted, dict) or not extracted:
+            raise RuntimeError("元数据提取失败或结果为空")
+
+        # LLM调用期间资料可能已被修改或删除，此时结果作废（修改时已重新入队）
+        row = self._load_artifact(artifact_id)
+        if row is None or content_hash(row[0], row[1]) != digest:
+            return False
+        metadata = _load_metadata(row[2])
+        if metadata is None:
+            log(f"资料增强 - 资料 {artifact_id} 的元数据不是JSON对象，跳过写入", LogType.SERVER, "WARNING")
+            return False
+
+        metadata[METADATA_KEY] = {
+            "summary": summary,
+            "extracted": extracted,
+            "content_hash": digest,
+            "model": llm_client.model,
+            "enriched_at": datetime.now().isoformat(timespec="seconds")
+        }
+        conn = db_manager.init_sqlite()
+        conn.execute(
+            "UPDATE artifact_contents SET metadata = ? WHERE artifact_id = ?",
+            (json.dumps(metadata, ensure_ascii=False), artifact_id)
+        )
+        conn.commit()
+
+        if config.ENRICHMENT_EMBED_SUMMARIES and summary:
+            await self._embed_summary(artifact_id, summary)
+        return True
+
+    async def _embed_summary(self, artifact_id: int, summary: str):
+        """将摘要向量化写入摘要集合，失败时只记录日志（摘要已写入元数据）"""
+        from app.services.ai_clients import embedding_client
+
+        try:
+            collection = db_manager.get_summary_collection()
+            if collection is None:
+                return
+            vector = await embedding_client.embed(summary)
+            collection.upsert(
+                ids=[str(artifact_id)],
+                embeddings=[vector],
+                metadatas=[{"artifact_id": str(artifact_id)}]
+            )
+        except Exception as e:
+            logger.warning(f"摘要向量化失败，ID: {artifact_id}: {str(e)}")
+
+    def metrics(self) -> Dict[str, Any]:
+        """获取队列状态和吞吐量指标"""
+        now = time.time()
+        recent = sum(1 for completed_at in self._completed_at if now - completed_at <= _THROUGHPUT_WINDOW)
+        by_priority = Counter(self._pending.values())
+        stats = dict(self._stats)
+        total_duration = stats.pop("total_duration")
+        return {
+            "running": self.running,
+            "paused": self._resumed is not None and not self._resumed.is_set(),
+            "concurrency": len(self._workers),
+            "active": self._active,
+            "pending": len(self._pending),
+            "pending_by_priority": {name: by_priority.get(priority, 0) for priority, name in _PRIORITY_NAMES.items()},
+            "throughput_per_minute": recent * 60 / _THROUGHPUT_WINDOW,
+            "avg_duration": round(total_duration / stats["enriched"], 3) if stats["enriched"] else None,
+            **stats
+        }
+
+
+# 全局资料增强队列实例
+enrichment_queue = EnrichmentQueue()
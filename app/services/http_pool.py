@@ -0,0 +1,131 @@
+"""
+共享HTTP连接池模块
+为LLM和Embedding客户端提供复用的httpx.AsyncClient，避免每次调用重复建立TCP/TLS连接
+"""
+import asyncio
+import logging
+from typing import List, Optional
+
+import httpx
+
+from ..core.config import config
+from ..core.yaml_config import get_config_manager
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 配置变更后旧连接池延迟关闭的最短时间（秒），等待进行中的请求完成
+_CLOSE_GRACE_SECONDS = 60
+
+# 影响连接池的配置段：服务地址、密钥、超时在ai_services中，连接池参数在http_pool中
+_POOL_CONFIG_SECTIONS = ("ai_services", "http_pool")
+
+
+class HttpClientPool:
+    """共享HTTP连接池"""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._generation = 0
+        # 不在事件循环中被替换的旧连接池，无法立即异步关闭，留到下次有事件循环时关闭
+        self._retired: List[httpx.AsyncClient] = []
+        get_config_manager().add_change_listener(self._on_config_changed)
+
+    @property
+    def generation(self) -> int:
+        """连接池版本号，配置变更后递增，客户端据此重建"""
+        return self._generation
+
+    def build_timeout(self, read_timeout: float) -> httpx.Timeout:
+        """
+        构建分项超时配置
+
+        Args:
+            read_timeout: 读取超时（秒），取各服务自身的timeout配置
+        """
+        return httpx.Timeout(
+            read_timeout,
+            connect=config.HTTP_POOL_CONNECT_TIMEOUT,
+            write=config.HTTP_POOL_WRITE_TIMEOUT,
+            pool=config.HTTP_POOL_POOL_TIMEOUT
+        )
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """按当前配置创建连接池"""
+        http2 = bool(config.HTTP_POOL_HTTP2)
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("未安装h2，HTTP连接池使用HTTP/1.1")
+            http2 = False
+
+        limits = httpx.Limits(
+            max_connections=config.HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.HTTP_POOL_KEEPALIVE_EXPIRY
+        )
+        logger.info(f"创建HTTP连接池，最大连接数: {limits.max_connections}，HTTP/2: {http2}")
+        return httpx.AsyncClient(
+            limits=limits,
+            timeout=self.build_timeout(60.0),
+            http2=http2
+        )
+
+    def get_client(self) -> httpx.AsyncClient:
+        """获取共享连接池（必要时创建）"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    def invalidate(self):
+        """丢弃当前连接池，下次使用时按新配置重建；旧连接池在宽限期后关闭"""
+        old_client, self._client = self._client, None
+        self._generation += 1
+
+        if old_client is not None and not old_client.is_closed:
+            self._retired.append(old_client)
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 不在事件循环中（例如启动阶段或同步的配置接口），下次在事件循环中失效或应用关闭时再关闭
+            return
+
+        retired, self._retired = self._retired, []
+        if not retired:
+            return
+        # 宽限期至少覆盖一次完整的读取超时，尽量让进行中的流式响应正常结束
+        grace = max(_CLOSE_GRACE_SECONDS, config.LLM_TIMEOUT, config.EMBEDDING_TIMEOUT)
+        for client in retired:
+            loop.call_later(grace, lambda client=client: asyncio.ensure_future(client.aclose()))
+
+    def _on_config_changed(self, key_path: str, old_value, new_value):
+        """配置变化监听器：只有服务地址、超时或连接池参数所在的配置段变化时才重建连接池"""
+        if key_path in ("root", "bulk_update", "reload"):
+            # 整体更新时对比前后的相关配置段
+            old_value, new_value = old_value or {}, new_value or {}
+            changed = any(old_value.get(section) != new_value.get(section) for section in _POOL_CONFIG_SECTIONS)
+        else:
+            # "section:<段名>" 或 "<段名>.<键>"
+            section = key_path.split(":", 1)[-1].split(".", 1)[0]
+            changed = section in _POOL_CONFIG_SECTIONS
+
+        if changed:
+            self.invalidate()
+
+    async def aclose(self):
+        """关闭连接池（应用关闭时调用）"""
+        clients, self._retired = self._retired, []
+        if self._client is not None:
+            clients.append(self._client)
+        self._client = None
+        for client in clients:
+            if not client.is_closed:
+                await client.aclose()
+
+
+# 全局共享连接池实例
+http_pool = HttpClientPool()
@@ -0,0 +1,197 @@
+"""
+LLM响应缓存模块
+按 (模型, 提示词模板版本, 输入哈希, 上下文资料版本) 持久化缓存LLM结果，相同输入重复调用时直接返回；
+超过有效期的条目视为未命中，条目数超过上限时按最近访问时间淘汰
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from typing import Any, Iterable, Optional, Tuple
+
+from ..core.config import config
+
+logger = logging.getLogger(__name__)
+
+# 每写入多少条检查一次条目数上限
+_EVICT_INTERVAL = 100
+
+# 命中时更新访问时间的最小间隔（秒），避免热点条目每次读取都写库
+_TOUCH_INTERVAL = 60
+
+
+def cache_key(model: str, template: str, inputs: Any, context_versions: Optional[Iterable[Tuple]] = None) -> str:
+    """
+    计算缓存键
+
+    Args:
+        model: 模型标识
+        template: 提示词模板名和版本（如 "summary:v1"），模板变化时旧缓存自然失效
+        inputs: 影响结果的全部输入（文本和生成参数），需可JSON序列化
+        context_versions: 上下文资料版本，如 [(资料ID, 更新时间)]，资料更新后旧回答失效
+
+    Returns:
+        SHA256十六进制摘要
+    """
+    payload = json.dumps(
+        [model, template, inputs, [list(version) for version in context_versions or []]],
+        ensure_ascii=False, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """基于SQLite的LLM响应缓存（TTL + LRU淘汰）"""
+
+    def __init__(self):
+        self._conn: Optional[sqlite3.Connection] = None
+        self._path: Optional[str] = None
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用LLM缓存"""
+        return bool(config.LLM_CACHE_ENABLED)
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取数据库连接（路径配置变化时重新打开）"""
+        path = config.LLM_CACHE_PATH
+        if self._conn is not None and self._path == path:
+            return self._conn
+
+        if self._conn is not None:
+            self._conn.close()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=config.SQLITE_TIMEOUT)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                template TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed_at ON llm_responses(accessed_at)")
+        conn.commit()
+
+        self._conn = conn
+        self._path = path
+        logger.info(f"LLM缓存已打开: {path}")
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        查询缓存
+
+        Returns:
+            缓存的结果，未命中或已过期时返回None
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created_at, accessed_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at, accessed_at = row
+            if now - created_at > config.LLM_CACHE_TTL:
+                conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                conn.commit()
+                self.misses += 1
+                return None
+
+            if now - accessed_at > _TOUCH_INTERVAL:
+                conn.execute("UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (now, key))
+                conn.commit()
+            self.hits += 1
+
+        return json.loads(value)
+
+    def put(self, key: str, template: str, value: Any):
+        """
+        写入缓存（已存在的键覆盖并刷新有效期）
+
+        Args:
+            key: cache_key生成的缓存键
+            template: 提示词模板名和版本（便于按模板统计和清理）
+            value: 结果，需可JSON序列化
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, template, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, template, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= _EVICT_INTERVAL:
+                self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """删除过期条目，并按最近访问时间淘汰超出上限的条目（调用方持有锁）"""
+        self._writes_since_evict = 0
+        expired = conn.execute(
+            "DELETE FROM llm_responses WHERE created_at < ?", (now - config.LLM_CACHE_TTL,)
+        ).rowcount
+        overflow = conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0] - config.LLM_CACHE_MAX_ENTRIES
+        evicted = 0
+        if overflow > 0:
+            evicted = conn.execute("""
+                DELETE FROM llm_responses WHERE key IN (
+                    SELECT key FROM llm_responses ORDER BY accessed_at LIMIT ?
+                )
+            """, (overflow,)).rowcount
+        if expired or evicted:
+            logger.info(f"LLM缓存清理: 过期 {expired} 条，淘汰 {evicted} 条")
+
+    def count(self) -> int:
+        """缓存条目数量"""
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+    def metrics(self) -> dict:
+        """缓存状态（条目数和本进程的命中统计）"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": self.count(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None
+        }
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM llm_responses")
+            conn.commit()
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self._path = None
+
+
+# 全局LLM缓存实例
+llm_cache = LLMCache()
@@ -0,0 +1,155 @@
+"""
+本地ONNX向量嵌入模块
+使用onnxruntime在本机CPU上运行句向量模型，无需远程Embedding服务
+"""
+import asyncio
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+try:
+    from tokenizers import Tokenizer
+    TOKENIZERS_AVAILABLE = True
+except ImportError:
+    TOKENIZERS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxEmbeddingBackend:
+    """本地ONNX句向量模型"""
+
+    def __init__(
+        self,
+        model_path: str,
+        tokenizer_path: str,
+        max_length: int = 512,
+        batch_size: int = 32,
+        intra_op_threads: int = 0,
+        expected_dimensions: int = 0
+    ):
+        """
+        加载ONNX模型和分词器（耗时操作，需在执行器中调用，见 load_onnx_backend）
+
+        Args:
+            model_path: ONNX模型文件路径
+            tokenizer_path: HuggingFace tokenizer.json 文件路径
+            max_length: 单条文本最大token数，超出部分截断
+            batch_size: 单次推理的文本数量
+            intra_op_threads: 算子内并行线程数，0表示使用全部CPU核心
+            expected_dimensions: 期望的向量维度（与集合维度一致），0表示不检查
+
+        Raises:
+            ValueError: 模型输出维度与期望维度不一致
+        """
+        if not ONNX_AVAILABLE:
+            raise RuntimeError("onnxruntime未安装，无法使用本地ONNX向量模型")
+        if not TOKENIZERS_AVAILABLE:
+            raise RuntimeError("tokenizers未安装，无法使用本地ONNX向量模型")
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"ONNX模型文件不存在: {model_path}")
+        if not os.path.exists(tokenizer_path):
+            raise FileNotFoundError(f"分词器文件不存在: {tokenizer_path}")
+
+        self.batch_size = max(batch_size, 1)
+
+        # 单个推理由intra-op线程池并行计算，inter-op保持顺序执行
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads or os.cpu_count() or 1
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.session = ort.InferenceSession(
+            model_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        # 截断到最大长度，按批次内最长文本补齐
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+        # 试运行一次推理确认输出维度，维度不一致时写入集合会失败或污染向量存储
+        self.dimensions = int(self._encode(["dimension probe"]).shape[1])
+        if expected_dimensions and self.dimensions != expected_dimensions:
+            raise ValueError(
+                f"ONNX模型输出维度 {self.dimensions} 与配置的向量维度 {expected_dimensions} 不一致: {model_path}"
+            )
+
+        # 推理本身已占满CPU核心，使用单线程执行器串行提交，避免多个推理争抢线程
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="onnx-embedding")
+
+        logger.info(
+            f"ONNX向量模型加载完成: {model_path}，维度: {self.dimensions}，线程数: {options.intra_op_num_threads}"
+        )
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """对一个批次的文本执行推理，返回归一化后的句向量"""
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+
+        output = self.session.run(None, feeds)[0]
+
+        if output.ndim == 3:
+            # 输出为token级向量时按attention_mask做平均池化
+            mask = attention_mask[..., np.newaxis].astype(np.float32)
+            pooled = (output * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        else:
+            # 模型已输出句向量
+            pooled = output
+
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def embed_sync(self, texts: List[str]) -> List[List[float]]:
+        """
+        同步批量向量化
+
+        按文本长度排序后分批，减少批内补齐带来的无效计算，结果按原顺序返回
+        """
+        if not texts:
+            return []
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        results: List[List[float]] = [None] * len(texts)
+
+        for start in range(0, len(order), self.batch_size):
+            batch_indices = order[start:start + self.batch_size]
+            vectors = self._encode([texts[i] for i in batch_indices])
+            for index, vector in zip(batch_indices, vectors):
+                results[index] = vector.tolist()
+
+        return results
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """在执行器中运行推理，避免阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.embed_sync, texts)
+
+
+async def load_onnx_backend(**kwargs) -> OnnxEmbeddingBackend:
+    """
+    在执行器中加载ONNX模型（创建推理会话和分词器需要数秒，不能在事件循环中执行）
+
+    Args:
+        kwargs: OnnxEmbeddingBackend 的构造参数
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, lambda: OnnxEmbeddingBackend(**kwargs))
@@ -0,0 +1,129 @@
+"""
+Embedding服务客户端限流模块
+基于令牌桶限制请求数和token预算，交互式查询优先于后台导入/重建索引流量
+"""
+import asyncio
+import time
+import logging
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+# 请求优先级
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本token数
+
+    中日韩字符按每字1个token计算，其余字符按每4个字符1个token计算
+    """
+    cjk_count = sum(1 for char in text if '\u3040' <= char <= '\u9fff' or '\uac00' <= char <= '\ud7af')
+    return max(cjk_count + (len(text) - cjk_count) // 4, 1)
+
+
+class PriorityRateLimiter:
+    """
+    双令牌桶限流器（请求数 + token数）
+
+    - 有交互式请求等待时，后台请求让出令牌
+    - 后台请求不能使令牌低于保留比例，为交互式突发留出余量
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float,
+        tokens_per_second: float,
+        background_reserve: float = 0.2,
+        enabled: bool = True
+    ):
+        """
+        初始化限流器
+
+        Args:
+            requests_per_second: 每秒允许的请求数（桶容量同值且不小于1，即允许1秒的突发）
+            tokens_per_second: 每秒允许的token数
+            background_reserve: 后台请求必须保留给交互式请求的令牌比例（0-1）
+            enabled: 是否启用限流
+        """
+        self.enabled = enabled
+        self.request_rate = max(requests_per_second, 0.001)
+        self.request_capacity = max(self.request_rate, 1)
+        self.token_rate = max(tokens_per_second, 1)
+        self.background_reserve = min(max(background_reserve, 0.0), 0.9)
+        self._requests = self.request_capacity
+        self._tokens = self.token_rate
+        self._updated_at = time.monotonic()
+        self._interactive_waiting = 0
+        self._stats = {
+            PRIORITY_INTERACTIVE: {"acquired": 0, "wait_time": 0.0},
+            PRIORITY_BACKGROUND: {"acquired": 0, "wait_time": 0.0}
+        }
+
+    def _refill(self):
+        """按流逝时间补充令牌"""
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._requests = min(self.request_capacity, self._requests + elapsed * self.request_rate)
+        self._tokens = min(self.token_rate, self._tokens + elapsed * self.token_rate)
+
+    async def acquire(self, tokens: int = 1, priority: str = PRIORITY_BACKGROUND):
+        """
+        获取一次请求的令牌，不足时等待
+
+        Args:
+            tokens: 本次请求预计消耗的token数
+            priority: 请求优先级
+        """
+        if not self.enabled:
+            return
+
+        # 超过桶容量的请求按满桶计算，避免永远无法获取
+        tokens = min(max(tokens, 1), self.token_rate)
+        interactive = priority == PRIORITY_INTERACTIVE
+        reserve = 0.0 if interactive else self.background_reserve
+        start = time.monotonic()
+
+        if interactive:
+            self._interactive_waiting += 1
+        try:
+            while True:
+                self._refill()
+
+                request_floor = min(1 + reserve * self.request_capacity, self.request_capacity)
+                token_floor = min(tokens + reserve * self.token_rate, self.token_rate)
+                yielding = not interactive and self._interactive_waiting > 0
+
+                if not yielding and self._requests >= request_floor and self._tokens >= token_floor:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    break
+
+                # 计算令牌补足所需时间；让出时短暂等待后重新检查
+                wait = max(
+                    (request_floor - self._requests) / self.request_rate,
+                    (token_floor - self._tokens) / self.token_rate,
+                    0.005
+                )
+                await asyncio.sleep(wait if not yielding else 0.01)
+        finally:
+            if interactive:
+                self._interactive_waiting -= 1
+
+        stats = self._stats[PRIORITY_INTERACTIVE if interactive else PRIORITY_BACKGROUND]
+        stats["acquired"] += 1
+        stats["wait_time"] += time.monotonic() - start
+
+    def snapshot(self) -> Dict[str, Any]:
+        """获取限流器状态快照"""
+        self._refill()
+        return {
+            "enabled": self.enabled,
+            "available_requests": round(self._requests, 2),
+            "available_tokens": round(self._tokens, 2),
+            "interactive_waiting": self._interactive_waiting,
+            "lanes": {lane: dict(stats) for lane, stats in self._stats.items()}
+        }
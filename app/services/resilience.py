@@ -0,0 +1,180 @@
+"""
+AI服务调用容错模块
+提供带抖动的指数退避重试与熔断器，避免瞬时故障导致请求失败，并在服务不可用时快速失败
+"""
+import asyncio
+import random
+import threading
+import time
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """熔断器处于打开状态，请求被直接拒绝"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    - closed: 正常放行，连续失败达到阈值后打开
+    - open: 直接拒绝请求，经过恢复时间后进入半开
+    - half_open: 放行一个探测请求，成功则关闭，失败则重新打开
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """
+        初始化熔断器
+
+        Args:
+            name: 熔断器名称（用于日志和指标）
+            failure_threshold: 连续失败多少次后打开
+            recovery_timeout: 打开后多少秒进入半开状态
+        """
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_probe = False
+        self._total_failures = 0
+        self._total_rejections = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """当前状态（打开超过恢复时间后视为半开）"""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """是否处于拒绝请求的打开状态"""
+        return self.state == self.OPEN
+
+    def allow_request(self) -> bool:
+        """判断是否放行本次请求"""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    self._total_rejections += 1
+                    return False
+                self._state = self.HALF_OPEN
+                self._half_open_probe = False
+
+            if self._state == self.HALF_OPEN:
+                # 半开状态只放行一个探测请求
+                if self._half_open_probe:
+                    self._total_rejections += 1
+                    return False
+                self._half_open_probe = True
+
+            return True
+
+    def record_success(self):
+        """记录一次成功调用"""
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"熔断器 {self.name} 恢复为关闭状态")
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._half_open_probe = False
+
+    def record_failure(self):
+        """记录一次失败调用"""
+        with self._lock:
+            self._consecutive_failures += 1
+            self._total_failures += 1
+            if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"熔断器 {self.name} 打开，连续失败 {self._consecutive_failures} 次")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._half_open_probe = False
+
+    def release_probe(self):
+        """释放半开状态的探测名额（探测请求被取消、没有得出成功或失败的结果时调用）"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._half_open_probe = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """获取熔断器状态快照（用于健康检查和指标）"""
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._consecutive_failures,
+                "total_failures": self._total_failures,
+                "total_rejections": self._total_rejections
+            }
+
+
+async def retry_async(
+    func: Callable[[], Awaitable[Any]],
+    max_retries: int = 3,
+    base_delay: float = 0.5,
+    max_delay: float = 10.0,
+    breaker: Optional[CircuitBreaker] = None,
+    retryable: Optional[Callable[[Exception], bool]] = None
+) -> Any:
+    """
+    带抖动指数退避的异步重试
+
+    Args:
+        func: 无参异步函数，每次重试重新调用
+        max_retries: 最大重试次数（不含首次调用）
+        base_delay: 退避基准时间（秒）
+        max_delay: 单次退避上限（秒）
+        breaker: 熔断器，打开时直接抛出CircuitOpenError
+        retryable: 判断异常是否可重试，不可重试的异常直接抛出且不计入熔断
+
+    Returns:
+        func的返回值
+    """
+    attempt = 0
+    while True:
+        if breaker is not None and not breaker.allow_request():
+            raise CircuitOpenError(f"服务熔断中: {breaker.name}")
+
+        try:
+            result = await func()
+        except Exception as e:
+            if retryable is not None and not retryable(e):
+                # 参数错误等非瞬时异常说明服务本身可用
+                if breaker is not None:
+                    breaker.record_success()
+                raise
+
+            if breaker is not None:
+                breaker.record_failure()
+
+            if attempt >= max_retries:
+                raise
+
+            # 全抖动：在 [0, min(上限, 基准 * 2^n)] 区间内随机等待
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            attempt += 1
+            logger.warning(f"调用失败，{delay:.2f}秒后第{attempt}次重试: {str(e)}")
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            # 调用被取消（客户端断开、应用关闭）时没有结果，释放探测名额，否则熔断器会一直停留在半开状态拒绝请求
+            if breaker is not None:
+                breaker.release_probe()
+            raise
+
+        if breaker is not None:
+            breaker.record_success()
+        return result
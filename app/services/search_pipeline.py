@@ -0,0 +1,287 @@
+"""
+检索流水线模块
+将检索拆分为向量检索、关键词补充和最终排序三个阶段，普通检索接口一次性返回结果，流式接口在每个阶段完成后立即推送
+"""
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.models.schemas import SearchRequest
+from app.core.config import config
+from app.core.logger_manager import log, LogType
+from app.services.artifact_projection import parse_fields, select_columns, needs_content, row_to_dict
+
+# 未指定fields时返回的完整字段
+FULL_FIELDS = ["id", "title", "content", "category", "created_at", "updated_at", "is_active"]
+
+# 完整结果中没有从数据库读取、始终为空的字段（与SearchResult的输出保持一致）
+_FULL_EMPTY_FIELDS = ("tags", "metadata", "source_type", "source_path")
+
+# 向量检索按切片命中，每条结果预取的切片候选数（同一资料的多个切片聚合为一条结果）
+_CHUNK_CANDIDATES_PER_RESULT = 4
+
+# 每条结果最多返回的命中切片数
+_MAX_CHUNKS_PER_RESULT = 3
+
+# 关联资料内容表（正文、标签、元数据）
+_CONTENT_JOIN = " LEFT JOIN artifact_contents c ON c.artifact_id = a.id"
+
+# 流水线阶段（流式接口的事件名）
+STAGE_VECTOR = "vector"
+STAGE_KEYWORD = "keyword"
+STAGE_SUMMARY = "summary"
+
+
+class SearchPipeline:
+    """单次检索的流水线"""
+
+    def __init__(self, search_request: SearchRequest, db: Dict[str, Any]):
+        """
+        Args:
+            search_request: 检索请求
+            db: 数据库依赖（包含sqlite、chroma、collection）
+
+        Raises:
+            ValueError: fields包含不支持的字段
+        """
+        self.request = search_request
+        self.db = db
+        self.projection = parse_fields(search_request.fields)
+        fields = self.projection or FULL_FIELDS
+        # 只读取需要返回的列，摘要按查询语句定位截取
+        self.columns, self.column_params = select_columns(fields, search_request.query, search_request.snippet_length)
+        self.content_join = _CONTENT_JOIN if needs_content(fields) else ""
+        self.start_time = time.time()
+
+    def _build_result(self, row, similarity: float) -> dict:
+        """
+        由查询行直接构建检索结果字典（数据来自本地数据库，跳过模型校验）
+
+        指定投影时只包含投影字段和相似度，否则字段与SearchResult一致（chunks由向量检索阶段填充）
+        """
+        result = row_to_dict(self.projection or FULL_FIELDS, row, self.request.query, self.request.snippet_length)
+        if not self.projection:
+            for field in _FULL_EMPTY_FIELDS:
+                result[field] = None
+            result["chunks"] = None
+        result["similarity"] = similarity
+        return result
+
+    async def vector_stage(self) -> List[dict]:
+        """向量检索并从SQLite补全资料信息，不可用或失败时返回空列表"""
+        from app.services.ai_clients import embedding_client
+        from app.services.rate_limiter import PRIORITY_INTERACTIVE
+
+        collection = self.db.get("collection")
+        # Embedding服务熔断时直接降级为关键词搜索
+        if embedding_client.breaker.is_open:
+            log("Embedding服务熔断中，降级为关键词搜索", LogType.SERVER, "WARNING")
+            return []
+        if not self.db.get("chroma") or not collection:
+            log("ChromaDB客户端或集合不可用，使用关键词搜索", LogType.SERVER, "WARNING")
+            return []
+
+        try:
+            query_embedding = await embedding_client.embed(self.request.query, priority=PRIORITY_INTERACTIVE)
+
+            # 执行向量搜索（不获取documents，从SQLite查询），按切片命中，多取候选以便聚合后仍有top_k条资料
+            vector_results = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=self.request.top_k * _CHUNK_CANDIDATES_PER_RESULT,
+                include=["distances", "metadatas"]
+            )
+            distances = vector_results['distances'][0]
+            metadatas = vector_results['metadatas'][0]
+            log(f"向量搜索执行成功，返回 {len(metadatas)} 个切片", LogType.SERVER, "INFO")
+
+            # 计算相似度（距离越小，相似度越高），切片命中聚合到资料并取最高相似度，低于阈值的结果不查询SQLite
+            best: Dict[int, float] = {}
+            chunk_hits: Dict[int, List[Tuple[int, float]]] = {}
+            for distance, metadata in self._summary_matches(query_embedding) + list(zip(distances, metadatas)):
+                similarity = 1.0 / (1.0 + distance)
+                metadata = metadata or {}
+                artifact_id = metadata.get('artifact_id')
+                if not artifact_id or similarity < self.request.threshold:
+                    continue
+                artifact_id = int(artifact_id)
+                best[artifact_id] = max(similarity, best.get(artifact_id, 0.0))
+                if metadata.get('chunk_index') is not None:
+                    chunk_hits.setdefault(artifact_id, []).append((int(metadata['chunk_index']), similarity))
+            if not best:
+                return []
+            hits = sorted(best.items(), key=lambda hit: hit[1], reverse=True)[:self.request.top_k]
+
+            cursor = self.db["sqlite"].cursor()
+            artifact_ids = [artifact_id for artifact_id, _ in hits]
+            placeholders = ','.join('?' * len(artifact_ids))
+            cursor.execute(f"""
+                SELECT {self.columns}
+                FROM artifacts a{self.content_join}
+                WHERE a.id IN ({placeholders}) AND a.is_active = 1
+            """, self.column_params + artifact_ids)
+            rows = {row[0]: row for row in cursor.fetchall()}
+
+            results = [
+                self._build_result(rows[artifact_id], similarity)
+                for artifact_id, similarity in hits
+                if artifact_id in rows
+            ]
+            if not self.projection:
+                chunks = self._load_chunks({result["id"]: chunk_hits.get(result["id"], []) for result in results})
+                for result in results:
+                    result["chunks"] = chunks.get(result["id"])
+            log(f"向量搜索结果处理完成，添加了 {len(results)} 个结果", LogType.SERVER, "INFO")
+            return results
+
+        except Exception as e:
+            # 向量搜索失败，继续使用关键词搜索
+            log(f"向量搜索失败: {str(e)}", LogType.SERVER, "ERROR")
+            return []
+
+    def _load_chunks(self, chunk_hits: Dict[int, List[Tuple[int, float]]]) -> Dict[int, List[dict]]:
+        """
+        读取命中的切片内容
+
+        Args:
+            chunk_hits: 资料ID到 (切片序号, 相似度) 列表的映射
+
+        Returns:
+            资料ID到切片信息列表的映射（按相似度降序，每条资料最多_MAX_CHUNKS_PER_RESULT个）
+        """
+        wanted = {
+            (artifact_id, chunk_index): similarity
+            for artifact_id, hits in chunk_hits.items()
+            for chunk_index, similarity in sorted(hits, key=lambda hit: hit[1], reverse=True)[:_MAX_CHUNKS_PER_RESULT]
+        }
+        if not wanted:
+            return {}
+
+        keys = list(wanted.keys())
+        cursor = self.db["sqlite"].cursor()
+        cursor.execute(f"""
+            SELECT id, artifact_id, chunk_index, content
+            FROM chunks
+            WHERE (artifact_id, chunk_index) IN (VALUES {','.join('(?, ?)' for _ in keys)})
+        """, [value for key in keys for value in key])
+
+        chunks: Dict[int, List[dict]] = {}
+        for chunk_id, artifact_id, chunk_index, content in cursor.fetchall():
+            chunks.setdefault(artifact_id, []).append({
+                "chunk_id": chunk_id,
+                "content": content,
+                "similarity": wanted[(artifact_id, chunk_index)],
+                "chunk_index": chunk_index
+            })
+        for artifact_chunks in chunks.values():
+            artifact_chunks.sort(key=lambda chunk: chunk["similarity"], reverse=True)
+        return chunks
+
+    def _summary_matches(self, query_embedding) -> List[tuple]:
+        """在资料摘要向量集合中检索（第二检索字段），未启用或失败时返回空列表"""
+        from app.core.database import db_manager
+
+        if not config.ENRICHMENT_EMBED_SUMMARIES:
+            return []
+        try:
+            summary_collection = db_manager.get_summary_collection()
+            if summary_collection is None or summary_collection.count() == 0:
+                return []
+            summary_results = summary_collection.query(
+                query_embeddings=[query_embedding],
+                n_results=min(self.request.top_k, summary_collection.count()),
+                include=["distances", "metadatas"]
+            )
+            return list(zip(summary_results['distances'][0], summary_results['metadatas'][0]))
+        except Exception as e:
+            log(f"摘要向量搜索失败: {str(e)}", LogType.SERVER, "WARNING")
+            return []
+
+    def keyword_stage(self, exclude_ids: set, limit: int) -> List[dict]:
+        """
+        关键词补充检索
+
+        Args:
+            exclude_ids: 已有结果的资料ID
+            limit: 最多补充的结果数量
+        """
+        if limit <= 0:
+            return []
+
+        query = self.request.query
+        conditions = ["a.is_active = 1", "(a.title LIKE ? OR c.content LIKE ?)"]
+        params = [f"%{query}%", f"%{query}%"]
+
+        if self.request.category_filter:
+            category_placeholders = ','.join('?' * len(self.request.category_filter))
+            conditions.append(f"a.category IN ({category_placeholders})")
+            params.extend(self.request.category_filter)
+
+        # 多取已有结果数量的记录，保证去重后仍能补足
+        cursor = self.db["sqlite"].cursor()
+        cursor.execute(f"""
+            SELECT {self.columns}, a.title AS match_title
+            FROM artifacts a{_CONTENT_JOIN}
+            WHERE {" AND ".join(conditions)}
+            ORDER BY CASE
+                WHEN a.title LIKE ? THEN 1
+                WHEN c.content LIKE ? THEN 2
+                ELSE 3
+            END, a.created_at DESC
+            LIMIT ?
+        """, self.column_params + params + [f"%{query}%", f"%{query}%", limit + len(exclude_ids)])
+
+        # 标题是否命中在Python中判断（SQLite内置的lower()只转换ASCII字母）
+        lowered_query = query.lower()
+        results = []
+        for row in cursor.fetchall():
+            if row[0] in exclude_ids:
+                continue
+            # 对于关键词匹配的结果，给予一个较低的相似度分数，标题匹配时提高相似度
+            similarity = 0.7 if lowered_query in (row[-1] or "").lower() else 0.5
+            if similarity >= self.request.threshold:
+                results.append(self._build_result(row, similarity))
+                if len(results) >= limit:
+                    break
+        return results
+
+    def rank(self, results: List[dict]) -> List[dict]:
+        """按相似度排序并截取top_k"""
+        ranked = sorted(results, key=lambda x: x["similarity"] or 0, reverse=True)
+        return ranked[:self.request.top_k]
+
+    @property
+    def elapsed(self) -> float:
+        """从流水线创建到现在的耗时（秒）"""
+        return time.time() - self.start_time
+
+    async def stream(self) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        按阶段产出检索结果
+
+        Yields:
+            (阶段名, 数据)：vector/keyword 为该阶段新增的结果列表，summary 为最终排序的ID、相似度和耗时
+        """
+        vector_results = await self.vector_stage()
+        yield STAGE_VECTOR, vector_results
+
+        # 向量搜索没有返回足够的结果或失败时，使用关键词搜索作为补充
+        keyword_results = self.keyword_stage(
+            {result["id"] for result in vector_results},
+            self.request.top_k - len(vector_results)
+        )
+        yield STAGE_KEYWORD, keyword_results
+
+        ranked = self.rank(vector_results + keyword_results)
+        yield STAGE_SUMMARY, {
+            "query": self.request.query,
+            "ranking": [{"id": result["id"], "similarity": result["similarity"]} for result in ranked],
+            "total_count": len(ranked),
+            "response_time": self.elapsed
+        }
+
+    async def run(self) -> List[dict]:
+        """执行完整流水线，返回最终排序后的结果"""
+        results = []
+        async for stage, data in self.stream():
+            if stage != STAGE_SUMMARY:
+                results.extend(data)
+        return self.rank(results)
@@ -0,0 +1,284 @@
+"""
+向量同步outbox模块
+资料变更时在同一事务中写入outbox记录，由后台任务批量同步到向量数据库，失败时按退避策略重试
+"""
+import asyncio
+import random
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+from app.core.database import db_manager
+from app.core.config import config
+from app.core.logger_manager import log, LogType
+from app.services.vector_sync import vector_sync_service
+
+logger = logging.getLogger(__name__)
+
+# outbox操作类型
+OUTBOX_UPSERT = "upsert"
+OUTBOX_DELETE = "delete"
+
+
+def enqueue_vector_sync(cursor, artifact_id: int, operation: str = OUTBOX_UPSERT):
+    """
+    写入一条向量同步记录（不提交事务，由调用方与资料变更一起提交）
+
+    Args:
+        cursor: 资料变更所用的数据库游标
+        artifact_id: 资料ID
+        operation: 操作类型（upsert/delete），仅用于记录，实际动作以处理时的资料状态为准
+    """
+    now = time.time()
+    cursor.execute("""
+        INSERT INTO vector_sync_outbox (artifact_id, operation, next_attempt_at, created_at)
+        VALUES (?, ?, ?, ?)
+    """, (artifact_id, operation, now, now))
+
+
+class VectorSyncOutboxWorker:
+    """向量同步outbox后台处理任务"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stats = {
+            "processed": 0,
+            "failed": 0,
+            "last_error": None,
+            "last_run_at": None
+        }
+
+    def start(self):
+        """启动后台任务（应用启动时调用）"""
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        log("向量同步 - outbox后台任务已启动", LogType.DATABASE, "INFO")
+
+    async def stop(self):
+        """停止后台任务（应用关闭时调用），未处理的记录保留在outbox中，下次启动继续处理"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def notify(self):
+        """通知后台任务有新记录，无需等待下一次轮询"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        """后台循环：有到期记录时连续处理，否则等待通知或轮询间隔"""
+        while True:
+            try:
+                processed = await self.process_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"处理向量同步outbox失败: {str(e)}", exc_info=True)
+                processed = 0
+
+            if processed:
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=config.VECTOR_SYNC_OUTBOX_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def _retry_delay(self, attempts: int) -> float:
+        """计算第attempts次失败后的退避时间（全抖动）"""
+        ceiling = min(
+            config.VECTOR_SYNC_OUTBOX_RETRY_MAX_DELAY,
+            config.VECTOR_SYNC_OUTBOX_RETRY_BASE_DELAY * (2 ** min(attempts, 16))
+        )
+        return random.uniform(ceiling / 2, ceiling)
+
+    async def _sync(self, artifacts: List[dict], removed_ids: List[int]) -> Optional[str]:
+        """
+        同步一组资料：仍存在的写入最新内容，已删除的从向量数据库删除
+
+        Returns:
+            失败时返回错误信息，成功返回None
+        """
+        try:
+            if artifacts and not await vector_sync_service.batch_sync_artifacts_to_vector_db(artifacts):
+                raise RuntimeError("批量同步资料到向量数据库失败")
+            if removed_ids and not await vector_sync_service.remove_artifacts_from_vector_db(removed_ids):
+                raise RuntimeError("从向量数据库批量删除资料失败")
+        except Exception as e:
+            return str(e)
+        return None
+
+    async def _sync_each(self, artifacts: List[dict], removed_ids: List[int]) -> Dict[int, str]:
+        """
+        批量同步失败后逐条重试，找出真正失败的资料，避免一条坏数据拖累同批的其他资料
+
+        Returns:
+            失败的资料ID到错误信息的映射
+        """
+        failures: Dict[int, str] = {}
+        for artifact in artifacts:
+            error = await self._sync([artifact], [])
+            if error is not None:
+                failures[artifact['id']] = error
+        for artifact_id in removed_ids:
+            error = await self._sync([], [artifact_id])
+            if error is not None:
+                failures[artifact_id] = error
+        return failures
+
+    async def process_batch(self) -> int:
+        """
+        处理一批到期的outbox记录
+
+        同一资料的多条记录合并为一次同步：资料仍存在则写入最新内容，否则从向量数据库删除。
+        整批失败时逐条重试，只有失败的资料退避重试；连续失败达到上限的记录转为死信，不再处理
+
+        Returns:
+            本轮处理的outbox记录数
+        """
+        conn = db_manager.init_sqlite()
+        cursor = conn.cursor()
+        now = time.time()
+        cursor.execute("""
+            SELECT id, artifact_id, attempts
+            FROM vector_sync_outbox
+            WHERE next_attempt_at <= ? AND dead_at IS NULL
+            ORDER BY id
+            LIMIT ?
+        """, (now, max(config.VECTOR_SYNC_OUTBOX_BATCH_SIZE, 1)))
+        entries = cursor.fetchall()
+        if not entries:
+            return 0
+
+        self._stats["last_run_at"] = now
+
+        # 按资料ID合并
+        entry_ids: Dict[int, List[int]] = {}
+        attempts: Dict[int, int] = {}
+        for entry_id, artifact_id, entry_attempts in entries:
+            entry_ids.setdefault(artifact_id, []).append(entry_id)
+            attempts[artifact_id] = max(attempts.get(artifact_id, 0), entry_attempts)
+
+        artifact_ids = list(entry_ids.keys())
+        placeholders = ",".join("?" * len(artifact_ids))
+        cursor.execute(f"""
+            SELECT a.id, a.title, c.content, a.category
+            FROM artifacts a LEFT JOIN artifact_contents c ON c.artifact_id = a.id
+            WHERE a.is_active = 1 AND a.id IN ({placeholders})
+        """, artifact_ids)
+        artifacts = [
+            {'id': row[0], 'title': row[1], 'content': row[2], 'category': row[3] or ''}
+            for row in cursor.fetchall()
+        ]
+        existing_ids = {artifact['id'] for artifact in artifacts}
+        removed_ids = [artifact_id for artifact_id in artifact_ids if artifact_id not in existing_ids]
+
+        failures: Dict[int, str] = {}
+        error = await self._sync(artifacts, removed_ids)
+        if error is not None:
+            if len(artifact_ids) == 1:
+                failures[artifact_ids[0]] = error
+            else:
+                failures = await self._sync_each(artifacts, removed_ids)
+
+        # 只删除本轮读取的记录，处理期间新写入的记录留待下一轮；
+        # 同步成功的资料之前转为死信的记录已被本次结果覆盖，一并删除
+        succeeded = [artifact_id for artifact_id in artifact_ids if artifact_id not in failures]
+        done_entry_ids = [entry_id for artifact_id in succeeded for entry_id in entry_ids[artifact_id]]
+        for start in range(0, len(done_entry_ids), 500):
+            chunk = done_entry_ids[start:start + 500]
+            cursor.execute(
+                f"DELETE FROM vector_sync_outbox WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+        for start in range(0, len(succeeded), 500):
+            chunk = succeeded[start:start + 500]
+            cursor.execute(
+                f"DELETE FROM vector_sync_outbox WHERE dead_at IS NOT NULL AND artifact_id IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+
+        max_attempts = max(config.VECTOR_SYNC_OUTBOX_MAX_ATTEMPTS, 1)
+        retry_at = time.time()
+        dead_ids = []
+        updates = []
+        for artifact_id, artifact_error in failures.items():
+            failed_attempts = attempts[artifact_id] + 1
+            if failed_attempts >= max_attempts:
+                dead_ids.append(artifact_id)
+                dead_at, next_attempt_at = retry_at, retry_at
+            else:
+                dead_at, next_attempt_at = None, retry_at + self._retry_delay(attempts[artifact_id])
+            updates.extend(
+                (next_attempt_at, artifact_error, dead_at, entry_id)
+                for entry_id in entry_ids[artifact_id]
+            )
+        cursor.executemany("""
+            UPDATE vector_sync_outbox
+            SET attempts = attempts + 1, next_attempt_at = ?, last_error = ?, dead_at = ?
+            WHERE id = ?
+        """, updates)
+        conn.commit()
+
+        self._stats["processed"] += len(done_entry_ids)
+        if failures:
+            self._stats["failed"] += len(updates)
+            self._stats["last_error"] = next(iter(failures.values()))
+        if len(failures) > len(dead_ids):
+            log(
+                f"向量同步 - outbox处理失败，{len(failures) - len(dead_ids)} 条资料将稍后重试: {self._stats['last_error']}",
+                LogType.DATABASE, "WARNING"
+            )
+        if dead_ids:
+            log(
+                f"向量同步 - {len(dead_ids)} 条资料连续失败 {max_attempts} 次，已转为死信: {dead_ids[:20]}",
+                LogType.DATABASE, "ERROR"
+            )
+        logger.debug(f"向量同步outbox处理完成，资料数: {len(artifact_ids)}，失败: {len(failures)}，记录数: {len(entries)}")
+
+        return len(entries)
+
+    def metrics(self) -> Dict[str, Any]:
+        """获取outbox积压指标"""
+        cursor = db_manager.init_sqlite().cursor()
+        cursor.execute("""
+            SELECT COUNT(*), COUNT(DISTINCT artifact_id), MIN(created_at), SUM(CASE WHEN attempts > 0 THEN 1 ELSE 0 END)
+            FROM vector_sync_outbox
+            WHERE dead_at IS NULL
+        """)
+        pending, pending_artifacts, oldest_created_at, retrying = cursor.fetchone()
+        # 死信按资料汇总（SQLite中与MAX()一起查询的其他列取自最大值所在行），只列出最近的20条
+        cursor.execute("""
+            SELECT artifact_id, MAX(dead_at), attempts, last_error
+            FROM vector_sync_outbox
+            WHERE dead_at IS NOT NULL
+            GROUP BY artifact_id
+            ORDER BY MAX(dead_at) DESC
+        """)
+        dead_rows = cursor.fetchall()
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "pending": pending,
+            "pending_artifacts": pending_artifacts,
+            "retrying": retrying or 0,
+            "lag_seconds": round(time.time() - oldest_created_at, 3) if oldest_created_at else 0.0,
+            "dead": len(dead_rows),
+            "dead_artifacts": [
+                {"artifact_id": artifact_id, "attempts": dead_attempts, "last_error": last_error, "dead_at": dead_at}
+                for artifact_id, dead_at, dead_attempts, last_error in dead_rows[:20]
+            ],
+            **self._stats
+        }
+
+
+# 全局outbox处理任务实例
+vector_outbox_worker = VectorSyncOutboxWorker()
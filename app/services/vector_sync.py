@@ -2,15 +2,25 @@
 向量同步服务模块
 负责将资料数据同步到向量数据库
 """
+import asyncio
 import logging
-from typing import List, Optional
+import threading
+from datetime import datetime
+from typing import List, Optional, Dict, Any
 from app.services.ai_clients import embedding_client
+from app.services.embedding_store import embedding_store
 from app.core.database import db_manager
 from app.core.config import config
 from app.core.logger_manager import log, LogType
+from app.services.chunker import chunk_vector_id, embedding_text
+from app.services.chunking_pool import chunking_pool
+from app.services.vector_transfer import bulk_upsert
 
 logger = logging.getLogger(__name__)
 
+# 单条SQL中IN参数的最大数量（低于SQLite默认上限999）
+_SQL_CHUNK_SIZE = 500
+
 
 class VectorSyncService:
     """向量同步服务"""
@@ -18,6 +28,132 @@ class VectorSyncService:
     def __init__(self):
         self.db_manager = db_manager
         self.embedding_client = embedding_client
+        # 蓝绿重建索引任务状态
+        self.reindex_status: Dict[str, Any] = {'status': 'idle'}
+        self.lock = threading.Lock()
+        # 保留后台重建任务的引用，避免任务在运行中被垃圾回收
+        self._reindex_task: Optional[asyncio.Task] = None
+        # 蓝绿重建期间双写到影子集合的资料及其写入序号，重建任务据此跳过读取后已被更新或删除的资料
+        self._shadow_write_seq = 0
+        self._shadow_writes: Dict[int, int] = {}
+    
+    def _target_collections(self) -> list:
+        """获取需要写入的集合：当前集合，以及构建中的影子集合（双写保证切换后数据不丢失）"""
+        collections = [self.db_manager.collection]
+        if self.db_manager.shadow_collection is not None:
+            collections.append(self.db_manager.shadow_collection)
+        return collections
+    
+    def _mark_shadow_writes(self, artifact_ids: List[int]):
+        """记录双写到影子集合的资料（仅在影子集合构建期间记录）"""
+        if self.db_manager.shadow_collection is None:
+            return
+        self._shadow_write_seq += 1
+        for artifact_id in artifact_ids:
+            self._shadow_writes[artifact_id] = self._shadow_write_seq
+    
+    def _written_since(self, artifact_ids: List[int], seq: int) -> set:
+        """返回序号seq之后被双写（更新或删除）过的资料ID"""
+        return {artifact_id for artifact_id in artifact_ids if self._shadow_writes.get(artifact_id, 0) > seq}
+    
+    async def _embed(self, texts: List[str]) -> List[List[float]]:
+        """调用Embedding服务生成向量（单条文本走微批合并）"""
+        if len(texts) == 1:
+            return [await self.embedding_client.embed(texts[0])]
+        return await self.embedding_client.embed_batch(texts)
+    
+    async def _embed_with_store(self, texts: List[str]) -> List[List[float]]:
+        """
+        批量生成向量，优先从本地向量存储加载，只对未命中的文本调用Embedding服务
+        
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            与输入顺序一致的向量列表
+        """
+        if not embedding_store.enabled:
+            return await self._embed(texts)
+        
+        model = self.embedding_client.model_key
+        dims = config.EMBEDDING_DIMENSIONS
+        try:
+            embeddings = embedding_store.get_many(model, dims, texts)
+        except Exception as e:
+            logger.warning(f"读取向量存储失败，全部重新生成: {str(e)}")
+            return await self._embed(texts)
+        
+        missing = [i for i, vector in enumerate(embeddings) if vector is None]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            vectors = await self._embed(missing_texts)
+            for index, vector in zip(missing, vectors):
+                embeddings[index] = vector
+            try:
+                # 按实际向量长度写入，模型输出与配置维度不一致时不会以配置维度被读出
+                embedding_store.put_many(model, len(vectors[0]), missing_texts, vectors)
+            except Exception as e:
+                logger.warning(f"写入向量存储失败: {str(e)}")
+        
+        logger.debug(f"向量存储命中 {len(texts) - len(missing)}/{len(texts)}")
+        return embeddings
+    
+    def _store_chunks(self, artifact_chunks: Dict[int, List[dict]]):
+        """
+        将切片写入chunks表（切片内容未变化的资料保持原记录，避免切片ID变化）
+        
+        Args:
+            artifact_chunks: 资料ID到切片列表的映射
+        """
+        if not artifact_chunks:
+            return
+        conn = self.db_manager.init_sqlite()
+        cursor = conn.cursor()
+        artifact_ids = list(artifact_chunks.keys())
+        
+        existing: Dict[int, List[str]] = {}
+        for start in range(0, len(artifact_ids), _SQL_CHUNK_SIZE):
+            part = artifact_ids[start:start + _SQL_CHUNK_SIZE]
+            cursor.execute(f"""
+                SELECT artifact_id, content FROM chunks
+                WHERE artifact_id IN ({','.join('?' * len(part))})
+                ORDER BY artifact_id, chunk_index
+            """, part)
+            for artifact_id, content in cursor.fetchall():
+                existing.setdefault(artifact_id, []).append(content)
+        
+        changed = [
+            artifact_id for artifact_id, chunks in artifact_chunks.items()
+            if existing.get(artifact_id, []) != [chunk['content'] for chunk in chunks]
+        ]
+        if not changed:
+            return
+        
+        for start in range(0, len(changed), _SQL_CHUNK_SIZE):
+            part = changed[start:start + _SQL_CHUNK_SIZE]
+            cursor.execute(f"DELETE FROM chunks WHERE artifact_id IN ({','.join('?' * len(part))})", part)
+        cursor.executemany("""
+            INSERT INTO chunks (artifact_id, chunk_index, content, token_count)
+            VALUES (?, ?, ?, ?)
+        """, [
+            (artifact_id, chunk['chunk_index'], chunk['content'], chunk['token_count'])
+            for artifact_id in changed
+            for chunk in artifact_chunks[artifact_id]
+        ])
+        conn.commit()
+        logger.debug(f"已更新 {len(changed)} 条资料的切片")
+    
+    def _delete_stale_vectors(self, collection, artifact_ids: List[int], keep_ids: set):
+        """删除资料中已不存在的切片向量（切片数减少或旧的整篇向量）"""
+        if not artifact_ids:
+            return
+        existing_ids = collection.get(
+            where={"artifact_id": {"$in": [str(artifact_id) for artifact_id in artifact_ids]}},
+            include=[]
+        )['ids']
+        stale_ids = [vector_id for vector_id in existing_ids if vector_id not in keep_ids]
+        if stale_ids:
+            collection.delete(ids=stale_ids)
     
     async def sync_artifact_to_vector_db(self, artifact_id: int, title: str, content: str, category: str = ""):
         """
@@ -29,53 +165,14 @@ class VectorSyncService:
             content: 资料内容
             category: 资料分类
         """
-        try:
-            # 初始化向量数据库
-            self.db_manager.init_chroma()
-            
-            if not self.db_manager.chroma_available:
-                log("ChromaDB - ChromaDB不可用，跳过向量同步", LogType.DATABASE, "WARNING")
-                return False
-            
-            if not self.db_manager.collection:
-                log("ChromaDB - ChromaDB集合不可用，无法同步向量数据", LogType.DATABASE, "ERROR")
-                return False
-            
-            # 生成向量 - 结合标题和内容
-            text_to_embed = f"{title}\n\n{content}" if title and content else (title or content or "")
-            
-            if not text_to_embed.strip():
-                log(f"ChromaDB - 资料 {artifact_id} 内容为空，跳过向量化", LogType.DATABASE, "WARNING")
-                return True
-            
-            try:
-                # 调用外部Embedding API生成向量
-                embedding_vector = await self.embedding_client.embed(text_to_embed)
-            except Exception as embed_error:
-                log(f"ChromaDB - 生成向量失败，跳过向量同步: {str(embed_error)}", LogType.DATABASE, "ERROR")
-                return False
-            
-            # 将向量数据添加到Chroma数据库（不存储documents，只存储向量数据和必要的metadata）
-            try:
-                self.db_manager.collection.upsert(
-                    ids=[str(artifact_id)],
-                    embeddings=[embedding_vector],
-                    metadatas=[{
-                        "artifact_id": str(artifact_id),
-                        "category": category or "",
-                        "source_type": "artifact"
-                    }]
-                )
-            except Exception as upsert_error:
-                log(f"ChromaDB - 添加向量到数据库失败: {str(upsert_error)}", LogType.DATABASE, "ERROR")
-                return False
-            
+        success = await self.batch_sync_artifacts_to_vector_db([
+            {'id': artifact_id, 'title': title, 'content': content, 'category': category}
+        ])
+        if success:
             log(f"ChromaDB - 成功同步资料 {artifact_id} 到向量数据库", LogType.DATABASE, "INFO")
-            return True
-            
-        except Exception as e:
-            log(f"ChromaDB - 同步资料 {artifact_id} 到向量数据库失败: {str(e)}", LogType.DATABASE, "ERROR")
-            return False
+        else:
+            log(f"ChromaDB - 同步资料 {artifact_id} 到向量数据库失败", LogType.DATABASE, "ERROR")
+        return success
     
     async def remove_artifact_from_vector_db(self, artifact_id: int):
         """
@@ -84,34 +181,56 @@ class VectorSyncService:
         Args:
             artifact_id: 资料ID
         """
+        return await self.remove_artifacts_from_vector_db([artifact_id])
+    
+    async def remove_artifacts_from_vector_db(self, artifact_ids: List[int]) -> bool:
+        """
+        批量从向量数据库中移除资料（包括资料的全部切片向量）
+        
+        Args:
+            artifact_ids: 资料ID列表
+        """
         try:
-            # 初始化向量数据库
             self.db_manager.init_chroma()
             
-            if not self.db_manager.chroma_available:
-                log("ChromaDB - ChromaDB不可用，跳过向量删除", LogType.DATABASE, "WARNING")
+            if not self.db_manager.chroma_available or not self.db_manager.collection:
+                logger.warning("ChromaDB集合不可用，无法批量删除向量数据")
                 return False
             
-            if not self.db_manager.collection:
-                log("ChromaDB - ChromaDB集合不可用，无法删除向量数据", LogType.DATABASE, "ERROR")
-                return False
+            if not artifact_ids:
+                return True
+            
+            owner_filter = {"artifact_id": {"$in": [str(artifact_id) for artifact_id in artifact_ids]}}
+            for collection in self._target_collections():
+                collection.delete(where=owner_filter)
+            self._mark_shadow_writes(artifact_ids)
             
-            # 从向量数据库中删除对应ID的数据
-            self.db_manager.collection.delete(ids=[str(artifact_id)])
+            # 资料增强生成的摘要向量一并删除
+            if config.ENRICHMENT_EMBED_SUMMARIES:
+                summary_collection = self.db_manager.get_summary_collection()
+                if summary_collection is not None:
+                    summary_collection.delete(ids=[str(artifact_id) for artifact_id in artifact_ids])
             
-            log(f"ChromaDB - 成功从向量数据库中移除资料 {artifact_id}", LogType.DATABASE, "INFO")
+            logger.info(f"成功从向量数据库中批量移除 {len(artifact_ids)} 条资料")
             return True
             
         except Exception as e:
-            log(f"ChromaDB - 从向量数据库中移除资料 {artifact_id} 失败: {str(e)}", LogType.DATABASE, "ERROR")
+            logger.error(f"从向量数据库批量移除资料失败: {str(e)}")
             return False
     
-    async def batch_sync_artifacts_to_vector_db(self, artifacts: List[dict]):
+    async def batch_sync_artifacts_to_vector_db(self, artifacts: List[dict], collection=None,
+                                                written_after: Optional[int] = None):
         """
         批量同步资料到向量数据库
         
+        资料切分后写入chunks表，每个切片生成一条向量（ID为 资料ID#切片序号，元数据包含artifact_id和chunk_index），
+        并删除资料中已不存在的切片向量
+        
         Args:
             artifacts: 资料列表，每个元素包含id, title, content, category
+            collection: 目标集合，默认写入当前集合（及构建中的影子集合）
+            written_after: 蓝绿重建读取该批资料前的双写序号，写入前跳过此后被双写过的资料
+                （切分和向量化期间资料可能被更新或删除，双写的结果比本批读取的内容更新）
         """
         try:
             # 初始化向量数据库
@@ -125,46 +244,67 @@ class VectorSyncService:
                 logger.error("ChromaDB集合不可用，无法批量同步向量数据")
                 return False
             
+            # 按配置的切片长度和重叠切分，文本量大时（批量导入、重建索引）在进程池中执行
+            artifact_chunks = await chunking_pool.chunk_artifacts(artifacts)
+            
             # 准备数据
             ids = []
             metadatas = []
-            embeddings = []
+            texts = []
             
             for artifact in artifacts:
                 artifact_id = artifact['id']
-                title = artifact['title']
-                content = artifact['content']
-                category = artifact.get('category', '')
-                
-                # 生成向量 - 结合标题和内容
-                text_to_embed = f"{title}\n\n{content}" if title and content else (title or content or "")
-                
-                if not text_to_embed.strip():
+                chunks = artifact_chunks.get(artifact_id) or []
+                if not chunks:
                     logger.warning(f"资料 {artifact_id} 内容为空，跳过向量化")
                     continue
                 
-                ids.append(str(artifact_id))
-                metadatas.append({
-                    "artifact_id": str(artifact_id),
-                    "category": category or "",
-                    "source_type": "artifact"
-                })
-            
-            if not ids:
-                logger.info("没有需要同步的资料")
-                return True
-            
-            # 批量生成向量
-            embeddings = await self.embedding_client.embed_batch([f"{artifact['title']}\n\n{artifact['content']}" for artifact in artifacts if artifact.get('title') and artifact.get('content')])
-            
-            # 批量添加到向量数据库（不存储documents）
-            self.db_manager.collection.upsert(
-                ids=ids,
-                embeddings=embeddings,
-                metadatas=metadatas
-            )
-            
-            logger.info(f"成功批量同步 {len(ids)} 条资料到向量数据库")
+                # 正文为空时切片即标题，不再重复拼接标题
+                title = artifact['title'] if (artifact.get('content') or '').strip() else None
+                for chunk in chunks:
+                    ids.append(chunk_vector_id(artifact_id, chunk['chunk_index']))
+                    texts.append(embedding_text(title, chunk['content']))
+                    metadatas.append({
+                        "artifact_id": str(artifact_id),
+                        "chunk_index": chunk['chunk_index'],
+                        "category": artifact.get('category') or "",
+                        "source_type": "artifact"
+                    })
+            
+            # 批量生成向量（与ids一一对应），重建集合时大部分可直接从向量存储加载
+            embeddings = await self._embed_with_store(texts) if texts else []
+            
+            artifact_ids = [artifact['id'] for artifact in artifacts]
+            if written_after is not None:
+                # 以下写入之间没有await，检查后不会再有双写插入
+                skipped = self._written_since(artifact_ids, written_after)
+                if skipped:
+                    logger.info(f"跳过 {len(skipped)} 条向量化期间已被更新或删除的资料")
+                    artifact_ids = [artifact_id for artifact_id in artifact_ids if artifact_id not in skipped]
+                    artifact_chunks = {
+                        artifact_id: chunks for artifact_id, chunks in artifact_chunks.items()
+                        if artifact_id not in skipped
+                    }
+                    kept = [
+                        i for i, metadata in enumerate(metadatas)
+                        if int(metadata['artifact_id']) not in skipped
+                    ]
+                    ids = [ids[i] for i in kept]
+                    metadatas = [metadatas[i] for i in kept]
+                    embeddings = [embeddings[i] for i in kept]
+            self._store_chunks(artifact_chunks)
+            
+            # 分批写入向量数据库（不存储documents），再删除过期的切片向量
+            keep_ids = set(ids)
+            target_collections = [collection] if collection is not None else self._target_collections()
+            for target in target_collections:
+                if ids:
+                    bulk_upsert(target, ids, embeddings, [None] * len(ids), metadatas)
+                self._delete_stale_vectors(target, artifact_ids, keep_ids)
+            if collection is None:
+                self._mark_shadow_writes(artifact_ids)
+            
+            logger.info(f"成功批量同步 {len(artifacts)} 条资料（{len(ids)} 个切片）到向量数据库")
             return True
             
         except Exception as e:
@@ -187,22 +327,7 @@ class VectorSyncService:
             
             self.db_manager.collection.delete(where={})
             
-            # 从SQLite获取所有活跃资料
-            cursor = self.db_manager.sqlite_conn.cursor()
-            cursor.execute("""
-                SELECT id, title, content, category
-                FROM artifacts
-                WHERE is_active = 1
-            """)
-            
-            artifacts = []
-            for row in cursor.fetchall():
-                artifacts.append({
-                    'id': row[0],
-                    'title': row[1],
-                    'content': row[2],
-                    'category': row[3] or ''
-                })
+            artifacts = self._load_active_artifacts()
             
             logger.info(f"开始重新索引 {len(artifacts)} 条资料")
             
@@ -219,6 +344,132 @@ class VectorSyncService:
         except Exception as e:
             logger.error(f"重新索引所有资料失败: {str(e)}")
             return False
+    
+    def _load_active_artifacts(self, after_id: int = 0, limit: Optional[int] = None) -> List[dict]:
+        """
+        从SQLite获取活跃资料
+        
+        Args:
+            after_id: 只返回ID大于该值的资料（按ID分页）
+            limit: 最大返回数量，None表示不限制
+        """
+        cursor = self.db_manager.init_sqlite().cursor()
+        query = """
+            SELECT a.id, a.title, c.content, a.category
+            FROM artifacts a LEFT JOIN artifact_contents c ON c.artifact_id = a.id
+            WHERE a.is_active = 1 AND a.id > ?
+            ORDER BY a.id
+        """
+        params = [after_id]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        cursor.execute(query, params)
+        
+        artifacts = []
+        for row in cursor.fetchall():
+            artifacts.append({
+                'id': row[0],
+                'title': row[1],
+                'content': row[2],
+                'category': row[3] or ''
+            })
+        return artifacts
+    
+    def get_reindex_status(self) -> Dict[str, Any]:
+        """获取蓝绿重建索引任务状态"""
+        with self.lock:
+            status = dict(self.reindex_status)
+        status['running'] = self._reindex_task is not None and not self._reindex_task.done()
+        return status
+    
+    def start_blue_green_reindex(self) -> bool:
+        """
+        启动后台蓝绿重建索引任务
+        
+        Returns:
+            是否成功启动（已有任务运行时返回False）
+        """
+        with self.lock:
+            if self._reindex_task is not None and not self._reindex_task.done():
+                return False
+            self.reindex_status = {
+                'status': 'processing',
+                'total': 0,
+                'processed': 0,
+                'collection': None,
+                'start_time': datetime.now()
+            }
+            self._reindex_task = asyncio.create_task(self.reindex_blue_green())
+        return True
+    
+    async def reindex_blue_green(self) -> bool:
+        """
+        蓝绿方式重建索引
+        
+        在影子集合中构建全部向量，期间查询继续访问当前集合；
+        构建完成后原子切换，旧集合保留用于回滚
+        """
+        try:
+            self.db_manager.init_chroma()
+            
+            if not self.db_manager.chroma_available or not self.db_manager.collection:
+                raise RuntimeError("ChromaDB集合不可用，无法重新索引")
+            
+            self._shadow_writes.clear()
+            shadow = self.db_manager.create_shadow_collection()
+            
+            cursor = self.db_manager.init_sqlite().cursor()
+            cursor.execute("SELECT COUNT(*) FROM artifacts WHERE is_active = 1")
+            total = cursor.fetchone()[0]
+            
+            with self.lock:
+                self.reindex_status['collection'] = shadow.name
+                self.reindex_status['total'] = total
+            
+            log(f"ChromaDB - 开始蓝绿重建索引，目标集合: {shadow.name}，资料数: {total}", LogType.DATABASE, "INFO")
+            
+            # 按ID分批读取并写入影子集合：读取后到写入前被双写（更新或删除）的资料跳过，不覆盖更新的结果
+            batch_size = max(config.BATCH_SIZE, 1) * 10
+            last_id = 0
+            processed = 0
+            while True:
+                written_after = self._shadow_write_seq
+                batch = self._load_active_artifacts(after_id=last_id, limit=batch_size)
+                if not batch:
+                    break
+                
+                success = await self.batch_sync_artifacts_to_vector_db(
+                    batch, collection=shadow, written_after=written_after
+                )
+                if not success:
+                    raise RuntimeError(f"ID {batch[0]['id']} - {batch[-1]['id']} 的资料同步失败")
+                
+                last_id = batch[-1]['id']
+                processed += len(batch)
+                with self.lock:
+                    self.reindex_status['processed'] = processed
+            
+            self.db_manager.swap_collection()
+            self._shadow_writes.clear()
+            
+            with self.lock:
+                self.reindex_status['status'] = 'completed'
+                self.reindex_status['end_time'] = datetime.now()
+            
+            log(f"ChromaDB - 蓝绿重建索引完成，当前集合: {shadow.name}", LogType.DATABASE, "INFO")
+            return True
+            
+        except Exception as e:
+            log(f"ChromaDB - 蓝绿重建索引失败: {str(e)}", LogType.DATABASE, "ERROR")
+            self.db_manager.discard_shadow_collection()
+            self._shadow_writes.clear()
+            
+            with self.lock:
+                self.reindex_status['status'] = 'failed'
+                self.reindex_status['error'] = str(e)
+                self.reindex_status['end_time'] = datetime.now()
+            return False
 
 
 # 全局向量同步服务实例
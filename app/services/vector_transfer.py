@@ -0,0 +1,337 @@
+"""
+向量导出/导入服务模块
+将向量集合导出为可内存映射的 .npy 矩阵和 .jsonl ID/元数据文件，并支持分批导入，用于备份和跨节点迁移
+"""
+import asyncio
+import json
+import os
+import re
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from app.core.database import db_manager
+from app.core.config import config
+from app.core.logger_manager import log, LogType
+
+# 支持的导出精度
+EXPORT_DTYPES = {"float32": np.float32, "float16": np.float16}
+
+# 导出文件名只允许字母、数字、下划线、点和连字符，避免写出导出目录
+_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def bulk_upsert(collection, ids: List[str], embeddings, documents: List[Optional[str]], metadatas: List[Optional[Dict[str, Any]]]) -> int:
+    """
+    按配置的批次大小分批写入ChromaDB
+
+    Args:
+        collection: 目标集合
+        ids: 文档ID列表
+        embeddings: 与ids一一对应的向量（列表或numpy矩阵）
+        documents: 文档内容列表，元素可为None
+        metadatas: 元数据列表，元素可为None
+
+    Returns:
+        提交的批次数
+    """
+    chunk_size = max(config.CHROMA_BULK_CHUNK_SIZE, 1)
+    chunks = 0
+    for start in range(0, len(ids), chunk_size):
+        end = start + chunk_size
+        chunk_embeddings = embeddings[start:end]
+        if hasattr(chunk_embeddings, "tolist"):
+            chunk_embeddings = np.asarray(chunk_embeddings, dtype=np.float32).tolist()
+
+        # 按是否提供内容/元数据分组写入：upsert时传入的空内容会覆盖已有记录的内容，
+        # 未提供的字段不传递，保留已有值（ChromaDB也不接受空元数据字典）
+        groups: Dict[tuple, List[int]] = {}
+        for offset in range(len(ids[start:end])):
+            index = start + offset
+            groups.setdefault((bool(documents[index]), bool(metadatas[index])), []).append(offset)
+
+        for (has_document, has_metadata), offsets in groups.items():
+            params = {
+                "ids": [ids[start + offset] for offset in offsets],
+                "embeddings": [chunk_embeddings[offset] for offset in offsets]
+            }
+            if has_document:
+                params["documents"] = [documents[start + offset] for offset in offsets]
+            if has_metadata:
+                params["metadatas"] = [metadatas[start + offset] for offset in offsets]
+            collection.upsert(**params)
+            chunks += 1
+    return chunks
+
+
+class VectorTransferService:
+    """向量导出/导入服务"""
+
+    def __init__(self):
+        self.tasks = {}  # 存储导出/导入任务状态
+        self.lock = threading.Lock()
+        # 运行中的后台任务（保持引用，避免任务运行期间被垃圾回收）
+        self._running: Set[asyncio.Task] = set()
+
+    def _spawn(self, coro):
+        """在后台运行导出/导入任务"""
+        task = asyncio.create_task(coro)
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    def _paths(self, name: str) -> Dict[str, str]:
+        """获取导出文件路径（矩阵、ID/元数据、清单）"""
+        if not _NAME_PATTERN.match(name):
+            raise ValueError("文件名只能包含字母、数字、下划线、点和连字符")
+        base = os.path.join(config.CHROMA_EXPORT_DIR, name)
+        return {
+            "matrix": f"{base}.npy",
+            "sidecar": f"{base}.jsonl",
+            "manifest": f"{base}.json"
+        }
+
+    def _new_task(self, task_type: str, name: str) -> str:
+        task_id = str(uuid.uuid4())
+        with self.lock:
+            self.tasks[task_id] = {
+                'type': task_type,
+                'name': name,
+                'status': 'processing',
+                'total': 0,
+                'processed': 0,
+                'start_time': datetime.now()
+            }
+        return task_id
+
+    def _update(self, task_id: str, **values):
+        with self.lock:
+            if task_id in self.tasks:
+                self.tasks[task_id].update(values)
+
+    def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """获取任务状态"""
+        with self.lock:
+            task = self.tasks.get(task_id)
+            return dict(task) if task else None
+
+    def list_exports(self) -> List[Dict[str, Any]]:
+        """列出导出目录中的所有导出清单"""
+        if not os.path.isdir(config.CHROMA_EXPORT_DIR):
+            return []
+        exports = []
+        for filename in sorted(os.listdir(config.CHROMA_EXPORT_DIR)):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(config.CHROMA_EXPORT_DIR, filename), 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                manifest["name"] = filename[:-len(".json")]
+                exports.append(manifest)
+            except (OSError, ValueError):
+                continue
+        return exports
+
+    def start_export(self, name: Optional[str] = None, dtype: str = "float32") -> str:
+        """
+        启动后台导出任务
+
+        Args:
+            name: 导出文件名（不含扩展名），默认使用集合名加时间戳
+            dtype: 向量精度，float32 或 float16
+
+        Returns:
+            任务ID
+        """
+        if dtype not in EXPORT_DTYPES:
+            raise ValueError(f"不支持的向量精度: {dtype}")
+        collection = db_manager.collection
+        if collection is None:
+            raise RuntimeError("ChromaDB集合不可用")
+
+        name = name or f"{collection.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        paths = self._paths(name)
+
+        task_id = self._new_task('export', name)
+        self._spawn(self.export_collection(task_id, collection, paths, dtype))
+        return task_id
+
+    def _check_compatible(self, collection, paths: Dict[str, str]):
+        """
+        检查导出文件与目标集合是否兼容（向量维度和向量模型）
+
+        Raises:
+            ValueError: 清单与矩阵不一致、维度与集合不一致或向量模型与当前模型不一致
+        """
+        from app.services.ai_clients import embedding_client
+
+        with open(paths["manifest"], 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        matrix = np.load(paths["matrix"], mmap_mode='r')
+        dims = matrix.shape[1] if matrix.ndim == 2 else 0
+        del matrix
+        if manifest.get("dims") is not None and int(manifest["dims"]) != dims:
+            raise ValueError(f"导出清单的向量维度 {manifest['dims']} 与矩阵列数 {dims} 不一致")
+
+        # 集合为空时以配置的向量维度为准
+        sample = collection.get(limit=1, include=["embeddings"])
+        embeddings = sample.get("embeddings") if sample else None
+        expected_dims = len(embeddings[0]) if embeddings is not None and len(embeddings) else config.EMBEDDING_DIMENSIONS
+        if dims != expected_dims:
+            raise ValueError(f"导出文件的向量维度 {dims} 与集合 {collection.name} 的维度 {expected_dims} 不一致")
+
+        model = manifest.get("embedding_model")
+        if model != embedding_client.model_key:
+            raise ValueError(f"导出文件的向量模型 {model} 与当前向量模型 {embedding_client.model_key} 不一致")
+
+    def start_import(self, name: str, force: bool = False) -> str:
+        """
+        启动后台导入任务，写入当前集合
+
+        Args:
+            name: 导出文件名（不含扩展名）
+            force: 跳过向量维度和向量模型的兼容性检查
+
+        Returns:
+            任务ID
+        """
+        paths = self._paths(name)
+        for path in paths.values():
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"导出文件不存在: {path}")
+        collection = db_manager.collection
+        if collection is None:
+            raise RuntimeError("ChromaDB集合不可用")
+        if not force:
+            self._check_compatible(collection, paths)
+
+        task_id = self._new_task('import', name)
+        self._spawn(self.import_collection(task_id, collection, paths))
+        return task_id
+
+    async def export_collection(self, task_id: str, collection, paths: Dict[str, str], dtype: str):
+        """分页读取集合，按行写入内存映射的 .npy 矩阵和 .jsonl 文件"""
+        from numpy.lib.format import open_memmap
+
+        matrix = None
+        try:
+            os.makedirs(os.path.dirname(paths["matrix"]) or ".", exist_ok=True)
+            total = collection.count()
+            if total == 0:
+                raise RuntimeError("集合为空，无需导出")
+            self._update(task_id, total=total)
+
+            page_size = max(config.CHROMA_BULK_CHUNK_SIZE, 1)
+            written = 0
+            dims = 0
+            with open(paths["sidecar"], 'w', encoding='utf-8') as sidecar:
+                while written < total:
+                    page = collection.get(
+                        limit=min(page_size, total - written),
+                        offset=written,
+                        include=["embeddings", "metadatas", "documents"]
+                    )
+                    ids = page["ids"]
+                    if not ids:
+                        # 导出期间集合记录减少
+                        break
+
+                    embeddings = np.asarray(page["embeddings"], dtype=np.float32)
+                    if matrix is None:
+                        dims = embeddings.shape[1]
+                        matrix = open_memmap(paths["matrix"], mode='w+', dtype=EXPORT_DTYPES[dtype], shape=(total, dims))
+                    matrix[written:written + len(ids)] = embeddings
+
+                    metadatas = page.get("metadatas") or [None] * len(ids)
+                    documents = page.get("documents") or [None] * len(ids)
+                    for doc_id, metadata, document in zip(ids, metadatas, documents):
+                        sidecar.write(json.dumps({"id": doc_id, "metadata": metadata, "document": document}, ensure_ascii=False))
+                        sidecar.write("\n")
+
+                    written += len(ids)
+                    self._update(task_id, processed=written)
+                    await asyncio.sleep(0)
+
+            if matrix is None:
+                raise RuntimeError("集合为空，无需导出")
+            matrix.flush()
+            matrix = None
+
+            from app.services.ai_clients import embedding_client
+            manifest = {
+                "collection": collection.name,
+                "count": written,
+                "dims": dims,
+                "dtype": dtype,
+                "embedding_model": embedding_client.model_key,
+                "created_at": datetime.now().isoformat()
+            }
+            with open(paths["manifest"], 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+            self._update(task_id, status='completed', processed=written, end_time=datetime.now())
+            log(f"ChromaDB - 导出向量完成，集合: {collection.name}，数量: {written}，文件: {paths['matrix']}", LogType.DATABASE, "INFO")
+
+        except Exception as e:
+            # 释放内存映射后删除不完整的导出文件，避免被当作可导入的导出
+            matrix = None
+            for path in paths.values():
+                try:
+                    if os.path.exists(path):
+                        os.remove(path)
+                except OSError as remove_error:
+                    log(f"ChromaDB - 删除不完整的导出文件失败: {path}: {remove_error}", LogType.DATABASE, "WARNING")
+            self._update(task_id, status='failed', error=str(e), end_time=datetime.now())
+            log(f"ChromaDB - 导出向量失败: {str(e)}", LogType.DATABASE, "ERROR")
+
+    async def import_collection(self, task_id: str, collection, paths: Dict[str, str]):
+        """内存映射 .npy 矩阵，与 .jsonl 文件逐批对应写入集合"""
+        try:
+            with open(paths["manifest"], 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+
+            # 以只读内存映射打开，按批读取时才从磁盘加载对应行
+            matrix = np.load(paths["matrix"], mmap_mode='r')
+            count = int(manifest.get("count", matrix.shape[0]))
+            if count > matrix.shape[0]:
+                raise RuntimeError(f"矩阵行数 {matrix.shape[0]} 少于清单记录数 {count}")
+            self._update(task_id, total=count)
+
+            chunk_size = max(config.CHROMA_BULK_CHUNK_SIZE, 1)
+            processed = 0
+            with open(paths["sidecar"], 'r', encoding='utf-8') as sidecar:
+                while processed < count:
+                    rows = []
+                    for line in sidecar:
+                        if line.strip():
+                            rows.append(json.loads(line))
+                        if len(rows) >= min(chunk_size, count - processed):
+                            break
+                    if not rows:
+                        raise RuntimeError(f"ID文件记录数不足，已导入 {processed}/{count}")
+
+                    bulk_upsert(
+                        collection,
+                        [row["id"] for row in rows],
+                        matrix[processed:processed + len(rows)],
+                        [row.get("document") for row in rows],
+                        [row.get("metadata") for row in rows]
+                    )
+
+                    processed += len(rows)
+                    self._update(task_id, processed=processed)
+                    await asyncio.sleep(0)
+
+            self._update(task_id, status='completed', end_time=datetime.now())
+            log(f"ChromaDB - 导入向量完成，集合: {collection.name}，数量: {processed}", LogType.DATABASE, "INFO")
+
+        except Exception as e:
+            self._update(task_id, status='failed', error=str(e), end_time=datetime.now())
+            log(f"ChromaDB - 导入向量失败: {str(e)}", LogType.DATABASE, "ERROR")
+
+
+# 全局向量导出/导入服务实例
+vector_transfer_service = VectorTransferService()
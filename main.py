@@ -10,6 +10,9 @@ import logging
 
 from app.core.config import config
 from app.core.database import db_manager
+from app.services.vector_outbox import vector_outbox_worker
+from app.services.enrichment import enrichment_queue
+from app.api.compression import CompressionMiddleware
 from app.api.routers import system, artifacts, search, logs, database
 from app.api.routers import config as config_router
 from app.core.config_hot_reload import set_fastapi_app, set_config_instance, register_config_change_listener
@@ -43,6 +46,12 @@ async def lifespan(app: FastAPI):
         logger.error(f"数据库初始化失败: {e}")
         raise
     
+    # 启动向量同步outbox后台任务（继续处理上次未完成的记录）
+    vector_outbox_worker.start()
+    
+    # 启动资料增强后台队列（补齐尚未生成摘要和元数据的资料）
+    enrichment_queue.start()
+    
     logger.info(f"语义检索系统启动完成，监听地址: http://localhost:{config.PORT}")
     
     # 自动打开默认浏览器访问控制面板
@@ -65,6 +74,12 @@ async def lifespan(app: FastAPI):
     
     # 关闭事件
     logger.info("正在关闭语义检索系统...")
+    await vector_outbox_worker.stop()
+    await enrichment_queue.stop()
+    from app.services.chunking_pool import chunking_pool
+    chunking_pool.shutdown()
+    from app.services.http_pool import http_pool
+    await http_pool.aclose()
     db_manager.close_connections()
     logger.info("语义检索系统已关闭")
 
@@ -94,6 +109,9 @@ if config.WEB_SERVICE_ENABLED:
         allow_headers=["*"],
     )
 
+# 响应压缩（brotli/gzip，小于阈值的响应和SSE流式响应不压缩）
+app.add_middleware(CompressionMiddleware)
+
 # 处理/srs/前缀的中间件
 @app.middleware("http")
 async def srs_prefix_middleware(request, call_next):
@@ -0,0 +1,71 @@
+"""
+检索结果序列化微基准
+对比 Pydantic模型 + jsonable_encoder 的默认路径与直接由数据库行构建字典 + 快速JSON编码的路径，输出每条结果的序列化耗时
+"""
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from app.models.schemas import SearchResult
+from app.api.responses import dumps, ORJSON_AVAILABLE
+from app.services.artifact_projection import row_to_dict
+
+FIELDS = ["id", "title", "content", "category", "created_at", "updated_at", "is_active"]
+
+
+def make_rows(count: int, content_length: int):
+    """构造模拟的SQLite查询行"""
+    content = ("青铜器是中国古代文明的重要组成部分，" * (content_length // 18 + 1))[:content_length]
+    return [
+        (i + 1, f"资料标题 {i + 1}", content, "文物知识", "2024-01-01 10:00:00", "2024-01-02 08:30:00", 1)
+        for i in range(count)
+    ]
+
+
+def model_path(rows) -> bytes:
+    """原有路径：构建SearchResult并校验，.dict()后经jsonable_encoder和标准库json编码"""
+    results = [SearchResult(**dict(zip(FIELDS, row)), similarity=0.85) for row in rows]
+    payload = {"data": {"artifacts": [result.dict() for result in results], "total_count": len(results)}}
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False).encode("utf-8")
+
+
+def fast_path(rows) -> bytes:
+    """优化路径：直接由数据库行构建字典，使用快速JSON编码"""
+    results = []
+    for row in rows:
+        result = row_to_dict(FIELDS, row)
+        result["similarity"] = 0.85
+        results.append(result)
+    return dumps({"data": {"artifacts": results, "total_count": len(results)}})
+
+
+def measure(func, rows, repeat: int) -> float:
+    """返回每次调用的最短耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(rows)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="检索结果序列化微基准")
+    parser.add_argument("--results", type=int, default=100, help="每次响应的结果数量")
+    parser.add_argument("--content-length", type=int, nargs="+", default=[200, 5000, 50000], help="正文长度（字符），可指定多个")
+    parser.add_argument("--repeat", type=int, default=50, help="重复次数（取最短耗时）")
+    args = parser.parse_args()
+
+    print(f"JSON编码器: {'orjson' if ORJSON_AVAILABLE else '标准库json'}，每次 {args.results} 条结果，重复 {args.repeat} 次")
+    print(f"{'正文长度':>10} {'模型路径(us/条)':>18} {'快速路径(us/条)':>18} {'加速比':>8}")
+    for content_length in args.content_length:
+        rows = make_rows(args.results, content_length)
+        slow = measure(model_path, rows, args.repeat) / args.results * 1e6
+        fast = measure(fast_path, rows, args.repeat) / args.results * 1e6
+        print(f"{content_length:>10} {slow:>18.2f} {fast:>18.2f} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
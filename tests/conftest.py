@@ -0,0 +1,33 @@
+"""测试公共夹具"""
+import sqlite3
+
+import pytest
+
+from app.core.database import db_manager
+
+
+@pytest.fixture
+def sqlite_db(monkeypatch):
+    """使用内存SQLite数据库替换全局数据库连接，表结构与应用启动时一致"""
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    monkeypatch.setattr(db_manager, "sqlite_conn", conn)
+    db_manager._create_tables()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def artifacts_client(sqlite_db):
+    """挂载资料管理路由、使用测试数据库的API客户端"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api.dependencies import get_db
+    from app.api.routers import artifacts
+
+    app = FastAPI()
+    app.include_router(artifacts.router)
+    app.dependency_overrides[get_db] = lambda: {"sqlite": sqlite_db, "chroma": None, "collection": None}
+    with TestClient(app) as client:
+        yield client
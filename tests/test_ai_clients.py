@@ -0,0 +1,86 @@
+"""AI服务客户端测试"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+openai = pytest.importorskip("openai")
+httpx = pytest.importorskip("httpx")
+
+from app.services import ai_clients
+from app.services.ai_clients import EmbeddingClient, _is_transient_error
+
+
+def _status_error(status_code: int) -> openai.APIStatusError:
+    request = httpx.Request("POST", "http://test/v1/embeddings")
+    response = httpx.Response(status_code, request=request)
+    return openai.APIStatusError("error", response=response, body=None)
+
+
+def test_only_network_errors_and_server_responses_are_transient():
+    request = httpx.Request("POST", "http://test/v1/embeddings")
+
+    assert _is_transient_error(openai.APIConnectionError(request=request))
+    assert _is_transient_error(openai.APITimeoutError(request=request))
+    assert _is_transient_error(httpx.ConnectError("refused", request=request))
+    assert _is_transient_error(_status_error(429))
+    assert _is_transient_error(_status_error(503))
+
+    assert not _is_transient_error(_status_error(400))
+    assert not _is_transient_error(TypeError("bad argument"))
+    assert not _is_transient_error(ValueError("bad value"))
+    assert not _is_transient_error(json.JSONDecodeError("bad json", "", 0))
+
+
+@pytest.fixture
+def batch_client(monkeypatch):
+    """每批2条文本、最多并发4批的远程Embedding客户端"""
+    monkeypatch.setattr(ai_clients, "config", SimpleNamespace(
+        BATCH_SIZE=2,
+        EMBEDDING_BATCH_MAX_CHARS=8000,
+        EMBEDDING_BATCH_MAX_CONCURRENCY=4
+    ))
+    client = EmbeddingClient.__new__(EmbeddingClient)
+    client.provider = "openai_compatible"
+    return client
+
+
+def test_embed_batch_keeps_input_order_across_batches(batch_client):
+    texts = [f"text-{i}" for i in range(7)]
+    calls = []
+
+    async def embed_texts(batch, priority):
+        calls.append(list(batch))
+        # 后面的批次先完成
+        await asyncio.sleep(0.01 * (4 - len(calls)))
+        return [[float(text.split("-")[1])] for text in batch]
+
+    batch_client._embed_texts = embed_texts
+
+    vectors = asyncio.run(batch_client.embed_batch(texts))
+    assert vectors == [[float(i)] for i in range(7)]
+    assert len(calls) == 4
+
+
+def test_embed_batch_cancels_remaining_batches_on_failure(batch_client):
+    cancelled = []
+
+    async def embed_texts(batch, priority):
+        if batch[0] == "a":
+            raise ConnectionError("down")
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.append(batch[0])
+            raise
+
+    batch_client._embed_texts = embed_texts
+
+    async def run():
+        with pytest.raises(ConnectionError):
+            await asyncio.wait_for(batch_client.embed_batch(["a", "b", "c", "d", "e", "f"]), timeout=1)
+        # 失败返回时其余批次已被取消，而不是在事件循环关闭时才被清理
+        return sorted(cancelled)
+
+    assert asyncio.run(run()) == ["c", "e"]
@@ -0,0 +1,62 @@
+"""资料字段投影与内容摘要测试"""
+import pytest
+
+from app.services.artifact_projection import cut_snippet, parse_fields, row_to_dict, select_columns
+
+
+def test_snippet_is_cut_around_the_match():
+    content = "x" * 100 + "needle" + "y" * 100
+
+    snippet = cut_snippet(content, "needle", 40)
+
+    # 从关键词前 40 // 4 = 10 个字符处开始
+    assert snippet == "x" * 10 + "needle" + "y" * 24
+
+
+def test_snippet_match_ignores_case_beyond_ascii():
+    content = "前言。" * 50 + "ÉMILE ZOLA ПРИВЕТ" + "。后记" * 50
+
+    for term in ["émile", "Émile", "привет", "ПрИвЕт"]:
+        snippet = cut_snippet(content, term, 40)
+        assert term.lower() in snippet.lower()
+
+
+def test_snippet_without_match_or_term_starts_at_the_beginning():
+    assert cut_snippet("abcdef", "zzz", 3) == "abc"
+    assert cut_snippet("abcdef", None, 3) == "abc"
+    assert cut_snippet(None, "a", 3) is None
+
+
+def test_snippet_located_on_projected_row(sqlite_db):
+    cursor = sqlite_db.cursor()
+    cursor.execute("INSERT INTO artifacts (id, title) VALUES (1, 't')")
+    cursor.execute("INSERT INTO artifact_contents (artifact_id, content) VALUES (1, ?)", ("a" * 300 + "Привет" + "b" * 300,))
+    fields = parse_fields("title,snippet")
+
+    for term in ["привет", None]:
+        columns, params = select_columns(fields, term, 40)
+        cursor.execute(
+            f"SELECT {columns} FROM artifacts a LEFT JOIN artifact_contents c ON c.artifact_id = a.id",
+            params
+        )
+        result = row_to_dict(fields, cursor.fetchone(), term, 40)
+        assert len(result["snippet"]) == 40
+        if term:
+            assert "Привет" in result["snippet"]
+        else:
+            assert result["snippet"] == "a" * 40
+
+
+@pytest.mark.parametrize("fields, expected", [
+    (None, None),
+    ("", None),
+    ("title, snippet,title", ["id", "title", "snippet"]),
+    (["snippet", "id"], ["id", "snippet"]),
+])
+def test_parse_fields(fields, expected):
+    assert parse_fields(fields) == expected
+
+
+def test_parse_fields_rejects_unknown_fields():
+    with pytest.raises(ValueError, match="password"):
+        parse_fields("title,password")
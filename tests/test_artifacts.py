@@ -0,0 +1,103 @@
+"""资料列表游标分页测试"""
+import base64
+import json
+
+import pytest
+
+from app.api.routers.artifacts import _decode_cursor, _encode_cursor
+
+
+@pytest.fixture
+def artifacts(sqlite_db):
+    """5条资料，其中2、3、4的创建时间相同，期望顺序为 5, 4, 3, 2, 1"""
+    rows = [
+        (1, "2024-01-01 10:00:00"),
+        (2, "2024-01-02 10:00:00"),
+        (3, "2024-01-02 10:00:00"),
+        (4, "2024-01-02 10:00:00"),
+        (5, "2024-01-03 10:00:00"),
+    ]
+    cursor = sqlite_db.cursor()
+    for artifact_id, created_at in rows:
+        cursor.execute(
+            "INSERT INTO artifacts (id, title, category, created_at, updated_at) VALUES (?, ?, 'doc', ?, ?)",
+            (artifact_id, f"title {artifact_id}", created_at, created_at)
+        )
+        cursor.execute(
+            "INSERT INTO artifact_contents (artifact_id, content) VALUES (?, ?)",
+            (artifact_id, f"content {artifact_id}")
+        )
+    sqlite_db.commit()
+
+
+def _encode_raw(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii")
+
+
+def test_cursor_round_trip():
+    cursor = _encode_cursor("2024-01-02 10:00:00", 3)
+    assert _decode_cursor(cursor) == ("2024-01-02 10:00:00", 3)
+
+
+def test_cursor_pages_break_ties_on_id(artifacts_client, artifacts):
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"size": 2, "count": "none"}
+        if cursor:
+            params["cursor"] = cursor
+        body = artifacts_client.get("/api/v1/artifacts", params=params).json()
+        seen.extend(artifact["id"] for artifact in body["artifacts"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [5, 4, 3, 2, 1]
+    assert pages == 3
+
+
+def test_cursor_ignores_page_and_continues_after_position(artifacts_client, artifacts):
+    cursor = _encode_cursor("2024-01-02 10:00:00", 4)
+
+    body = artifacts_client.get("/api/v1/artifacts", params={"size": 10, "cursor": cursor, "page": 3}).json()
+
+    assert [artifact["id"] for artifact in body["artifacts"]] == [3, 2, 1]
+    assert body["next_cursor"] is None
+
+
+def test_last_full_page_returns_cursor_to_an_empty_page(artifacts_client, artifacts):
+    first = artifacts_client.get("/api/v1/artifacts", params={"size": 5}).json()
+    assert len(first["artifacts"]) == 5
+    assert first["next_cursor"] is not None
+
+    rest = artifacts_client.get("/api/v1/artifacts", params={"size": 5, "cursor": first["next_cursor"]}).json()
+    assert rest["artifacts"] == []
+    assert rest["next_cursor"] is None
+
+
+def test_count_modes(artifacts_client, artifacts):
+    exact = artifacts_client.get("/api/v1/artifacts", params={"size": 2}).json()
+    none = artifacts_client.get("/api/v1/artifacts", params={"size": 2, "count": "none"}).json()
+
+    assert exact["total_count"] == 5
+    assert none["total_count"] is None
+    assert [artifact["id"] for artifact in none["artifacts"]] == [5, 4]
+
+    assert artifacts_client.get("/api/v1/artifacts", params={"count": "estimate"}).status_code == 422
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    "w6k=",
+    _encode_raw([1]),
+    _encode_raw({"created_at": "2024-01-01"}),
+    _encode_raw(["2024-01-01 10:00:00", "abc"]),
+    _encode_raw(None),
+])
+def test_malformed_cursor_is_rejected(artifacts_client, artifacts, cursor):
+    response = artifacts_client.get("/api/v1/artifacts", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "无效的分页游标"
@@ -0,0 +1,90 @@
+"""资料切片测试"""
+import pytest
+
+from app.services.chunker import chunk_text, split_sentences
+
+# 6个5字的中文句子
+_CJK_TEXT = "甲乙丙丁。戊己庚辛。壬癸子丑。寅卯辰巳。午未申酉。戌亥天地。"
+
+
+def _shared_prefix(previous: str, current: str) -> int:
+    """后一切片开头与前一切片末尾重合的字符数"""
+    for length in range(min(len(previous), len(current)), 0, -1):
+        if previous.endswith(current[:length]):
+            return length
+    return 0
+
+
+@pytest.mark.parametrize("text", ["", "   \n\n  ", None])
+def test_empty_text_has_no_chunks(text):
+    assert chunk_text(text, 100, 20) == []
+
+
+def test_short_text_is_a_single_chunk():
+    assert chunk_text("  只有一句话。 ", 100, 20) == ["只有一句话。"]
+
+
+def test_sentence_longer_than_chunk_is_split_at_soft_breaks():
+    sentence = "这是一个非常长的句子，没有任何句末标点，一直写下去，直到超过切片的最大长度为止，还要继续写"
+
+    chunks = chunk_text(sentence, 12, 4)
+
+    assert all(len(chunk) <= 12 for chunk in chunks)
+    assert "".join(chunks) == sentence
+    # 优先在逗号处断开
+    assert chunks[0] == "这是一个非常长的句子，"
+
+
+def test_sentence_without_breaks_is_split_by_length():
+    chunks = chunk_text("a" * 25, 10, 3)
+
+    assert chunks == ["a" * 10, "a" * 10, "a" * 5]
+
+
+def test_overlap_repeats_whole_sentences():
+    chunks = chunk_text(_CJK_TEXT, 12, 5)
+
+    assert chunks == [
+        "甲乙丙丁。戊己庚辛。",
+        "戊己庚辛。壬癸子丑。",
+        "壬癸子丑。寅卯辰巳。",
+        "寅卯辰巳。午未申酉。",
+        "午未申酉。戌亥天地。",
+    ]
+
+
+def test_zero_overlap_does_not_repeat():
+    chunks = chunk_text(_CJK_TEXT, 12, 0)
+
+    assert "".join(chunks) == _CJK_TEXT
+
+
+@pytest.mark.parametrize("max_chars,overlap", [(12, 5), (12, 100), (20, 20), (30, 8)])
+def test_overlap_never_exceeds_limits(max_chars, overlap):
+    chunks = chunk_text(_CJK_TEXT * 3, max_chars, overlap)
+
+    assert all(len(chunk) <= max_chars for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        shared = _shared_prefix(previous, current)
+        # 重叠不超过配置值，且不超过切片长度的一半
+        assert shared <= min(overlap, max_chars // 2)
+        assert shared < len(current)
+
+
+def test_mixed_cjk_and_ascii_punctuation():
+    text = "Hello world. 你好世界。Good bye! 再见了朋友们；See you soon. 他说：“走吧。”然后离开"
+
+    assert split_sentences(text) == [[
+        "Hello world.", "你好世界。", "Good bye!", "再见了朋友们；",
+        "See you soon.", "他说：“走吧。”", "然后离开"
+    ]]
+
+
+def test_ascii_decimal_point_is_not_a_sentence_end():
+    assert split_sentences("版本3.5已发布。Pi is 3.14 roughly.") == [["版本3.5已发布。", "Pi is 3.14 roughly."]]
+
+
+def test_ascii_sentences_rejoin_with_spaces():
+    chunks = chunk_text("One two. Three four. 五六七。八九十。Five six.", 20, 0)
+
+    assert chunks == ["One two. Three four.", "五六七。八九十。Five six."]
@@ -0,0 +1,84 @@
+"""响应压缩中间件测试"""
+import gzip
+from types import SimpleNamespace
+
+import pytest
+
+from app.api import compression
+from app.api.compression import CompressionMiddleware
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """挂载压缩中间件的测试应用，阈值为100字节，仅启用gzip"""
+    from fastapi import FastAPI
+    from fastapi.responses import PlainTextResponse, StreamingResponse
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(compression, "config", SimpleNamespace(
+        COMPRESSION_ENABLED=True,
+        COMPRESSION_MINIMUM_SIZE=100,
+        COMPRESSION_GZIP_LEVEL=6,
+        COMPRESSION_BROTLI_QUALITY=4
+    ))
+    monkeypatch.setattr(compression, "BROTLI_AVAILABLE", False)
+
+    app = FastAPI()
+
+    @app.get("/text/{size}")
+    async def text(size: int):
+        return PlainTextResponse("a" * size, headers={"Vary": "Origin"})
+
+    @app.get("/events")
+    async def events():
+        async def stream():
+            for index in range(20):
+                yield f"data: {'x' * 20} {index}\n\n"
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    app.add_middleware(CompressionMiddleware)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _raw_get(client, path: str):
+    """发送请求但不自动解压，返回响应头和原始响应体"""
+    with client.stream("GET", path, headers={"Accept-Encoding": "gzip"}) as response:
+        return response.headers, b"".join(response.iter_raw())
+
+
+def test_response_below_threshold_is_not_compressed(client):
+    headers, body = _raw_get(client, "/text/99")
+
+    assert "content-encoding" not in headers
+    assert body == b"a" * 99
+    assert headers["vary"] == "Origin"
+
+
+def test_response_at_threshold_is_compressed(client):
+    headers, body = _raw_get(client, "/text/100")
+
+    assert headers["content-encoding"] == "gzip"
+    assert int(headers["content-length"]) == len(body)
+    assert gzip.decompress(body) == b"a" * 100
+
+
+def test_vary_keeps_existing_values(client):
+    headers, _ = _raw_get(client, "/text/500")
+
+    assert headers["vary"] == "Origin, Accept-Encoding"
+
+
+def test_event_stream_is_not_compressed(client):
+    headers, body = _raw_get(client, "/events")
+
+    assert "content-encoding" not in headers
+    assert headers["content-type"].startswith("text/event-stream")
+    assert body.count(b"data: ") == 20
+
+
+def test_client_without_accept_encoding_gets_plain_response(client):
+    response = client.get("/text/500", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text == "a" * 500
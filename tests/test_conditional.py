@@ -0,0 +1,59 @@
+"""条件请求（ETag/304）与表版本号触发器测试"""
+from app.core.database import db_manager
+
+
+def _triggered_tables(conn) -> set:
+    return {row[0] for row in conn.execute(
+        "SELECT tbl_name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_%_generation_delete'"
+    )}
+
+
+def _insert_artifact(conn, artifact_id: int):
+    conn.execute("INSERT INTO artifacts (id, title, category) VALUES (?, ?, 'doc')", (artifact_id, f"title {artifact_id}"))
+    conn.execute("INSERT INTO artifact_contents (artifact_id, content) VALUES (?, ?)", (artifact_id, f"content {artifact_id}"))
+    conn.commit()
+
+
+def test_generation_triggers_skip_internal_tables(sqlite_db):
+    tables = _triggered_tables(sqlite_db)
+
+    assert {"artifacts", "artifact_contents"} <= tables
+    assert "vector_sync_outbox" not in tables
+
+
+def test_stale_generation_triggers_are_dropped(sqlite_db):
+    sqlite_db.execute("""
+        CREATE TRIGGER trg_vector_sync_outbox_generation_delete AFTER DELETE ON vector_sync_outbox
+        BEGIN
+            INSERT INTO table_generations (table_name, generation) VALUES ('vector_sync_outbox', 1)
+            ON CONFLICT(table_name) DO UPDATE SET generation = generation + 1;
+        END
+    """)
+
+    db_manager._create_tables()
+
+    assert "vector_sync_outbox" not in _triggered_tables(sqlite_db)
+
+
+def test_matching_if_none_match_returns_304(artifacts_client, sqlite_db):
+    _insert_artifact(sqlite_db, 1)
+    first = artifacts_client.get("/api/v1/artifacts", params={"size": 10})
+    etag = first.headers["etag"]
+
+    cached = artifacts_client.get("/api/v1/artifacts", params={"size": 10}, headers={"If-None-Match": etag})
+
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+
+def test_write_changes_etag(artifacts_client, sqlite_db):
+    _insert_artifact(sqlite_db, 1)
+    etag = artifacts_client.get("/api/v1/artifacts", params={"size": 10}).headers["etag"]
+
+    _insert_artifact(sqlite_db, 2)
+    response = artifacts_client.get("/api/v1/artifacts", params={"size": 10}, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [artifact["id"] for artifact in response.json()["artifacts"]] == [2, 1]
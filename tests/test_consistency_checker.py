@@ -0,0 +1,138 @@
+"""SQLite与向量数据库一致性检查测试"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.database import db_manager
+from app.services import consistency_checker as checker_module
+from app.services.consistency_checker import ConsistencyChecker
+
+
+class FakeCollection:
+    """按插入顺序分页的内存向量集合"""
+
+    name = "fake_collection"
+
+    def __init__(self, records):
+        self.records = dict(records)
+        self.deleted = []
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=None):
+        items = list(self.records.items())
+        if where is not None:
+            wanted = set(where["artifact_id"]["$in"])
+            items = [(vector_id, metadata) for vector_id, metadata in items
+                     if (metadata or {}).get("artifact_id") in wanted]
+        start = offset or 0
+        items = items[start:start + limit] if limit is not None else items[start:]
+        return {"ids": [vector_id for vector_id, _ in items], "metadatas": [metadata for _, metadata in items]}
+
+    def delete(self, ids):
+        for vector_id in ids:
+            self.records.pop(vector_id, None)
+        self.deleted.extend(ids)
+
+
+def _chunk(artifact_id: int, index: int):
+    return f"{artifact_id}#{index}", {"artifact_id": str(artifact_id)}
+
+
+@pytest.fixture
+def checker_env(sqlite_db, monkeypatch):
+    """三条有正文的资料（1、2、3）和一条空资料（4），批大小为2以覆盖分页"""
+    cursor = sqlite_db.cursor()
+    for artifact_id, title, content in [(1, "a", "x"), (2, "b", "y"), (3, "c", "z"), (4, "", "")]:
+        cursor.execute("INSERT INTO artifacts (id, title) VALUES (?, ?)", (artifact_id, title))
+        cursor.execute("INSERT INTO artifact_contents (artifact_id, content) VALUES (?, ?)", (artifact_id, content))
+    sqlite_db.commit()
+
+    monkeypatch.setattr(checker_module, "config", SimpleNamespace(VECTOR_SYNC_CONSISTENCY_BATCH_SIZE=2))
+    monkeypatch.setattr(db_manager, "init_chroma", lambda: None)
+    monkeypatch.setattr(db_manager, "chroma_available", True)
+
+    def use_collection(collection):
+        monkeypatch.setattr(db_manager, "collection", collection)
+        return collection
+
+    return use_collection
+
+
+def _check(checker: ConsistencyChecker, repair: bool) -> dict:
+    """通过后台任务执行一次检查并返回最终状态"""
+    async def run():
+        assert checker.start(repair)
+        await checker._task
+
+    asyncio.run(run())
+    return checker.get_status()
+
+
+def _orphaned_collection():
+    # 孤儿向量分散在各页中，删除后后续记录会前移
+    return FakeCollection([
+        _chunk(1, 0),
+        _chunk(9, 0),
+        _chunk(9, 1),
+        _chunk(2, 0),
+        _chunk(8, 0),
+        ("garbage", None),
+        _chunk(1, 1),
+    ])
+
+
+def test_repair_deletes_every_orphan_across_pages(checker_env, sqlite_db):
+    collection = checker_env(_orphaned_collection())
+    checker = ConsistencyChecker()
+
+    status = _check(checker, repair=True)
+
+    assert list(collection.records) == ["1#0", "2#0", "1#1"]
+    assert sorted(collection.deleted) == ["8#0", "9#0", "9#1", "garbage"]
+    assert status["checked_vectors"] == 7
+    assert status["orphan_vectors"] == 4
+    assert status["deleted_orphans"] == 4
+
+
+def test_check_without_repair_only_reports(checker_env, sqlite_db):
+    collection = checker_env(_orphaned_collection())
+    checker = ConsistencyChecker()
+
+    status = _check(checker, repair=False)
+
+    assert collection.deleted == []
+    assert status["checked_vectors"] == 7
+    assert status["orphan_vectors"] == 4
+    assert status["missing_vectors"] == 1
+    assert sqlite_db.execute("SELECT COUNT(*) FROM vector_sync_outbox").fetchone()[0] == 0
+
+
+def test_missing_vectors_are_queued_for_sync(checker_env, sqlite_db):
+    checker_env(FakeCollection([_chunk(1, 0), _chunk(2, 3)]))
+    checker = ConsistencyChecker()
+
+    status = _check(checker, repair=True)
+
+    # 空资料4不需要向量
+    assert status["checked_artifacts"] == 3
+    assert status["missing_vectors"] == 1
+    assert status["queued_for_sync"] == 1
+    queued = [row[0] for row in sqlite_db.execute("SELECT artifact_id FROM vector_sync_outbox")]
+    assert queued == [3]
+
+
+def test_second_start_is_rejected_while_running(checker_env):
+    checker_env(FakeCollection([_chunk(1, 0), _chunk(2, 0), _chunk(3, 0)]))
+    checker = ConsistencyChecker()
+
+    async def run():
+        assert checker.start(repair=False)
+        assert not checker.start(repair=False)
+        assert checker.get_status()["running"]
+        await checker._task
+        assert not checker.get_status()["running"]
+        assert checker.start(repair=False)
+        await checker._task
+
+    asyncio.run(run())
+    assert checker.get_status()["status"] == "completed"
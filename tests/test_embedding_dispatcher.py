@@ -0,0 +1,114 @@
+"""向量请求微批调度测试"""
+import asyncio
+
+from app.services.embedding_dispatcher import EmbeddingDispatcher
+
+
+class StubEmbedder:
+    """记录每次批量调用的输入，向量为文本长度"""
+
+    def __init__(self, error: Exception = None, drop_last: bool = False):
+        self.calls = []
+        self.error = error
+        self.drop_last = drop_last
+
+    async def __call__(self, texts):
+        self.calls.append(list(texts))
+        if self.error is not None:
+            raise self.error
+        vectors = [[float(len(text))] for text in texts]
+        return vectors[:-1] if self.drop_last else vectors
+
+
+def test_requests_within_window_share_one_batch():
+    embedder = StubEmbedder()
+
+    async def run():
+        dispatcher = EmbeddingDispatcher(embedder, window_ms=20, max_batch_size=32)
+        return await asyncio.gather(*(dispatcher.submit(text) for text in ["a", "bb", "ccc"]))
+
+    assert asyncio.run(run()) == [[1.0], [2.0], [3.0]]
+    assert embedder.calls == [["a", "bb", "ccc"]]
+
+
+def test_full_batch_flushes_without_waiting_for_window():
+    embedder = StubEmbedder()
+
+    async def run():
+        # 窗口足够长，只有达到批大小才会立即发送
+        dispatcher = EmbeddingDispatcher(embedder, window_ms=60_000, max_batch_size=2)
+        first = asyncio.gather(dispatcher.submit("a"), dispatcher.submit("bb"))
+        vectors = await asyncio.wait_for(first, timeout=1)
+        straggler = asyncio.ensure_future(dispatcher.submit("ccc"))
+        await asyncio.sleep(0.01)
+        pending = not straggler.done()
+        dispatcher._flush()
+        return vectors, pending, await straggler
+
+    vectors, pending, straggler = asyncio.run(run())
+    assert vectors == [[1.0], [2.0]]
+    assert pending
+    assert straggler == [3.0]
+    assert embedder.calls == [["a", "bb"], ["ccc"]]
+
+
+def test_identical_texts_are_embedded_once():
+    embedder = StubEmbedder()
+
+    async def run():
+        dispatcher = EmbeddingDispatcher(embedder, window_ms=20, max_batch_size=32)
+        return await asyncio.gather(*(dispatcher.submit(text) for text in ["x", "yy", "x", "x"]))
+
+    assert asyncio.run(run()) == [[1.0], [2.0], [1.0], [1.0]]
+    assert embedder.calls == [["x", "yy"]]
+
+
+def test_failed_batch_rejects_every_waiter():
+    embedder = StubEmbedder(error=ConnectionError("down"))
+
+    async def run():
+        dispatcher = EmbeddingDispatcher(embedder, window_ms=20, max_batch_size=32)
+        return await asyncio.wait_for(
+            asyncio.gather(*(dispatcher.submit(text) for text in ["a", "b", "a"]), return_exceptions=True),
+            timeout=1
+        )
+
+    results = asyncio.run(run())
+    assert len(results) == 3
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+def test_short_vector_list_rejects_every_waiter():
+    embedder = StubEmbedder(drop_last=True)
+
+    async def run():
+        dispatcher = EmbeddingDispatcher(embedder, window_ms=20, max_batch_size=32)
+        return await asyncio.wait_for(
+            asyncio.gather(*(dispatcher.submit(text) for text in ["a", "bb"]), return_exceptions=True),
+            timeout=1
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_cancelled_batch_rejects_every_waiter():
+    started = None
+
+    async def hang(texts):
+        started.set()
+        await asyncio.sleep(3600)
+
+    async def run():
+        nonlocal started
+        started = asyncio.Event()
+        dispatcher = EmbeddingDispatcher(hang, window_ms=0, max_batch_size=32)
+        waiters = asyncio.gather(dispatcher.submit("a"), dispatcher.submit("b"), return_exceptions=True)
+        await started.wait()
+        for task in list(dispatcher._tasks):
+            task.cancel()
+        return await asyncio.wait_for(waiters, timeout=1)
+
+    results = asyncio.run(run())
+    assert len(results) == 2
+    assert all(isinstance(result, RuntimeError) for result in results)
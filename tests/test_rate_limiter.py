@@ -0,0 +1,143 @@
+"""优先级令牌桶限流测试"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import rate_limiter
+from app.services.rate_limiter import PriorityRateLimiter, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+
+_real_sleep = asyncio.sleep
+
+
+class FakeClock:
+    """可手动推进的时钟，sleep只推进时间并让出事件循环"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float):
+        self.slept.append(delay)
+        self.now += delay
+        await _real_sleep(0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(monotonic=fake.monotonic))
+    monkeypatch.setattr(rate_limiter, "asyncio", SimpleNamespace(sleep=fake.sleep))
+    return fake
+
+
+def _limiter(**kwargs) -> PriorityRateLimiter:
+    options = {"requests_per_second": 10, "tokens_per_second": 1000, "background_reserve": 0.2}
+    options.update(kwargs)
+    return PriorityRateLimiter(**options)
+
+
+def test_bucket_refills_over_time_up_to_capacity(clock):
+    limiter = _limiter()
+
+    async def drain():
+        for _ in range(10):
+            await limiter.acquire(1, PRIORITY_INTERACTIVE)
+
+    asyncio.run(drain())
+    assert clock.slept == []
+    assert limiter.snapshot()["available_requests"] == 0
+
+    clock.now += 0.5
+    assert limiter.snapshot()["available_requests"] == 5
+
+    clock.now += 60
+    assert limiter.snapshot()["available_requests"] == 10
+
+
+def test_empty_bucket_waits_for_refill(clock):
+    limiter = _limiter()
+
+    async def run():
+        for _ in range(11):
+            await limiter.acquire(1, PRIORITY_INTERACTIVE)
+
+    start = clock.now
+    asyncio.run(run())
+    # 第11次请求需要等待补充1个请求令牌（0.1秒）
+    assert clock.now - start == pytest.approx(0.1, abs=0.01)
+
+
+def test_background_leaves_reserve_for_interactive(clock):
+    limiter = _limiter()
+
+    async def run():
+        # 后台请求最多用到剩余20%（2个请求令牌）为止
+        for _ in range(8):
+            await limiter.acquire(1, PRIORITY_BACKGROUND)
+        background_slept = list(clock.slept)
+        for _ in range(2):
+            await limiter.acquire(1, PRIORITY_INTERACTIVE)
+        return background_slept
+
+    assert asyncio.run(run()) == []
+    assert clock.slept == []
+
+    async def background_once():
+        await limiter.acquire(1, PRIORITY_BACKGROUND)
+
+    # 令牌已耗尽，后台请求要等到补足保留量之上才能获取
+    start = clock.now
+    asyncio.run(background_once())
+    assert clock.now - start == pytest.approx(0.3, abs=0.01)
+
+
+def test_token_budget_reserve_applies_to_background(clock):
+    limiter = _limiter(requests_per_second=100)
+
+    async def run():
+        await limiter.acquire(800, PRIORITY_BACKGROUND)
+        await limiter.acquire(200, PRIORITY_INTERACTIVE)
+
+    asyncio.run(run())
+    assert clock.slept == []
+
+    start = clock.now
+    asyncio.run(limiter.acquire(100, PRIORITY_BACKGROUND))
+    # 需要补足 100 + 20% * 1000 = 300 个token
+    assert clock.now - start == pytest.approx(0.3, abs=0.01)
+
+
+def test_interactive_preempts_waiting_background(clock):
+    limiter = _limiter(background_reserve=0)
+    order = []
+
+    async def request(name: str, priority: str):
+        await limiter.acquire(1, priority)
+        order.append(name)
+
+    async def run():
+        for _ in range(10):
+            await limiter.acquire(1, PRIORITY_INTERACTIVE)
+        # 交互式请求等待补充令牌期间，后台请求即使看到可用令牌也要让出
+        interactive = asyncio.ensure_future(request("interactive", PRIORITY_INTERACTIVE))
+        background = asyncio.ensure_future(request("background", PRIORITY_BACKGROUND))
+        await asyncio.gather(interactive, background)
+
+    asyncio.run(run())
+    assert order == ["interactive", "background"]
+    assert limiter.snapshot()["interactive_waiting"] == 0
+
+
+def test_disabled_limiter_never_waits(clock):
+    limiter = _limiter(enabled=False)
+
+    async def run():
+        for _ in range(100):
+            await limiter.acquire(1000, PRIORITY_BACKGROUND)
+
+    asyncio.run(run())
+    assert clock.slept == []
@@ -0,0 +1,84 @@
+"""容错模块测试"""
+import asyncio
+
+import pytest
+
+from app.services.resilience import CircuitBreaker, CircuitOpenError, retry_async
+
+
+def _open_breaker() -> CircuitBreaker:
+    """创建一个已打开且恢复时间为0（下次请求即进入半开）的熔断器"""
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+    return breaker
+
+
+def test_half_open_allows_single_probe():
+    breaker = _open_breaker()
+
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+def test_cancelled_probe_releases_half_open_slot():
+    breaker = _open_breaker()
+
+    async def run():
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.sleep(3600)
+
+        probe = asyncio.create_task(retry_async(hang, max_retries=0, breaker=breaker))
+        await started.wait()
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        # 探测被取消后应能放行新的探测请求，成功后熔断器关闭
+        async def succeed():
+            return "ok"
+
+        return await retry_async(succeed, max_retries=0, breaker=breaker)
+
+    assert asyncio.run(run()) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_reopens_breaker():
+    breaker = _open_breaker()
+
+    async def fail():
+        raise ConnectionError("down")
+
+    async def run():
+        with pytest.raises(ConnectionError):
+            await retry_async(fail, max_retries=0, breaker=breaker)
+        breaker.recovery_timeout = 3600
+        with pytest.raises(CircuitOpenError):
+            await retry_async(fail, max_retries=0, breaker=breaker)
+
+    asyncio.run(run())
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_non_transient_error_is_not_retried_or_counted():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=3600)
+    calls = []
+
+    async def broken():
+        calls.append(1)
+        raise TypeError("bad argument")
+
+    async def run():
+        with pytest.raises(TypeError):
+            await retry_async(
+                broken, max_retries=3, base_delay=0, breaker=breaker,
+                retryable=lambda e: isinstance(e, ConnectionError)
+            )
+
+    asyncio.run(run())
+    assert len(calls) == 1
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.snapshot()["total_failures"] == 0
@@ -0,0 +1,96 @@
+"""检索问答流程测试"""
+import asyncio
+
+import pytest
+
+from app.api.routers import search
+from app.models.schemas import AnswerRequest
+from app.services.ai_clients import llm_client
+
+
+class FakePipeline:
+    """返回固定结果或抛出异常的检索流水线"""
+
+    results = []
+    error = None
+
+    def __init__(self, request, db):
+        self.elapsed = 0.01
+
+    async def run(self):
+        # 与真实检索一样让出事件循环，预热任务得以开始执行
+        await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+        return self.results
+
+
+@pytest.fixture
+def answer_env(sqlite_db, monkeypatch):
+    """替换数据库连接、检索流水线和LLM预热，返回预热任务的状态记录"""
+    def fake_get_db():
+        yield {"sqlite": sqlite_db, "chroma": None, "collection": None}
+
+    warm_up_state = {"started": False, "cancelled": False}
+
+    async def slow_warm_up():
+        warm_up_state["started"] = True
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            warm_up_state["cancelled"] = True
+            raise
+
+    monkeypatch.setattr(search, "get_db", fake_get_db)
+    monkeypatch.setattr(search, "SearchPipeline", FakePipeline)
+    monkeypatch.setattr(FakePipeline, "results", [])
+    monkeypatch.setattr(FakePipeline, "error", None)
+    monkeypatch.setattr(llm_client, "warm_up", slow_warm_up)
+    return warm_up_state
+
+
+def _collect(generator, state, stop_after=None):
+    """
+    消费事件生成器；指定stop_after时读取该数量的事件后关闭（模拟客户端断开）
+
+    在事件循环结束前记录预热任务是否已被取消（asyncio.run退出时会取消所有剩余任务）
+    """
+    async def run():
+        events = []
+        async for event in generator:
+            events.append(event)
+            if stop_after is not None and len(events) >= stop_after:
+                await generator.aclose()
+                break
+        # 让取消在事件循环中生效
+        await asyncio.sleep(0)
+        return events, state["cancelled"]
+
+    return asyncio.run(run())
+
+
+def test_retrieval_failure_cancels_warm_up(answer_env):
+    FakePipeline.error = RuntimeError("boom")
+
+    events, cancelled = _collect(search._stream_answer(AnswerRequest(query="q")), answer_env)
+
+    assert len(events) == 1
+    assert b"event: error" in events[0]
+    assert cancelled
+
+
+def test_no_sources_cancels_warm_up(answer_env):
+    events, cancelled = _collect(search._stream_answer(AnswerRequest(query="q")), answer_env)
+
+    assert b"event: done" in events[-1]
+    assert cancelled
+
+
+def test_client_disconnect_cancels_warm_up(answer_env):
+    FakePipeline.results = [{"id": 1, "title": "t", "content": "c", "updated_at": None}]
+
+    events, cancelled = _collect(search._stream_answer(AnswerRequest(query="q")), answer_env, stop_after=1)
+
+    assert b"event: sources" in events[0]
+    assert answer_env["started"]
+    assert cancelled
@@ -0,0 +1,37 @@
+"""检索流水线测试"""
+import pytest
+
+from app.models.schemas import SearchRequest
+from app.services.search_pipeline import SearchPipeline
+
+
+@pytest.fixture
+def keyword_db(sqlite_db):
+    cursor = sqlite_db.cursor()
+    for artifact_id, title, content in [
+        (1, "Émile Zola", "émile zola 的小说"),
+        (2, "小说目录", "émile zola 全集"),
+        (3, "ПРИВЕТ мир", "привет"),
+    ]:
+        cursor.execute("INSERT INTO artifacts (id, title) VALUES (?, ?)", (artifact_id, title))
+        cursor.execute("INSERT INTO artifact_contents (artifact_id, content) VALUES (?, ?)", (artifact_id, content))
+    sqlite_db.commit()
+    return {"sqlite": sqlite_db, "chroma": None, "collection": None}
+
+
+def _keyword_similarities(db, query: str) -> dict:
+    pipeline = SearchPipeline(SearchRequest(query=query, threshold=0.0, fields=["title"]), db)
+    return {result["id"]: result["similarity"] for result in pipeline.keyword_stage(set(), 10)}
+
+
+def test_title_match_ignores_case_beyond_ascii(keyword_db):
+    # 正文按原样命中，标题只有大小写不同
+    assert _keyword_similarities(keyword_db, "émile") == {1: 0.7, 2: 0.5}
+    assert _keyword_similarities(keyword_db, "привет") == {3: 0.7}
+
+
+def test_keyword_stage_skips_existing_results(keyword_db):
+    pipeline = SearchPipeline(SearchRequest(query="zola", threshold=0.0, fields=["title"]), keyword_db)
+
+    assert [result["id"] for result in pipeline.keyword_stage({1}, 10)] == [2]
+    assert pipeline.keyword_stage(set(), 0) == []
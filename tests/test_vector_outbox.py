@@ -0,0 +1,174 @@
+"""向量同步outbox测试"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import vector_outbox
+from app.services.vector_outbox import VectorSyncOutboxWorker, enqueue_vector_sync, OUTBOX_DELETE
+
+
+class StubVectorSync:
+    """记录同步调用的向量同步服务，可指定失败的资料ID"""
+
+    def __init__(self):
+        self.synced = []
+        self.removed = []
+        self.batch_calls = 0
+        self.failing_ids = set()
+        self.on_sync = None
+
+    async def batch_sync_artifacts_to_vector_db(self, artifacts):
+        self.batch_calls += 1
+        if self.on_sync is not None:
+            self.on_sync()
+        if any(artifact['id'] in self.failing_ids for artifact in artifacts):
+            raise RuntimeError("embedding failed")
+        self.synced.extend(artifact['id'] for artifact in artifacts)
+        return True
+
+    async def remove_artifacts_from_vector_db(self, artifact_ids):
+        if any(artifact_id in self.failing_ids for artifact_id in artifact_ids):
+            return False
+        self.removed.extend(artifact_ids)
+        return True
+
+
+@pytest.fixture
+def stub_sync(monkeypatch):
+    stub = StubVectorSync()
+    monkeypatch.setattr(vector_outbox, "vector_sync_service", stub)
+    monkeypatch.setattr(vector_outbox, "config", SimpleNamespace(
+        VECTOR_SYNC_OUTBOX_BATCH_SIZE=100,
+        VECTOR_SYNC_OUTBOX_RETRY_BASE_DELAY=2.0,
+        VECTOR_SYNC_OUTBOX_RETRY_MAX_DELAY=300.0,
+        VECTOR_SYNC_OUTBOX_MAX_ATTEMPTS=3,
+        VECTOR_SYNC_OUTBOX_POLL_INTERVAL=1.0
+    ))
+    return stub
+
+
+def _add_artifact(conn, title: str) -> int:
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO artifacts (title, category) VALUES (?, 'doc')", (title,))
+    artifact_id = cursor.lastrowid
+    cursor.execute("INSERT INTO artifact_contents (artifact_id, content) VALUES (?, ?)", (artifact_id, f"{title} body"))
+    enqueue_vector_sync(cursor, artifact_id)
+    conn.commit()
+    return artifact_id
+
+
+def _outbox_rows(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT artifact_id, attempts, dead_at, last_error FROM vector_sync_outbox ORDER BY id")
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+def _make_due(conn):
+    """让所有等待重试的记录立即到期"""
+    conn.execute("UPDATE vector_sync_outbox SET next_attempt_at = 0")
+    conn.commit()
+
+
+def test_entries_for_one_artifact_are_coalesced(sqlite_db, stub_sync):
+    artifact_id = _add_artifact(sqlite_db, "a")
+    for _ in range(2):
+        enqueue_vector_sync(sqlite_db.cursor(), artifact_id)
+    sqlite_db.commit()
+
+    processed = asyncio.run(VectorSyncOutboxWorker().process_batch())
+
+    assert processed == 3
+    assert stub_sync.synced == [artifact_id]
+    assert _outbox_rows(sqlite_db) == []
+
+
+def test_deleted_artifact_is_removed_instead_of_upserted(sqlite_db, stub_sync):
+    kept = _add_artifact(sqlite_db, "kept")
+    deleted = _add_artifact(sqlite_db, "deleted")
+    cursor = sqlite_db.cursor()
+    cursor.execute("DELETE FROM artifacts WHERE id = ?", (deleted,))
+    enqueue_vector_sync(cursor, deleted, OUTBOX_DELETE)
+    sqlite_db.commit()
+
+    asyncio.run(VectorSyncOutboxWorker().process_batch())
+
+    assert stub_sync.synced == [kept]
+    assert stub_sync.removed == [deleted]
+    assert _outbox_rows(sqlite_db) == []
+
+
+def test_failure_reschedules_only_the_failing_artifact(sqlite_db, stub_sync):
+    healthy = _add_artifact(sqlite_db, "healthy")
+    broken = _add_artifact(sqlite_db, "broken")
+    stub_sync.failing_ids = {broken}
+    worker = VectorSyncOutboxWorker()
+
+    asyncio.run(worker.process_batch())
+
+    assert stub_sync.synced == [healthy]
+    rows = _outbox_rows(sqlite_db)
+    assert len(rows) == 1
+    artifact_id, attempts, dead_at, last_error = rows[0]
+    assert (artifact_id, attempts, dead_at) == (broken, 1, None)
+    assert "embedding failed" in last_error
+
+    next_attempt_at, created_at = sqlite_db.execute(
+        "SELECT next_attempt_at, created_at FROM vector_sync_outbox"
+    ).fetchone()
+    assert next_attempt_at > created_at
+    # 退避期间不会被再次处理
+    assert asyncio.run(worker.process_batch()) == 0
+
+
+def test_failing_artifact_becomes_dead_after_max_attempts(sqlite_db, stub_sync):
+    broken = _add_artifact(sqlite_db, "broken")
+    stub_sync.failing_ids = {broken}
+    worker = VectorSyncOutboxWorker()
+
+    for _ in range(3):
+        _make_due(sqlite_db)
+        assert asyncio.run(worker.process_batch()) == 1
+
+    artifact_id, attempts, dead_at, last_error = _outbox_rows(sqlite_db)[0]
+    assert (artifact_id, attempts) == (broken, 3)
+    assert dead_at is not None
+    assert "embedding failed" in last_error
+
+    # 死信不再处理，并在指标中列出
+    _make_due(sqlite_db)
+    assert asyncio.run(worker.process_batch()) == 0
+    metrics = worker.metrics()
+    assert metrics["pending"] == 0
+    assert metrics["dead"] == 1
+    assert metrics["dead_artifacts"][0]["artifact_id"] == broken
+    assert "embedding failed" in metrics["dead_artifacts"][0]["last_error"]
+
+    # 资料再次变更并同步成功后，旧的死信记录一并清除
+    stub_sync.failing_ids = set()
+    enqueue_vector_sync(sqlite_db.cursor(), broken)
+    sqlite_db.commit()
+    asyncio.run(worker.process_batch())
+    assert stub_sync.synced == [broken]
+    assert _outbox_rows(sqlite_db) == []
+
+
+def test_entries_written_during_processing_survive(sqlite_db, stub_sync):
+    artifact_id = _add_artifact(sqlite_db, "a")
+
+    def write_again():
+        # 同步进行中资料再次被修改
+        if stub_sync.batch_calls == 1:
+            enqueue_vector_sync(sqlite_db.cursor(), artifact_id)
+            sqlite_db.commit()
+
+    stub_sync.on_sync = write_again
+    worker = VectorSyncOutboxWorker()
+
+    assert asyncio.run(worker.process_batch()) == 1
+    rows = _outbox_rows(sqlite_db)
+    assert [(row[0], row[1]) for row in rows] == [(artifact_id, 0)]
+
+    assert asyncio.run(worker.process_batch()) == 1
+    assert stub_sync.synced == [artifact_id, artifact_id]
+    assert _outbox_rows(sqlite_db) == []
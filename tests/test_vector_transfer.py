@@ -0,0 +1,145 @@
+"""向量导出/导入测试"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.database import db_manager
+from app.services import ai_clients, vector_transfer
+from app.services.vector_transfer import VectorTransferService
+
+
+class FakeCollection:
+    """记录upsert调用的内存向量集合"""
+
+    name = "fake_collection"
+
+    def __init__(self, dims: int = 3):
+        self.records = {}
+        self.dims = dims
+        self.upserts = []
+
+    def get(self, limit=None, include=None):
+        items = list(self.records.items())[:limit]
+        return {"ids": [vector_id for vector_id, _ in items], "embeddings": [record["embedding"] for _, record in items]}
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None):
+        self.upserts.append(list(ids))
+        for index, vector_id in enumerate(ids):
+            self.records[vector_id] = {
+                "embedding": list(embeddings[index]),
+                "document": documents[index] if documents else None,
+                "metadata": metadatas[index] if metadatas else None
+            }
+
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_transfer, "config", SimpleNamespace(
+        CHROMA_EXPORT_DIR=str(tmp_path),
+        CHROMA_BULK_CHUNK_SIZE=2,
+        EMBEDDING_DIMENSIONS=3
+    ))
+    monkeypatch.setattr(ai_clients.embedding_client, "model", "test-model")
+    monkeypatch.setattr(ai_clients.embedding_client, "provider", "openai_compatible")
+    return tmp_path
+
+
+def _write_export(directory, name: str, rows: int, dims: int = 3, count=None, sidecar_rows=None, model="test-model"):
+    """写出一份导出文件：第i行向量全部为i，ID为 v{i}"""
+    np.save(directory / f"{name}.npy", np.array([[float(i)] * dims for i in range(rows)], dtype=np.float32))
+    lines = []
+    for i in range(rows if sidecar_rows is None else sidecar_rows):
+        lines.append(json.dumps({"id": f"v{i}", "metadata": {"artifact_id": str(i)}, "document": f"doc {i}"}))
+        if i == 1:
+            # 空行不计入记录
+            lines.append("")
+    (directory / f"{name}.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    manifest = {"count": rows if count is None else count, "dims": dims, "embedding_model": model}
+    (directory / f"{name}.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+
+def _import(service: VectorTransferService, collection, export_dir, name: str) -> dict:
+    task_id = service._new_task('import', name)
+    asyncio.run(service.import_collection(task_id, collection, service._paths(name)))
+    return service.get_task_status(task_id)
+
+
+def test_import_reads_sidecar_in_chunks_matching_matrix_rows(export_dir):
+    _write_export(export_dir, "backup", rows=5)
+    collection = FakeCollection()
+
+    status = _import(VectorTransferService(), collection, export_dir, "backup")
+
+    assert status["status"] == "completed"
+    assert status["processed"] == 5
+    assert collection.upserts == [["v0", "v1"], ["v2", "v3"], ["v4"]]
+    for i in range(5):
+        record = collection.records[f"v{i}"]
+        assert record["embedding"] == [float(i)] * 3
+        assert record["document"] == f"doc {i}"
+        assert record["metadata"] == {"artifact_id": str(i)}
+
+
+def test_import_fails_when_sidecar_is_shorter_than_manifest(export_dir):
+    _write_export(export_dir, "backup", rows=5, sidecar_rows=3)
+    collection = FakeCollection()
+
+    status = _import(VectorTransferService(), collection, export_dir, "backup")
+
+    assert status["status"] == "failed"
+    assert "3/5" in status["error"]
+    assert sorted(collection.records) == ["v0", "v1", "v2"]
+
+
+def test_import_fails_when_matrix_is_shorter_than_manifest(export_dir):
+    _write_export(export_dir, "backup", rows=3, count=5)
+    collection = FakeCollection()
+
+    status = _import(VectorTransferService(), collection, export_dir, "backup")
+
+    assert status["status"] == "failed"
+    assert collection.upserts == []
+
+
+def test_import_stops_at_manifest_count(export_dir):
+    _write_export(export_dir, "backup", rows=4, count=3)
+    collection = FakeCollection()
+
+    status = _import(VectorTransferService(), collection, export_dir, "backup")
+
+    assert status["status"] == "completed"
+    assert sorted(collection.records) == ["v0", "v1", "v2"]
+
+
+def test_start_import_rejects_incompatible_exports(export_dir, monkeypatch):
+    monkeypatch.setattr(db_manager, "collection", FakeCollection())
+    service = VectorTransferService()
+
+    _write_export(export_dir, "wide", rows=2, dims=4)
+    with pytest.raises(ValueError, match="维度"):
+        service.start_import("wide")
+
+    _write_export(export_dir, "other_model", rows=2, model="other-model")
+    with pytest.raises(ValueError, match="向量模型"):
+        service.start_import("other_model")
+
+
+def test_start_import_keeps_a_reference_to_the_running_job(export_dir, monkeypatch):
+    collection = FakeCollection()
+    monkeypatch.setattr(db_manager, "collection", collection)
+    _write_export(export_dir, "backup", rows=3)
+    service = VectorTransferService()
+
+    async def run():
+        task_id = service.start_import("backup")
+        assert len(service._running) == 1
+        await asyncio.gather(*service._running)
+        return task_id
+
+    task_id = asyncio.run(run())
+    assert service._running == set()
+    assert service.get_task_status(task_id)["status"] == "completed"
+    assert sorted(collection.records) == ["v0", "v1", "v2"]